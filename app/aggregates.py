@@ -0,0 +1,255 @@
+# app/aggregates.py
+"""
+Network-wide aggregates maintained per ingestion cycle.
+
+Version distribution, storage and peer-count buckets, public/private counts,
+storage totals and averages used to be recomputed by /pnodes, /network/health,
+/network/analytics and save_snapshot_history, each with its own loop over the
+pnode list. NetworkAggregates keeps them as counters that are updated from the
+per-cycle node diff (added, removed, changed) and published with the snapshot,
+so every reader gets the same numbers.
+"""
+
+from typing import Dict, Iterable
+
+from .helpers import safe_get, safe_get_list
+from .scoring import NetworkHealthAggregator
+
+# Storage usage buckets (percent, upper bound exclusive)
+STORAGE_BUCKETS = [
+    ("empty", 10),       # 0-10%
+    ("low", 30),         # 10-30%
+    ("optimal", 70),     # 30-70%
+    ("high", 90),        # 70-90%
+    ("critical", None),  # 90-100%
+]
+
+# Peer-count buckets (peer count, upper bound inclusive)
+PEER_BUCKETS = [
+    ("isolated", 1),     # 0-1 peers
+    ("weak", 2),         # 2 peers
+    ("good", 4),         # 3-4 peers
+    ("excellent", None), # 5+ peers
+]
+
+
+def storage_bucket(usage_percent: float) -> str:
+    """Return the storage bucket name for a usage percentage."""
+    for name, upper in STORAGE_BUCKETS:
+        if upper is None or usage_percent < upper:
+            return name
+
+
+def peer_bucket(peer_count: int) -> str:
+    """Return the connectivity bucket name for a peer count."""
+    for name, upper in PEER_BUCKETS:
+        if upper is None or peer_count <= upper:
+            return name
+
+
+class NodeDiff:
+    """
+    Difference between two cycles of the unified view.
+
+    Attributes:
+        added: address -> node for nodes new in this cycle
+        removed: address -> node (previous state) for nodes that left the view
+        changed: address -> node (new state) for nodes whose data changed
+        refreshed: address -> node (new state) for nodes where only
+            PER_CYCLE_FIELDS moved
+        rescored: Changed addresses where, besides PER_CYCLE_FIELDS, only
+            DERIVED_FIELDS moved (still listed in changed)
+    """
+
+    # Fields that move every cycle without the node itself changing
+    VOLATILE_FIELDS = ("last_checked", "offline_duration")
+
+    # Reported fields that advance every cycle for every online node. A node
+    # that differs only in these is refreshed, not changed, so it doesn't go
+    # through the aggregates' remove-then-add.
+    PER_CYCLE_FIELDS = ("uptime", "last_seen")
+
+    # Fields computed from the others; scores follow uptime, so they drift
+    # a little every cycle too
+    DERIVED_FIELDS = ("scores", "score", "tier")
+
+    def __init__(self, added: Dict = None, removed: Dict = None, changed: Dict = None,
+                 refreshed: Dict = None):
+        self.added = added or {}
+        self.removed = removed or {}
+        self.changed = changed or {}
+        self.refreshed = refreshed or {}
+        self.rescored = set()
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.refreshed)
+
+    @staticmethod
+    def _project(node: Dict, excluded: tuple) -> Dict:
+        return {k: v for k, v in node.items() if k not in excluded}
+
+    @classmethod
+    def between(cls, previous: Dict[str, Dict], current: Dict[str, Dict]) -> "NodeDiff":
+        """
+        Diff two address -> node mappings.
+
+        Args:
+            previous: Nodes from the last cycle
+            current: Nodes from this cycle
+        """
+        stable = cls.VOLATILE_FIELDS + cls.PER_CYCLE_FIELDS
+        reported = stable + cls.DERIVED_FIELDS
+        diff = cls()
+        for address, node in current.items():
+            old = previous.get(address)
+            if old is None:
+                diff.added[address] = node
+            elif cls._project(old, stable) != cls._project(node, stable):
+                diff.changed[address] = node
+                if cls._project(old, reported) == cls._project(node, reported):
+                    diff.rescored.add(address)
+            elif any(old.get(field) != node.get(field) for field in cls.PER_CYCLE_FIELDS):
+                diff.refreshed[address] = node
+        for address, node in previous.items():
+            if address not in current:
+                diff.removed[address] = node
+        return diff
+
+
+class NetworkAggregates:
+    """
+    Counters over the unified view.
+
+    Each node contributes one small tuple; counters are adjusted by removing
+    a node's old contribution and adding its new one, so a cycle costs
+    O(changed nodes) and reading the totals costs O(1).
+
+    Online counters cover the nodes in the current snapshot; storage totals
+    are also kept over all nodes (online + offline) for /pnodes.
+    """
+
+    def __init__(self):
+        self.health = NetworkHealthAggregator()
+        self.total_nodes = 0
+        self.online_nodes = 0
+        self.public_nodes = 0                 # online
+        self.version_distribution = {}        # online
+        self.storage_buckets = {name: 0 for name, _ in STORAGE_BUCKETS}      # online
+        self.peer_count_distribution = {name: 0 for name, _ in PEER_BUCKETS}  # online
+        self.total_storage_committed = 0      # all nodes
+        self.total_storage_used = 0           # all nodes
+        self.online_storage_committed = 0
+        self.online_storage_used = 0
+        self.usage_percent_sum = 0.0          # online, usage > 0 only
+        self.usage_percent_samples = 0
+        self.total_peers = 0                  # online
+        self.total_uptime = 0                 # online, seconds
+        self._contributions = {}
+        self._uptimes = {}                    # online, kept apart: it moves every cycle
+
+    @staticmethod
+    def _contribution(node: Dict) -> tuple:
+        return (
+            bool(node.get("is_online", False)),
+            node.get("version") or "unknown",
+            safe_get(node, "storage_committed", 0),
+            safe_get(node, "storage_used", 0),
+            safe_get(node, "storage_usage_percent", 0),
+            len(safe_get_list(node, "peer_sources")),
+            bool(node.get("is_public")),
+        )
+
+    def _apply(self, contribution: tuple, sign: int):
+        is_online, version, committed, used, usage, peers, is_public = contribution
+
+        self.total_nodes += sign
+        self.total_storage_committed += sign * committed
+        self.total_storage_used += sign * used
+        if not is_online:
+            return
+
+        self.online_nodes += sign
+        self.public_nodes += sign if is_public else 0
+        count = self.version_distribution.get(version, 0) + sign
+        if count:
+            self.version_distribution[version] = count
+        else:
+            self.version_distribution.pop(version, None)
+        self.storage_buckets[storage_bucket(usage)] += sign
+        self.peer_count_distribution[peer_bucket(peers)] += sign
+        self.online_storage_committed += sign * committed
+        self.online_storage_used += sign * used
+        if usage > 0:
+            self.usage_percent_sum += sign * usage
+            self.usage_percent_samples += sign
+        self.total_peers += sign * peers
+
+    def set_uptime(self, address: str, node: Dict = None):
+        """Update one node's uptime only (node=None or offline drops it)."""
+        uptime = safe_get(node, "uptime", 0) if node is not None and node.get("is_online", False) else 0
+        self.total_uptime += uptime - self._uptimes.pop(address, 0)
+        if uptime:
+            self._uptimes[address] = uptime
+
+    def set_node(self, address: str, node: Dict = None):
+        """Add, replace or (with node=None) remove one node."""
+        self.health.set_node(address, node)
+        self.set_uptime(address, node)
+
+        contribution = self._contribution(node) if node is not None else None
+        old = self._contributions.get(address)
+        if old == contribution:
+            return
+        if old is not None:
+            self._apply(old, -1)
+            del self._contributions[address]
+        if contribution is not None:
+            self._apply(contribution, 1)
+            self._contributions[address] = contribution
+
+    def apply_diff(self, diff: NodeDiff):
+        """Apply one cycle's node diff."""
+        for address in diff.removed:
+            self.set_node(address, None)
+        for address, node in diff.added.items():
+            self.set_node(address, node)
+        for address, node in diff.changed.items():
+            self.set_node(address, node)
+        for address, node in diff.refreshed.items():
+            self.set_uptime(address, node)
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[Dict]) -> "NetworkAggregates":
+        """Build aggregates from scratch for a list of unified nodes."""
+        aggregates = cls()
+        for node in nodes:
+            aggregates.set_node(node["address"], node)
+        return aggregates
+
+    def to_dict(self) -> Dict:
+        """
+        Published form of the aggregates (stored with the snapshot).
+        """
+        online = self.online_nodes
+        return {
+            "total_nodes": self.total_nodes,
+            "online_nodes": online,
+            "offline_nodes": self.total_nodes - online,
+            "public_nodes": self.public_nodes,
+            "private_nodes": online - self.public_nodes,
+            "version_distribution": dict(self.version_distribution),
+            "storage_buckets": dict(self.storage_buckets),
+            "peer_count_distribution": dict(self.peer_count_distribution),
+            "total_storage_committed": self.total_storage_committed,
+            "total_storage_used": self.total_storage_used,
+            "online_storage_committed": self.online_storage_committed,
+            "online_storage_used": self.online_storage_used,
+            "avg_storage_usage_percent": round(
+                self.usage_percent_sum / self.usage_percent_samples
+                if self.usage_percent_samples > 0 else 0,
+                2
+            ),
+            "avg_peer_count": round(self.total_peers / online if online else 0, 2),
+            "avg_uptime_hours": round(self.total_uptime / 3600 / online if online else 0, 2),
+            "health": self.health.health(),
+        }
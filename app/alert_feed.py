@@ -0,0 +1,157 @@
+# app/alert_feed.py
+"""
+Alert transition feed for the Server-Sent Events stream (/alerts/stream).
+
+AlertEngine gives every alert that opens or resolves the next sequence
+number. publish_view() hands each cycle's transitions to AlertFeed as soon
+as they are evaluated, and AlertFeed pushes them to connected clients.
+The SSE event id is the sequence number, so a reconnecting client
+(Last-Event-ID) is replayed exactly what it missed:
+
+- from an in-memory ring buffer of the latest RING_SIZE events, or
+- from pnodes_alerts (opened_seq / resolved_seq indexes) when the gap is
+  older than the ring, e.g. after a server restart.
+
+Between transitions a client costs one parked queue read and a keep-alive
+comment every KEEPALIVE_SECONDS.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latest transitions kept in memory for resuming clients
+RING_SIZE = 1000
+
+# Max transitions replayed from MongoDB on one reconnect
+REPLAY_LIMIT = 5000
+
+# Events buffered per client before it's disconnected (it then resumes
+# with Last-Event-ID)
+QUEUE_SIZE = 256
+
+# Comment line sent on idle streams so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+
+# EventSource reconnect delay
+RETRY_MILLISECONDS = 5000
+
+
+def transition_events(opened: Iterable[Dict], resolved: Iterable[Dict]) -> List[Dict]:
+    """
+    One cycle's transitions as feed events, in sequence order.
+
+    Returns:
+        [{"seq", "event": "opened" | "resolved", "alert"}]
+    """
+    events = [{"seq": a["opened_seq"], "event": "opened", "alert": a} for a in opened]
+    events += [{"seq": a["resolved_seq"], "event": "resolved", "alert": a} for a in resolved]
+    events.sort(key=lambda e: e["seq"])
+    return events
+
+
+def format_event(event: Dict) -> str:
+    """SSE wire format: id = sequence number, event = opened/resolved."""
+    data = json.dumps(event["alert"], default=str)
+    return f"id: {event['seq']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+class AlertFeed:
+    """
+    Ring buffer of recent alert transitions plus connected subscribers.
+
+    Attributes:
+        ring: Latest transition events, oldest first
+        last_seq: Highest sequence number seen (None until known)
+        subscribers: One bounded queue per connected client
+    """
+
+    def __init__(self, ring_size: int = RING_SIZE):
+        self.ring = deque(maxlen=ring_size)
+        self.last_seq: Optional[int] = None
+        self.subscribers = set()
+
+    def reset(self, last_seq: int):
+        """Set the sequence number restored from MongoDB on startup."""
+        if self.last_seq is None or last_seq > self.last_seq:
+            self.last_seq = last_seq
+
+    def publish(self, opened: List[Dict], resolved: List[Dict]):
+        """
+        Add one cycle's transitions and push them to subscribers.
+
+        A subscriber whose queue is full is disconnected (its queue gets
+        None); EventSource clients reconnect with Last-Event-ID.
+        """
+        events = transition_events(opened, resolved)
+        if not events:
+            return
+
+        self.ring.extend(events)
+        self.last_seq = events[-1]["seq"]
+
+        for queue in list(self.subscribers):
+            try:
+                for event in events:
+                    queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+        if self.subscribers:
+            logger.info(f"📡 Pushed {len(events)} alert transition(s) to {len(self.subscribers)} stream(s)")
+
+    def replay(self, after_seq: int) -> Tuple[List[Dict], bool]:
+        """
+        Events with seq > after_seq, from the ring or MongoDB.
+
+        Args:
+            after_seq: Last event id the client received
+
+        Returns:
+            (events, complete). complete is False when the MongoDB replay
+            hit REPLAY_LIMIT before reaching the ring; the client should
+            reconnect from the last event to get the rest.
+        """
+        if self.last_seq is not None and after_seq >= self.last_seq:
+            return [], True
+        if self.ring and self.ring[0]["seq"] <= after_seq + 1:
+            return [e for e in self.ring if e["seq"] > after_seq], True
+
+        from .db import get_alert_transitions
+        events = get_alert_transitions(after_seq, REPLAY_LIMIT)
+        replayed_to = events[-1]["seq"] if events else after_seq
+        reaches_ring = bool(self.ring) and self.ring[0]["seq"] <= replayed_to + 1
+        if len(events) >= REPLAY_LIMIT and not reaches_ring:
+            return events, False
+
+        # Transitions newer than the MongoDB read (or not yet written)
+        events += [e for e in self.ring if e["seq"] > replayed_to]
+        return events, True
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+
+def matches(event: Dict, severity: str = None, address: str = None) -> bool:
+    """Stream filters (severity / address) for one event."""
+    alert = event["alert"]
+    if severity is not None and alert.get("severity") != severity:
+        return False
+    if address is not None and alert.get("address") != address:
+        return False
+    return True
+
+
+alert_feed = AlertFeed()
@@ -3,12 +3,18 @@ Alert System for Xandeum pNode Analytics
 
 Generates alerts based on node metrics and thresholds.
 Identifies problematic nodes automatically.
+
+AlertEngine evaluates alerts once per ingestion cycle and tracks their
+open/resolved lifecycle; AlertIndex serves the API from that state.
 """
 
+import logging
 import time
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 from .config import CACHE_TTL
 
+logger = logging.getLogger(__name__)
+
 # Alert thresholds (configurable)
 THRESHOLDS = {
     "uptime": {
@@ -322,4 +328,193 @@ def filter_alerts(alerts: List[Dict], severity: str = None, alert_type: str = No
     if alert_type:
         filtered = [a for a in filtered if a.get("type") == alert_type]
     
-    return filtered
\ No newline at end of file
+    return filtered
+
+
+# ============================================================================
+# ALERT ENGINE (evaluated once per ingestion cycle)
+# ============================================================================
+
+SEVERITIES = ("critical", "warning", "info")
+
+
+def make_alert_id(address: str, alert: Dict) -> str:
+    """Stable alert identity: one open alert per address, type and severity."""
+    return f"{address}|{alert.get('type')}|{alert.get('severity')}"
+
+
+class AlertIndex:
+    """
+    Read-only index over the open alerts of one cycle.
+
+    Attributes:
+        by_address: address -> open alerts (in check order)
+        by_severity: severity -> open alerts
+        by_type: alert type -> open alerts
+        evaluated_at: When the alerts were evaluated
+        last_seq: Sequence number of the latest transition
+    """
+
+    def __init__(self, node_alerts: Dict[str, List[Dict]], evaluated_at: Optional[int], last_seq: int):
+        self.by_address = {address: list(alerts) for address, alerts in node_alerts.items()}
+        self.by_severity = {severity: [] for severity in SEVERITIES}
+        self.by_type = {}
+        for alerts in self.by_address.values():
+            for alert in alerts:
+                self.by_severity.setdefault(alert.get("severity", "info"), []).append(alert)
+                self.by_type.setdefault(alert.get("type", "unknown"), []).append(alert)
+        self.evaluated_at = evaluated_at
+        self.last_seq = last_seq
+        self._critical_nodes = None
+
+    def for_node(self, address: str, severity: str = None) -> List[Dict]:
+        """Open alerts for one node, optionally filtered by severity."""
+        alerts = self.by_address.get(address, [])
+        if severity:
+            alerts = [a for a in alerts if a.get("severity") == severity]
+        return alerts
+
+    def select(self, severity: str = None, alert_type: str = None) -> List[Dict]:
+        """
+        Open alerts matching severity and/or type.
+
+        Args:
+            severity: Filter by severity (critical, warning, info)
+            alert_type: Filter by type (offline, low_uptime, etc.)
+        """
+        if severity and alert_type:
+            return [a for a in self.by_type.get(alert_type, []) if a.get("severity") == severity]
+        if severity:
+            return self.by_severity.get(severity, [])
+        if alert_type:
+            return self.by_type.get(alert_type, [])
+        return [alert for alerts in self.by_address.values() for alert in alerts]
+
+    def critical_nodes(self) -> List[Dict]:
+        """Nodes with at least one critical alert, most alerts first."""
+        if self._critical_nodes is None:
+            critical = {}
+            for alert in self.by_severity.get("critical", []):
+                critical.setdefault(alert["address"], []).append(alert)
+            self._critical_nodes = sorted(
+                (
+                    {
+                        "address": address,
+                        "alert_count": len(self.by_address[address]),
+                        "critical_alerts": alerts,
+                    }
+                    for address, alerts in critical.items()
+                ),
+                key=lambda x: x["alert_count"],
+                reverse=True
+            )
+        return self._critical_nodes
+
+
+class AlertEngine:
+    """
+    Keeps the open alerts for every node and their lifecycle.
+
+    evaluate() runs once per ingestion cycle. Only nodes that were added,
+    changed or removed since the last cycle are re-checked, plus offline
+    nodes (their offline duration grows every cycle) and refreshed nodes
+    whose uptime can still open or resolve low_uptime. Each alert that opens
+    or resolves gets the next sequence number; alerts that stay open keep
+    their opened_at/opened_seq and only refresh their current value.
+    """
+
+    def __init__(self):
+        self.node_alerts: Dict[str, List[Dict]] = {}
+        self.seq = 0
+        self.evaluated_at: Optional[int] = None
+        self._needs_full_pass = True
+
+    def restore(self, open_alerts: Iterable[Dict], last_seq: int = 0):
+        """
+        Load alert state persisted by an earlier process.
+
+        Args:
+            open_alerts: Open alert documents
+            last_seq: Highest transition sequence number stored
+        """
+        for alert in open_alerts:
+            self.node_alerts.setdefault(alert["address"], []).append(alert)
+        self.seq = max(self.seq, last_seq)
+        self._needs_full_pass = True
+
+    def _evaluate_node(self, address: str, node: Optional[Dict], now: int,
+                       opened: List[Dict], resolved: List[Dict]):
+        previous = {a["alert_id"]: a for a in self.node_alerts.get(address, [])}
+        current = []
+
+        if node is not None:
+            try:
+                checks = check_node_alerts(node)
+            except Exception as e:
+                logger.error(f"Alert check failed for {address}: {e}")
+                return  # Keep previous state for this node
+
+            for alert in checks:
+                alert_id = make_alert_id(address, alert)
+                alert["alert_id"] = alert_id
+                alert["address"] = address
+                old = previous.pop(alert_id, None)
+                if old is not None:
+                    alert["opened_at"] = old["opened_at"]
+                    alert["opened_seq"] = old["opened_seq"]
+                else:
+                    self.seq += 1
+                    alert["opened_at"] = now
+                    alert["opened_seq"] = self.seq
+                    opened.append(alert)
+                current.append(alert)
+
+        for old in previous.values():
+            self.seq += 1
+            resolved.append(dict(old, resolved_at=now, resolved_seq=self.seq))
+
+        if current:
+            self.node_alerts[address] = current
+        else:
+            self.node_alerts.pop(address, None)
+
+    def evaluate(self, nodes_by_address: Dict[str, Dict], diff=None,
+                 now: int = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Evaluate alerts for one cycle.
+
+        Args:
+            nodes_by_address: Unified nodes of this cycle
+            diff: NodeDiff from the previous cycle (None = check every node)
+            now: Evaluation timestamp
+
+        Returns:
+            (opened, resolved) alert lists
+        """
+        now = now or int(time.time())
+        opened, resolved = [], []
+
+        if diff is None or self._needs_full_pass:
+            addresses = set(nodes_by_address) | set(self.node_alerts)
+        else:
+            addresses = set(diff.added) | set(diff.changed) | set(diff.removed)
+            addresses.update(
+                address for address, node in nodes_by_address.items()
+                if not node.get("is_online", False)
+            )
+            # Uptime-only moves matter when they can open or resolve low_uptime
+            addresses.update(
+                address for address, node in diff.refreshed.items()
+                if address in self.node_alerts or node.get("uptime", 0) < THRESHOLDS["uptime"]["warning"]
+            )
+
+        for address in sorted(addresses):
+            self._evaluate_node(address, nodes_by_address.get(address), now, opened, resolved)
+
+        self._needs_full_pass = False
+        self.evaluated_at = now
+        return opened, resolved
+
+    def index(self) -> AlertIndex:
+        """Build the read-only index for the current state."""
+        return AlertIndex(self.node_alerts, self.evaluated_at, self.seq)
@@ -7,6 +7,15 @@ MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB = os.getenv("MONGO_DB", "xandeum-monitor")
 CACHE_TTL = int(os.getenv("CACHE_TTL", 60))
 
+# Store network snapshot history in a MongoDB time-series collection
+# (MongoDB 6.0+); existing history is migrated on startup
+HISTORY_TIMESERIES = os.getenv("HISTORY_TIMESERIES", "false").lower() == "true"
+
+# Directory for per-cycle static JSON pages (empty = disabled) and how many
+# previous versions to keep
+STATIC_DIR = os.getenv("STATIC_DIR", "")
+STATIC_KEEP_VERSIONS = int(os.getenv("STATIC_KEEP_VERSIONS", 3))
+
 # Parse IP_NODES from environment variable
 IP_NODES_ENV = os.getenv("IP_NODES", "")
 if IP_NODES_ENV:
@@ -1,9 +1,13 @@
 # app/db.py
+from pymongo import DeleteOne, InsertOne, UpdateOne
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
-from .config import MONGO_URI, MONGO_DB, CACHE_TTL
+from .config import MONGO_URI, MONGO_DB, CACHE_TTL, HISTORY_TIMESERIES
+from . import presence, history_buckets, rollups
 import time
 import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +19,13 @@ nodes_current = db["pnodes_snapshot"]        # Single snapshot document
 pnodes_registry = db["pnodes_registry"]      # Persistent registry (one doc per ADDRESS)
 pnodes_status = db["pnodes_status"]          # Lightweight status store (ADDRESS -> status)
 pnodes_snapshots = db["pnodes_snapshots"]    # Historical snapshots (time-series)
-pnodes_node_history = db["pnodes_node_history"]  # Per-node time-series data
+pnodes_rollups = db["pnodes_rollups"]        # 5m/1h/1d rollups of pnodes_snapshots (one doc per resolution per bucket)
+pnodes_node_history = db["pnodes_node_history"]  # Legacy per-node time-series (one doc per cycle, read-only)
+pnodes_node_buckets = db["pnodes_node_buckets"]  # Per-node time-series (one doc per ADDRESS per hour)
+pnodes_history_catalog = db["pnodes_history_catalog"]  # Per-node history extent (one doc per ADDRESS)
+pnodes_alerts = db["pnodes_alerts"]          # Alert lifecycle (one doc per open->resolved alert)
+pnodes_stats = db["pnodes_stats"]            # Incrementally maintained network counters (one doc per stat)
+pnodes_presence = db["pnodes_presence"]      # Gossip presence bitmaps (one doc per ADDRESS per day bucket)
 
 
 # Optional ping
@@ -34,6 +44,9 @@ def setup_indexes():
     Create proper indexes for performance.
     Call this once on startup.
     """
+    # Must run before anything touches pnodes_snapshots
+    setup_snapshot_collection()
+
     try:
         # Registry: PRIMARY KEY is address (unique)
         pnodes_registry.create_index([("address", 1)], unique=True)
@@ -54,17 +67,33 @@ def setup_indexes():
         # ✨ NEW: Index on last_gossip_drop for flapping detection
         pnodes_registry.create_index([("last_gossip_drop", -1)])
         logger.info("✅ Created index on pnodes_registry.last_gossip_drop")
+
+        # Keyset pagination for /network/consistency (sort field + address tiebreak)
+        pnodes_registry.create_index([("consistency_score", -1), ("address", 1)])
+        pnodes_registry.create_index([("gossip_disappearances", 1), ("address", 1)])
+        logger.info("✅ Created consistency pagination indexes on pnodes_registry")
         
         # Status: PRIMARY KEY is address (unique)
         pnodes_status.create_index([("address", 1)], unique=True)
         logger.info("✅ Created unique index on pnodes_status.address")
         
         # Snapshots: Index on timestamp for time-series queries
+        # (a secondary index on the measurement in time-series mode)
         pnodes_snapshots.create_index([("timestamp", -1)])
         logger.info("✅ Created index on pnodes_snapshots.timestamp")
 
+        # Rollups: range reads per resolution
+        pnodes_rollups.create_index([("resolution", 1), ("timestamp", 1)])
+        logger.info("✅ Created index on pnodes_rollups.resolution+timestamp")
+
         # Create indexes for per-node historical collection
         setup_node_history_indexes()
+
+        # Create indexes for alert lifecycle collection
+        setup_alert_indexes()
+
+        # Create indexes for presence bitmaps
+        setup_presence_indexes()
         
         logger.info("✅ All database indexes created successfully")
     except Exception as e:
@@ -178,6 +207,21 @@ def get_registry_entry(address: str):
     return sanitize_mongo(doc)
 
 
+def get_registry_entries(addresses: list, projection: dict = None) -> dict:
+    """
+    Sanitized registry entries for several addresses in one $in query.
+
+    Args:
+        addresses: IP:port strings
+        projection: Optional MongoDB projection
+
+    Returns:
+        address -> entry, for the addresses that were found
+    """
+    cursor = pnodes_registry.find({"address": {"$in": list(addresses)}}, projection)
+    return {doc["address"]: sanitize_mongo(doc) for doc in cursor}
+
+
 def get_registry_entries_by_pubkey(pubkey: str):
     """
     Get all nodes operated by the same pubkey.
@@ -214,17 +258,128 @@ def prune_old_nodes(days: int = 90):
     """
     threshold = int(time.time()) - days * 24 * 3600
     res = pnodes_registry.delete_many({"last_seen": {"$lt": threshold}})
+
+    # Deleted nodes take their gossip counters with them
+    if res.deleted_count > 0:
+        rebuild_consistency_stats()
+
     return {"deleted_count": res.deleted_count}
 
 
 # -----------------------------
 # Historical Snapshot Tracking
 # -----------------------------
-def save_snapshot_history():
+# A day past the longest growth window (30d), so that window always has an
+# entry at or before its start
+SNAPSHOT_RETENTION_SECONDS = 31 * 86400
+
+# Date field used as timeField in time-series mode (BSON date; the integer
+# "timestamp" stays the field every query uses)
+SNAPSHOT_TIME_FIELD = "time"
+_LEGACY_SNAPSHOTS = "pnodes_snapshots_legacy"
+
+# Whether pnodes_snapshots really is a time-series collection, as found by
+# setup_snapshot_collection() (HISTORY_TIMESERIES until it has run). Writes
+# follow the collection, not the setting, so turning the setting off after
+# a migration doesn't make every insert fail for lack of "time".
+_snapshot_store = {"timeseries": HISTORY_TIMESERIES}
+
+
+def _collection_type(name: str):
+    """"collection", "timeseries", "view" or None if the collection doesn't exist."""
+    for info in db.list_collections(filter={"name": name}):
+        return info.get("type", "collection")
+    return None
+
+
+def setup_snapshot_collection(batch_size: int = 1000):
+    """
+    Create pnodes_snapshots as a time-series collection (HISTORY_TIMESERIES).
+    
+    Migration from a plain collection: it's renamed to
+    pnodes_snapshots_legacy, the time-series collection is created and the
+    entries are copied over in timestamp order, then the legacy collection
+    is dropped. An interrupted copy resumes after the newest copied entry on
+    the next startup. Runs before the fetcher starts, so no entry is written
+    meanwhile.
+    
+    A time-series collection is never converted back: with
+    HISTORY_TIMESERIES off it is kept and written in time-series form.
+    
+    Args:
+        batch_size: Entries per insert_many while copying
+    """
+    try:
+        _migrate_snapshot_collection(batch_size)
+    finally:
+        _snapshot_store["timeseries"] = _collection_type("pnodes_snapshots") == "timeseries"
+
+
+def _migrate_snapshot_collection(batch_size: int):
+    """setup_snapshot_collection() body; the caller records the resulting type."""
+    current_type = _collection_type("pnodes_snapshots")
+    if not HISTORY_TIMESERIES:
+        if current_type == "timeseries":
+            logger.warning(
+                "⚠️  pnodes_snapshots is a time-series collection but HISTORY_TIMESERIES is off; "
+                "keeping time-series writes"
+            )
+        return
+    
+    try:
+        if current_type == "collection":
+            if _collection_type(_LEGACY_SNAPSHOTS) is not None:
+                logger.error(f"❌ Both pnodes_snapshots and {_LEGACY_SNAPSHOTS} exist, skipping time-series migration")
+                return
+            pnodes_snapshots.rename(_LEGACY_SNAPSHOTS)
+            logger.info("🔁 Renamed pnodes_snapshots for time-series migration")
+            current_type = None
+        
+        if current_type is None:
+            db.create_collection(
+                "pnodes_snapshots",
+                timeseries={"timeField": SNAPSHOT_TIME_FIELD, "granularity": "minutes"},
+                expireAfterSeconds=SNAPSHOT_RETENTION_SECONDS
+            )
+            logger.info("✅ Created time-series collection pnodes_snapshots")
+        else:
+            # Collections created before the retention changed
+            db.command("collMod", "pnodes_snapshots", expireAfterSeconds=SNAPSHOT_RETENTION_SECONDS)
+        
+        if _collection_type(_LEGACY_SNAPSHOTS) is None:
+            return
+        
+        legacy = db[_LEGACY_SNAPSHOTS]
+        newest = pnodes_snapshots.find_one({}, {"timestamp": 1}, sort=[("timestamp", -1)])
+        query = {"timestamp": {"$gt": newest["timestamp"]}} if newest else {}
+        
+        batch, copied = [], 0
+        for entry in legacy.find(query, {"_id": 0}).sort("timestamp", 1):
+            entry[SNAPSHOT_TIME_FIELD] = datetime.fromtimestamp(entry["timestamp"], timezone.utc)
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                pnodes_snapshots.insert_many(batch, ordered=True)
+                copied += len(batch)
+                batch = []
+        if batch:
+            pnodes_snapshots.insert_many(batch, ordered=True)
+            copied += len(batch)
+        
+        legacy.drop()
+        logger.info(f"✅ Migrated {copied} snapshot(s) to the time-series collection")
+    except Exception as e:
+        logger.error(f"❌ Failed to set up time-series snapshots: {e}")
+
+
+def save_snapshot_history(aggregates: dict = None):
     """
     Enhanced snapshot history with more detailed metrics.
     Saves lightweight summary every CACHE_TTL seconds.
     Keeps 30 days of data for trend analysis.
+
+    Args:
+        aggregates: Network aggregates for this cycle (see aggregates.py).
+                    Read from the stored snapshot if omitted.
     """
     snapshot = nodes_current.find_one({"_id": "snapshot"})
     if not snapshot or "data" not in snapshot:
@@ -235,59 +390,18 @@ def save_snapshot_history():
     
     # Extract summary
     summary = data.get("summary", {})
-    
-    # Calculate version distribution
-    version_counts = {}
-    online_by_version = {}
-    public_count = 0
-    private_count = 0
-    
-    for pnode in data.get("merged_pnodes_unique", []):
-        v = pnode.get("version") or "unknown"
-        version_counts[v] = version_counts.get(v, 0) + 1
-        
-        # Track online status by version (for health analysis)
-        if v not in online_by_version:
-            online_by_version[v] = {"total": 0, "online": 0}
-        online_by_version[v]["total"] += 1
-        
-        # Count public vs private
-        if pnode.get("is_public"):
-            public_count += 1
-        else:
-            private_count += 1
-    
-    # Calculate storage metrics
-    total_storage_committed = 0
-    total_storage_used = 0
-    storage_usage_samples = []
-    
-    for pnode in data.get("merged_pnodes_unique", []):
-        committed = pnode.get("storage_committed") or 0
-        used = pnode.get("storage_used") or 0
-        usage_pct = pnode.get("storage_usage_percent") or 0
-        
-        total_storage_committed += committed
-        total_storage_used += used
-        if usage_pct > 0:
-            storage_usage_samples.append(usage_pct)
-    
-    # Calculate average storage usage
-    avg_storage_usage = (
-        sum(storage_usage_samples) / len(storage_usage_samples) 
-        if storage_usage_samples else 0
-    )
-    
-    # Calculate peer connectivity stats
-    peer_count_samples = []
-    for pnode in data.get("merged_pnodes_unique", []):
-        peer_sources = pnode.get("peer_sources") or []
-        peer_count_samples.append(len(peer_sources))
-    
-    avg_peer_count = (
-        sum(peer_count_samples) / len(peer_count_samples)
-        if peer_count_samples else 0
-    )
+
+    # Version, storage and peer metrics are maintained incrementally by the
+    # view publisher and stored with the snapshot
+    if aggregates is None:
+        aggregates = data.get("aggregates")
+    if not aggregates:
+        logger.warning("⚠️  No network aggregates on snapshot, skipping history entry")
+        return
+
+    version_counts = aggregates.get("version_distribution", {})
+    total_storage_committed = aggregates.get("online_storage_committed", 0)
+    total_storage_used = aggregates.get("online_storage_used", 0)
     
     # Build enhanced history entry
     history_entry = {
@@ -296,8 +410,8 @@ def save_snapshot_history():
         # Node counts
         "total_pnodes": summary.get("total_pnodes", 0),
         "total_ip_nodes": len(data.get("nodes", {})),
-        "public_pnodes": public_count,
-        "private_pnodes": private_count,
+        "public_pnodes": aggregates.get("public_nodes", 0),
+        "private_pnodes": aggregates.get("private_nodes", 0),
         
         # System metrics
         "avg_cpu_percent": summary.get("avg_cpu_percent", 0),
@@ -308,7 +422,7 @@ def save_snapshot_history():
         # Storage metrics
         "total_storage_committed": total_storage_committed,
         "total_storage_used": total_storage_used,
-        "avg_storage_usage_percent": round(avg_storage_usage, 2),
+        "avg_storage_usage_percent": aggregates.get("avg_storage_usage_percent", 0),
         "storage_utilization_ratio": round(
             (total_storage_used / total_storage_committed * 100) 
             if total_storage_committed > 0 else 0, 
@@ -316,7 +430,7 @@ def save_snapshot_history():
         ),
         
         # Network metrics
-        "avg_peer_count": round(avg_peer_count, 2),
+        "avg_peer_count": aggregates.get("avg_peer_count", 0),
         "version_distribution": version_counts,
         "version_diversity_index": len(version_counts),  # Higher = more fragmented
         
@@ -324,42 +438,151 @@ def save_snapshot_history():
         "timestamp_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
     }
     
+    if _snapshot_store["timeseries"]:
+        history_entry[SNAPSHOT_TIME_FIELD] = datetime.fromtimestamp(timestamp, timezone.utc)
+    
     try:
         pnodes_snapshots.insert_one(history_entry)
         logger.info(f"✅ Enhanced snapshot history saved (timestamp: {timestamp})")
     except Exception as e:
         logger.error(f"❌ Failed to save snapshot history: {e}")
     
-    # Prune old snapshots (keep 30 days)
-    thirty_days_ago = timestamp - (30 * 86400)
+    # Fold the entry into the 5m/1h/1d rollups
     try:
-        result = pnodes_snapshots.delete_many({"timestamp": {"$lt": thirty_days_ago}})
-        if result.deleted_count > 0:
-            logger.info(f"🗑️  Pruned {result.deleted_count} old snapshot(s)")
+        pnodes_rollups.bulk_write(rollups.rollup_updates(history_entry), ordered=False)
     except Exception as e:
-        logger.error(f"❌ Failed to prune old snapshots: {e}")
+        logger.error(f"❌ Failed to update history rollups: {e}")
+    
+    # Prune old snapshots (keep 30 days); time-series mode expires them natively
+    if not _snapshot_store["timeseries"]:
+        thirty_days_ago = timestamp - SNAPSHOT_RETENTION_SECONDS
+        try:
+            result = pnodes_snapshots.delete_many({"timestamp": {"$lt": thirty_days_ago}})
+            if result.deleted_count > 0:
+                logger.info(f"🗑️  Pruned {result.deleted_count} old snapshot(s)")
+        except Exception as e:
+            logger.error(f"❌ Failed to prune old snapshots: {e}")
+    
+    prune_rollups(timestamp)
+    
+    # Precompute growth for the standard windows (served from cache)
+    refresh_growth_cache(history_entry)
 
 
-def get_growth_metrics(hours: int = 24):
+def prune_rollups(now: int = None):
     """
-    Calculate growth metrics by comparing current state to N hours ago.
+    Delete rollup buckets past their resolution's retention.
     
     Args:
-        hours: How many hours back to compare
+        now: Current timestamp
+    """
+    now = int(now or time.time())
+    for resolution, seconds in rollups.RETENTION_SECONDS.items():
+        try:
+            result = pnodes_rollups.delete_many({
+                "resolution": resolution,
+                "timestamp": {"$lt": now - seconds}
+            })
+            if result.deleted_count > 0:
+                logger.info(f"🗑️  Pruned {result.deleted_count} old {resolution} rollup(s)")
+        except Exception as e:
+            logger.error(f"❌ Failed to prune {resolution} rollups: {e}")
+
+
+def backfill_rollups(batch_size: int = 500):
+    """
+    Build rollups from the raw snapshots if none exist yet.
+    Call this once on startup (after setup_indexes).
+    
+    Args:
+        batch_size: Raw snapshots per bulk write
+    """
+    try:
+        if pnodes_rollups.estimated_document_count() > 0:
+            return
         
+        operations, count = [], 0
+        for entry in pnodes_snapshots.find({}, {"_id": 0}).sort("timestamp", 1):
+            operations.extend(rollups.rollup_updates(entry))
+            count += 1
+            if count % batch_size == 0:
+                pnodes_rollups.bulk_write(operations, ordered=True)
+                operations = []
+        if operations:
+            pnodes_rollups.bulk_write(operations, ordered=True)
+        
+        if count:
+            logger.info(f"✅ Built history rollups from {count} snapshot(s)")
+    except Exception as e:
+        logger.error(f"❌ Failed to backfill history rollups: {e}")
+
+
+def get_history_points(start_time: int, end_time: int = None, resolution: str = "raw") -> list:
+    """
+    Network history points for a time range at one resolution.
+    
+    Args:
+        start_time: First timestamp (inclusive; rollups from the bucket containing it)
+        end_time: Last timestamp (inclusive, default: now)
+        resolution: "raw" or a rollups.RESOLUTIONS key
+    
     Returns:
-        dict with growth metrics
+        Points in the snapshot history entry shape, oldest first
     """
-    now = int(time.time())
-    past_time = now - (hours * 3600)
+    return list(iter_history_points(start_time, end_time, resolution))
+
+
+def iter_history_points(start_time: int, end_time: int = None, resolution: str = "raw",
+                        batch_size: int = 500):
+    """
+    get_history_points() as a generator over the cursor, for streaming.
+    
+    Only one cursor batch is held in memory at a time.
+    """
+    end_time = int(end_time or time.time())
     
-    # Get current snapshot
-    current = pnodes_snapshots.find_one({"timestamp": {"$lte": now}}, sort=[("timestamp", -1)])
+    if resolution == "raw":
+        cursor = pnodes_snapshots.find(
+            {"timestamp": {"$gte": start_time, "$lte": end_time}},
+            {SNAPSHOT_TIME_FIELD: 0}
+        ).sort("timestamp", 1).batch_size(batch_size)
+        for doc in cursor:
+            yield sanitize_mongo(doc)
+        return
     
-    # Get snapshot from N hours ago (closest match)
-    past = pnodes_snapshots.find_one({"timestamp": {"$lte": past_time}}, sort=[("timestamp", -1)])
+    cursor = pnodes_rollups.find({
+        "resolution": resolution,
+        "timestamp": {"$gte": rollups.bucket_start(start_time, resolution), "$lte": end_time}
+    }).sort("timestamp", 1).batch_size(batch_size)
+    for doc in cursor:
+        yield rollups.rollup_point(doc)
+
+
+# Growth windows precomputed with every history entry (name -> hours)
+GROWTH_WINDOWS = {"1h": 1, "24h": 24, "7d": 168, "30d": 720}
+
+# Other windows cached until the next entry (least recently used dropped)
+GROWTH_CACHE_SIZE = 32
+
+# Latest history entry, its precomputed standard windows and other windows
+# asked for since (hours -> growth dict). Filled by save_snapshot_history,
+# so standard windows cost no query.
+_growth_cache = {"entry": None, "standard": {}, "windows": OrderedDict()}
+
+
+def _growth_between(current: dict, past: dict, hours: int) -> dict:
+    """
+    Growth metrics between two snapshot history entries.
     
-    if not current or not past:
+    Args:
+        current: Latest entry
+        past: Entry (or rollup last values) from N hours ago
+        hours: Window length, reported as period_hours
+    
+    Returns:
+        dict with growth metrics
+    """
+    if not current or not past or past.get("timestamp", 0) >= current.get("timestamp", 0):
         return {
             "available": False,
             "message": "Insufficient historical data for growth calculation"
@@ -412,6 +635,163 @@ def get_growth_metrics(hours: int = 24):
     }
 
 
+def _exact_growth(current: dict, hours: int) -> dict:
+    """
+    Growth of the current entry against the closest entry at or before
+    current - hours (one indexed find_one on pnodes_snapshots).
+    
+    Args:
+        current: Latest snapshot history entry
+        hours: How many hours back to compare
+    """
+    past_time = current["timestamp"] - hours * 3600
+    
+    try:
+        past = pnodes_snapshots.find_one({"timestamp": {"$lte": past_time}}, sort=[("timestamp", -1)])
+    except Exception as e:
+        logger.error(f"❌ Failed to read snapshot history for {hours}h growth: {e}")
+        past = None
+    
+    growth = _growth_between(current, past, hours)
+    if growth["available"]:
+        growth["comparison"]["requested_start_time"] = past_time
+        growth["comparison"]["resolution"] = "raw"
+    return growth
+
+
+def _compute_growth(current: dict, hours: int) -> dict:
+    """
+    Growth of the current entry over the last N hours, read from rollups.
+    
+    Used for windows other than GROWTH_WINDOWS. The past state is the last
+    value of the finest rollup bucket (still retained) that contains
+    current - hours, so the lookup is one indexed find_one however long the
+    window is. That is an approximation: the bucket's last sample can be up
+    to one bucket (5 minutes) later than current - hours, rather than the
+    closest entry at or before it. The response's comparison block carries
+    both times.
+    
+    Args:
+        current: Latest snapshot history entry
+        hours: How many hours back to compare
+    """
+    past_time = current["timestamp"] - hours * 3600
+    resolution = rollups.resolution_for_age(hours * 3600)
+    
+    try:
+        doc = pnodes_rollups.find_one(
+            {"resolution": resolution, "timestamp": {"$lte": past_time}},
+            sort=[("timestamp", -1)]
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to read rollups for {hours}h growth: {e}")
+        doc = None
+    
+    growth = _growth_between(current, rollups.last_entry(doc) if doc else None, hours)
+    if growth["available"]:
+        growth["comparison"]["requested_start_time"] = past_time
+        growth["comparison"]["resolution"] = resolution
+    return growth
+
+
+def refresh_growth_cache(history_entry: dict) -> dict:
+    """
+    Precompute GROWTH_WINDOWS for a new history entry.
+    
+    Each window compares against the closest raw entry at or before its
+    start (four indexed find_ones). Keeps them in memory for
+    get_growth_metrics and stores them with the current snapshot
+    ("data.growth") so they survive restarts.
+    
+    Args:
+        history_entry: Entry just written by save_snapshot_history
+    
+    Returns:
+        window name -> growth dict
+    """
+    growth = {
+        name: _exact_growth(history_entry, hours)
+        for name, hours in GROWTH_WINDOWS.items()
+    }
+    _growth_cache["entry"] = history_entry
+    # Unavailable windows (read error or not enough history) are retried on request
+    _growth_cache["standard"] = {
+        GROWTH_WINDOWS[name]: value for name, value in growth.items() if value["available"]
+    }
+    _growth_cache["windows"] = OrderedDict()
+    
+    try:
+        nodes_current.update_one({"_id": "snapshot"}, {"$set": {"data.growth": growth}})
+    except Exception as e:
+        logger.error(f"❌ Failed to store growth metrics: {e}")
+    
+    return growth
+
+
+def _load_growth_cache():
+    """Fill the growth cache from the stored snapshot (cold start)."""
+    entry = pnodes_snapshots.find_one({}, sort=[("timestamp", -1)])
+    if not entry:
+        return
+    
+    snapshot = nodes_current.find_one({"_id": "snapshot"}, {"data.growth": 1}) or {}
+    stored = (snapshot.get("data") or {}).get("growth") or {}
+    standard = {}
+    for name, hours in GROWTH_WINDOWS.items():
+        value = stored.get(name)
+        if value and (value.get("comparison") or {}).get("end_time") == entry["timestamp"]:
+            standard[hours] = value
+    
+    _growth_cache["entry"] = entry
+    _growth_cache["standard"] = standard
+    _growth_cache["windows"] = OrderedDict()
+
+
+def get_growth_metrics(hours: int = 24):
+    """
+    Calculate growth metrics by comparing current state to N hours ago.
+    
+    Standard windows (GROWTH_WINDOWS) are exact and come from the cache
+    filled when the history entry was written. Other windows are read from
+    rollups and kept until the next entry, up to GROWTH_CACHE_SIZE of them.
+    Only available results are cached, so a failed read is retried on the
+    next call.
+    
+    Args:
+        hours: How many hours back to compare
+        
+    Returns:
+        dict with growth metrics
+    """
+    if _growth_cache["entry"] is None:
+        _load_growth_cache()
+    
+    current = _growth_cache["entry"]
+    if current is None:
+        return _growth_between(None, None, hours)
+    
+    if hours in GROWTH_WINDOWS.values():
+        cached = _growth_cache["standard"].get(hours)
+        if cached is None:
+            cached = _exact_growth(current, hours)
+            if cached["available"]:
+                _growth_cache["standard"][hours] = cached
+        return cached
+    
+    windows = _growth_cache["windows"]
+    cached = windows.get(hours)
+    if cached is not None:
+        windows.move_to_end(hours)
+        return cached
+    
+    growth = _compute_growth(current, hours)
+    if growth["available"]:
+        windows[hours] = growth
+        if len(windows) > GROWTH_CACHE_SIZE:
+            windows.popitem(last=False)
+    return growth
+
+
 def get_node_history(address: str, days: int = 30):
     """
     Get historical data for a specific node.
@@ -437,10 +817,97 @@ def get_node_history(address: str, days: int = 30):
 # Gossip Consistency Tracking
 # -----------------------------
 
+CONSISTENCY_STATS_ID = "gossip_consistency"
+FLAPPING_THRESHOLD = 0.8
+
+
+def _add_consistency_delta(inc: dict, old_score, new_score, appearances: int = 0, disappearances: int = 0):
+    """
+    Accumulate the change of one registry node into network consistency counters.
+
+    Args:
+        inc: $inc document being built for this cycle
+        old_score: consistency_score before the update (None if not tracked)
+        new_score: consistency_score after the update
+        appearances: Change in gossip_appearances
+        disappearances: Change in gossip_disappearances
+    """
+    for score, sign in ((old_score, -1), (new_score, 1)):
+        if score is None:
+            continue
+        bucket = "flapping_nodes" if score < FLAPPING_THRESHOLD else "stable_nodes"
+        inc["tracked_nodes"] = inc.get("tracked_nodes", 0) + sign
+        inc["score_sum"] = inc.get("score_sum", 0) + sign * score
+        inc[bucket] = inc.get(bucket, 0) + sign
+    inc["total_appearances"] = inc.get("total_appearances", 0) + appearances
+    inc["total_disappearances"] = inc.get("total_disappearances", 0) + disappearances
+
+
+def rebuild_consistency_stats() -> dict:
+    """
+    Recompute network consistency counters from the registry (one pass).
+
+    Used when the stats document is missing and after registry pruning;
+    otherwise track_gossip_changes() keeps it current with $inc deltas.
+    """
+    pipeline = [
+        {"$match": {"consistency_score": {"$ne": None}}},
+        {"$group": {
+            "_id": None,
+            "tracked_nodes": {"$sum": 1},
+            "score_sum": {"$sum": "$consistency_score"},
+            "flapping_nodes": {"$sum": {"$cond": [{"$lt": ["$consistency_score", FLAPPING_THRESHOLD]}, 1, 0]}},
+            "stable_nodes": {"$sum": {"$cond": [{"$gte": ["$consistency_score", FLAPPING_THRESHOLD]}, 1, 0]}},
+            "total_appearances": {"$sum": {"$ifNull": ["$gossip_appearances", 0]}},
+            "total_disappearances": {"$sum": {"$ifNull": ["$gossip_disappearances", 0]}},
+        }}
+    ]
+    result = next(pnodes_registry.aggregate(pipeline), None) or {}
+    stats = {
+        "tracked_nodes": result.get("tracked_nodes", 0),
+        "score_sum": result.get("score_sum", 0.0),
+        "flapping_nodes": result.get("flapping_nodes", 0),
+        "stable_nodes": result.get("stable_nodes", 0),
+        "total_appearances": result.get("total_appearances", 0),
+        "total_disappearances": result.get("total_disappearances", 0),
+        "updated_at": int(time.time()),
+    }
+    pnodes_stats.replace_one({"_id": CONSISTENCY_STATS_ID}, dict(stats, _id=CONSISTENCY_STATS_ID), upsert=True)
+    logger.info(f"✅ Rebuilt gossip consistency stats ({stats['tracked_nodes']} nodes)")
+    return stats
+
+
+def _save_consistency_delta(inc: dict):
+    """Apply one cycle's consistency deltas (rebuilding if no stats exist yet)."""
+    try:
+        if not pnodes_stats.count_documents({"_id": CONSISTENCY_STATS_ID}, limit=1):
+            rebuild_consistency_stats()
+            return
+        inc = {k: v for k, v in inc.items() if v}
+        if inc:
+            pnodes_stats.update_one(
+                {"_id": CONSISTENCY_STATS_ID},
+                {"$inc": inc, "$set": {"updated_at": int(time.time())}}
+            )
+    except Exception as e:
+        logger.error(f"❌ Failed to update gossip consistency stats: {e}")
+
+
+def get_consistency_stats() -> dict:
+    """
+    Network-wide gossip consistency counters (see track_gossip_changes()).
+    """
+    stats = pnodes_stats.find_one({"_id": CONSISTENCY_STATS_ID})
+    if not stats:
+        stats = rebuild_consistency_stats()
+    return stats
+
+
 def track_gossip_changes(current_pnodes: list) -> dict:
     """
     Track gossip consistency by comparing current snapshot to previous.
-    Persists appearance/disappearance data to MongoDB.
+    Persists appearance/disappearance data to MongoDB, and applies the
+    resulting change to the network-wide counters in pnodes_stats.
     
     Args:
         current_pnodes: List of pNodes in current snapshot
@@ -460,6 +927,9 @@ def track_gossip_changes(current_pnodes: list) -> dict:
     # Get previous snapshot to compare
     previous_snapshot = nodes_current.find_one({"_id": "snapshot"})
     
+    # Network counter deltas for this cycle
+    inc = {}
+    
     # If no previous snapshot, just initialize all nodes
     if not previous_snapshot or "data" not in previous_snapshot:
         logger.info("No previous snapshot - initializing gossip tracking")
@@ -468,7 +938,7 @@ def track_gossip_changes(current_pnodes: list) -> dict:
         now = int(time.time())
         for addr in current_addresses:
             try:
-                pnodes_registry.update_one(
+                result = pnodes_registry.update_one(
                     {"address": addr},
                     {
                         "$setOnInsert": {
@@ -481,9 +951,12 @@ def track_gossip_changes(current_pnodes: list) -> dict:
                     },
                     upsert=True
                 )
+                if result.upserted_id is not None:
+                    _add_consistency_delta(inc, None, 1.0, appearances=1)
             except Exception as e:
                 logger.error(f"Failed to initialize gossip tracking for {addr}: {e}")
         
+        _save_consistency_delta(inc)
         return {
             "new_appearances": len(current_addresses),
             "disappearances": 0,
@@ -535,6 +1008,9 @@ def track_gossip_changes(current_pnodes: list) -> dict:
                         }
                     }
                 )
+                _add_consistency_delta(
+                    inc, registry_entry.get("consistency_score"), consistency_score, appearances=1
+                )
                 
                 logger.info(f"✅ Node {address} reappeared in gossip (consistency: {consistency_score:.2%})")
             else:
@@ -552,6 +1028,7 @@ def track_gossip_changes(current_pnodes: list) -> dict:
                     },
                     upsert=True
                 )
+                _add_consistency_delta(inc, None, 1.0, appearances=1)
                 logger.info(f"🆕 New node {address} appeared in gossip")
                 
         except Exception as e:
@@ -585,6 +1062,9 @@ def track_gossip_changes(current_pnodes: list) -> dict:
                         }
                     }
                 )
+                _add_consistency_delta(
+                    inc, registry_entry.get("consistency_score"), consistency_score, disappearances=1
+                )
                 
                 # Log warning if flapping (consistency < 80%)
                 if consistency_score < 0.8:
@@ -611,11 +1091,14 @@ def track_gossip_changes(current_pnodes: list) -> dict:
                     },
                     upsert=True
                 )
+                _add_consistency_delta(inc, None, 0.0, disappearances=1)
                 logger.warning(f"❓ Unknown node {address} disappeared")
                 
         except Exception as e:
             logger.error(f"Failed to track disappearance for {address}: {e}")
     
+    _save_consistency_delta(inc)
+    
     # Return summary
     summary = {
         "new_appearances": len(new_appearances),
@@ -644,62 +1127,186 @@ def setup_node_history_indexes():
     Call this in setup_indexes().
     """
     try:
-        # Compound index on address + timestamp for efficient queries
-        pnodes_node_history.create_index([("address", 1), ("timestamp", -1)])
-        logger.info("✅ Created index on pnodes_node_history.address+timestamp")
+        # Compound index on address + hour for per-node range reads
+        pnodes_node_buckets.create_index([("address", 1), ("hour", -1)])
+        logger.info("✅ Created index on pnodes_node_buckets.address+hour")
         
-        # Index on timestamp for pruning old data
+        # Index on hour for pruning old data
+        pnodes_node_buckets.create_index([("hour", -1)])
+        logger.info("✅ Created index on pnodes_node_buckets.hour")
+        
+        # History catalog: nodes with the most points first
+        pnodes_history_catalog.create_index([("points", -1)])
+        logger.info("✅ Created index on pnodes_history_catalog.points")
+        
+        # Legacy per-cycle documents (read until they age out)
+        pnodes_node_history.create_index([("address", 1), ("timestamp", -1)])
         pnodes_node_history.create_index([("timestamp", -1)])
-        logger.info("✅ Created index on pnodes_node_history.timestamp")
+        logger.info("✅ Created indexes on pnodes_node_history (legacy)")
         
     except Exception as e:
         logger.error(f"❌ Error creating node history indexes: {e}")
 
 
-def save_node_snapshot(address: str, node_data: dict):
+def save_node_snapshots(nodes, timestamp: int = None):
     """
-    Save a snapshot of a single node's metrics.
-    Called during background fetch for each online node.
+    Append this cycle's sample for every node to its hourly history bucket.
+    Called once per background fetch with all nodes (one bulk write).
     
     Args:
-        address: Node address (IP:port)
-        node_data: Dict with node metrics
+        nodes: Unified node dicts (must have "address")
+        timestamp: Cycle timestamp (snapshot last_updated)
     """
-    timestamp = int(time.time())
+    timestamp = int(timestamp or time.time())
     
-    snapshot = {
-        "address": address,
-        "timestamp": timestamp,
-        "timestamp_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
-        
-        # Core metrics
-        "is_online": node_data.get("is_online", True),
-        "version": node_data.get("version", "unknown"),
-        "uptime": node_data.get("uptime", 0),
-        
-        # Storage metrics
-        "storage_committed": node_data.get("storage_committed", 0),
-        "storage_used": node_data.get("storage_used", 0),
-        "storage_usage_percent": node_data.get("storage_usage_percent", 0),
-        
-        # Network metrics
-        "peer_count": len(node_data.get("peer_sources", [])),
-        "peer_sources": node_data.get("peer_sources", []),
-        
-        # Scores (if available)
-        "score": node_data.get("score", 0),
-        "trust_score": node_data.get("scores", {}).get("trust", {}).get("score", 0),
-        "capacity_score": node_data.get("scores", {}).get("capacity", {}).get("score", 0),
-        
-        # Public/Private
-        "is_public": node_data.get("is_public", False),
+    operations = [
+        history_buckets.bucket_update(
+            node["address"], history_buckets.node_sample(node, timestamp)
+        )
+        for node in nodes if node.get("address")
+    ]
+    if not operations:
+        return
+    
+    try:
+        pnodes_node_buckets.bulk_write(operations, ordered=False)
+        logger.debug(f"✅ Saved history samples for {len(operations)} nodes")
+    except Exception as e:
+        logger.error(f"❌ Failed to save node history: {e}")
+        return
+    
+    _update_history_catalog(
+        [node["address"] for node in nodes if node.get("address")], timestamp
+    )
+
+
+# -----------------------------
+# History catalog (per-node extent of pnodes_node_buckets)
+# -----------------------------
+
+HISTORY_CATALOG_ID = "node_history"
+
+
+def _update_history_catalog(addresses: list, timestamp: int):
+    """Extend the catalog entries of this cycle's nodes and the global totals."""
+    operations = [
+        UpdateOne(
+            {"_id": address},
+            {
+                "$setOnInsert": {"address": address},
+                "$min": {"first_ts": timestamp},
+                "$max": {"last_ts": timestamp},
+                "$inc": {"points": 1},
+            },
+            upsert=True
+        )
+        for address in addresses
+    ]
+    try:
+        pnodes_history_catalog.bulk_write(operations, ordered=False)
+        pnodes_stats.update_one(
+            {"_id": HISTORY_CATALOG_ID},
+            {
+                "$min": {"first_ts": timestamp},
+                "$max": {"last_ts": timestamp},
+                "$inc": {"points": len(addresses)},
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to update history catalog: {e}")
+
+
+def rebuild_history_catalog() -> dict:
+    """
+    Recompute the history catalog from the buckets (one $group pass).
+    
+    Used when the catalog is missing; otherwise save_node_snapshots() and
+    prune_old_node_history() keep it current.
+    
+    Returns:
+        Global totals ({first_ts, last_ts, points})
+    """
+    pipeline = [
+        {"$group": {
+            "_id": "$address",
+            "first_ts": {"$min": "$first"},
+            "last_ts": {"$max": "$last"},
+            "points": {"$sum": "$count"},
+        }}
+    ]
+    entries = [dict(doc, address=doc["_id"]) for doc in pnodes_node_buckets.aggregate(pipeline)]
+    
+    pnodes_history_catalog.delete_many({})
+    if entries:
+        pnodes_history_catalog.insert_many(entries)
+    
+    totals = {
+        "first_ts": min((e["first_ts"] for e in entries), default=None),
+        "last_ts": max((e["last_ts"] for e in entries), default=None),
+        "points": sum(e["points"] for e in entries),
+    }
+    pnodes_stats.replace_one({"_id": HISTORY_CATALOG_ID}, dict(totals, _id=HISTORY_CATALOG_ID), upsert=True)
+    logger.info(f"✅ Rebuilt history catalog ({len(entries)} nodes)")
+    return totals
+
+
+def _prune_history_catalog(pruned: dict):
+    """
+    Take pruned buckets out of the catalog without rebuilding it.
+    
+    Points are decremented and first_ts moves to each node's oldest
+    remaining bucket; nodes with no history left are dropped.
+    
+    Args:
+        pruned: address -> points deleted
+    """
+    if not pruned:
+        return
+    
+    # Oldest remaining bucket per pruned node. The sort is the address+hour
+    # index read backwards, so $first needs one index entry per node.
+    remaining = {
+        doc["_id"]: doc["first_ts"]
+        for doc in pnodes_node_buckets.aggregate([
+            {"$match": {"address": {"$in": list(pruned)}}},
+            {"$sort": {"address": -1, "hour": 1}},
+            {"$group": {"_id": "$address", "first_ts": {"$first": "$first"}}},
+        ])
     }
     
+    operations = [
+        UpdateOne({"_id": address}, {"$inc": {"points": -points}, "$set": {"first_ts": remaining[address]}})
+        if address in remaining else DeleteOne({"_id": address})
+        for address, points in pruned.items()
+    ]
     try:
-        pnodes_node_history.insert_one(snapshot)
-        logger.debug(f"✅ Saved history snapshot for {address}")
+        pnodes_history_catalog.bulk_write(operations, ordered=False)
+        oldest = pnodes_history_catalog.find_one({}, {"first_ts": 1}, sort=[("first_ts", 1)])
+        update = {"$inc": {"points": -sum(pruned.values())}, "$set": {"first_ts": oldest and oldest["first_ts"]}}
+        if oldest is None:
+            update["$set"]["last_ts"] = None
+        pnodes_stats.update_one({"_id": HISTORY_CATALOG_ID}, update)
     except Exception as e:
-        logger.error(f"❌ Failed to save node history for {address}: {e}")
+        logger.error(f"❌ Failed to update history catalog after pruning: {e}")
+
+
+def get_history_catalog(limit: int = 100) -> tuple:
+    """
+    Nodes with history (most points first) and global totals.
+    
+    Args:
+        limit: Max catalog entries to return
+    
+    Returns:
+        (entries, totals, node_count)
+    """
+    totals = pnodes_stats.find_one({"_id": HISTORY_CATALOG_ID})
+    if not totals:
+        totals = rebuild_history_catalog()
+    
+    entries = list(pnodes_history_catalog.find({}, {"_id": 0}).sort("points", -1).limit(limit))
+    return entries, totals, pnodes_history_catalog.estimated_document_count()
 
 
 def prune_old_node_history(days: int = 30):
@@ -713,6 +1320,23 @@ def prune_old_node_history(days: int = 30):
     threshold = int(time.time()) - (days * 86400)
     
     try:
+        # Whole buckets only: an hour is kept until all of it is past the threshold
+        expired = {"hour": {"$lt": history_buckets.bucket_of(threshold)}}
+        
+        # Points about to go, per node, so the catalog can be adjusted in place
+        pruned = {
+            doc["_id"]: doc["points"]
+            for doc in pnodes_node_buckets.aggregate([
+                {"$match": expired},
+                {"$group": {"_id": "$address", "points": {"$sum": "$count"}}},
+            ])
+        }
+        
+        result = pnodes_node_buckets.delete_many(expired)
+        if result.deleted_count > 0:
+            logger.info(f"🗑️  Pruned {result.deleted_count} old node history bucket(s)")
+            _prune_history_catalog(pruned)
+        
         result = pnodes_node_history.delete_many({"timestamp": {"$lt": threshold}})
         if result.deleted_count > 0:
             logger.info(f"🗑️  Pruned {result.deleted_count} old node history snapshot(s)")
@@ -720,32 +1344,172 @@ def prune_old_node_history(days: int = 30):
         logger.error(f"❌ Failed to prune node history: {e}")
 
 
-def get_node_history(address: str, days: int = 30):
+def load_node_samples(address: str, start_time: int, end_time: int = None) -> list:
+    """
+    Per-cycle history samples for one node, oldest first.
+    
+    Reassembled from the hourly buckets (a few dozen documents for a day),
+    plus any legacy per-cycle documents still in range.
+    
+    Args:
+        address: Node address (IP:port)
+        start_time: First timestamp (inclusive)
+        end_time: Last timestamp (exclusive, default: now)
+    """
+    return list(iter_node_samples(address, start_time, end_time))
+
+
+def iter_node_samples(address: str, start_time: int, end_time: int = None):
+    """
+    load_node_samples() as a generator, for streaming.
+    
+    Holds one hourly bucket (plus the cursor batch) in memory at a time.
+    """
+    # Legacy documents predate the buckets, so the result is already ordered
+    yield from _load_legacy_samples(address, start_time, end_time)
+    
+    hours = {"$gte": history_buckets.bucket_of(start_time)}
+    if end_time is not None:
+        hours["$lte"] = history_buckets.bucket_of(end_time - 1)
+    for bucket in pnodes_node_buckets.find({"address": address, "hour": hours}).sort("hour", 1):
+        yield from history_buckets.expand_bucket(bucket, start_time, end_time)
+
+
+def iter_all_node_samples(start_time: int, end_time: int, batch_size: int = 500):
+    """
+    History samples of every node in [start_time, end_time), for exports.
+    
+    Legacy per-cycle documents first, then the hourly buckets in hour
+    order, so samples arrive grouped by hour. Only one cursor batch is
+    held in memory at a time.
+    """
+    cursor = pnodes_node_history.find(
+        {"timestamp": {"$gte": start_time, "$lt": end_time}}
+    ).sort("timestamp", 1).batch_size(batch_size)
+    for doc in cursor:
+        yield sanitize_mongo(doc)
+    
+    hours = {"$gte": history_buckets.bucket_of(start_time), "$lte": history_buckets.bucket_of(end_time - 1)}
+    cursor = pnodes_node_buckets.find({"hour": hours}).sort("hour", 1).batch_size(batch_size)
+    for bucket in cursor:
+        yield from history_buckets.expand_bucket(bucket, start_time, end_time)
+
+
+def iter_registry(batch_size: int = 500):
+    """Every registry entry (sanitized), one cursor batch at a time."""
+    for doc in pnodes_registry.find().sort("address", 1).batch_size(batch_size):
+        yield sanitize_mongo(doc)
+
+
+def _load_legacy_samples(address: str, start_time: int, end_time: int = None) -> list:
+    """Per-cycle documents written before hourly buckets, oldest first."""
+    timestamps = {"$gte": start_time}
+    if end_time is not None:
+        timestamps["$lt"] = end_time
+    cursor = pnodes_node_history.find(
+        {"address": address, "timestamp": timestamps}
+    ).sort("timestamp", 1)
+    return [sanitize_mongo(doc) for doc in cursor]
+
+
+def _node_sample_edge(address: str, start_time: int, direction: int):
+    """
+    Oldest (direction=1) or newest (direction=-1) sample since start_time.
+    
+    Two indexed find_ones (legacy per-cycle documents, then hourly
+    buckets); only the one bucket found is expanded. Legacy documents
+    predate the buckets, so they win for the oldest sample and the buckets
+    win for the newest.
+    """
+    legacy = pnodes_node_history.find_one(
+        {"address": address, "timestamp": {"$gte": start_time}},
+        sort=[("timestamp", direction)]
+    )
+    bucket = pnodes_node_buckets.find_one(
+        {"address": address, "hour": {"$gte": history_buckets.bucket_of(start_time)},
+         "last": {"$gte": start_time}},
+        sort=[("hour", direction)]
+    )
+    samples = history_buckets.expand_bucket(bucket, start_time) if bucket else []
+    legacy = sanitize_mongo(legacy) if legacy else None
+    
+    if direction == 1:
+        return legacy or (samples[0] if samples else None)
+    return samples[-1] if samples else legacy
+
+
+def get_node_series(address: str, start_time: int, end_time: int, bucket_seconds: int) -> list:
+    """
+    Time-bucketed averages of every node metric, computed by MongoDB.
+    
+    Args:
+        address: Node address (IP:port)
+        start_time: First timestamp (inclusive)
+        end_time: Last timestamp (exclusive)
+        bucket_seconds: Output bucket size
+    
+    Returns:
+        Points in the history entry shape, oldest first. Metrics are bucket
+        averages (is_online is the online ratio) and "samples" counts the
+        samples averaged.
+    """
+    pipeline = history_buckets.aggregate_pipeline(
+        address, history_buckets.METRICS, "avg", start_time, end_time, bucket_seconds
+    )
+    points = []
+    for doc in pnodes_node_buckets.aggregate(pipeline):
+        timestamp = int(doc["_id"])
+        point = {
+            "timestamp": timestamp,
+            "timestamp_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+        }
+        for metric in history_buckets.METRICS:
+            value = doc.get(metric)
+            point[metric] = round(value, 2) if value is not None else 0
+        point["samples"] = doc["samples"]
+        points.append(point)
+    return points
+
+
+def get_node_history(address: str, days: int = 30, resolution: str = "raw"):
     """
     Get historical data for a specific node.
     
+    With resolution "raw" every sample is loaded. With a
+    history_buckets.RESOLUTIONS key the series is read as time-bucketed
+    averages from a pipeline, availability is summed from the bucket
+    sample counts, and trends compare the first and last sample (two
+    find_ones), so the samples never leave MongoDB. Legacy per-cycle
+    documents are only part of the raw series.
+    
     Args:
         address: Node address (IP:port)
         days: How many days of history to return
+        resolution: "raw" or a history_buckets.RESOLUTIONS key
         
     Returns:
         dict with node history data
     """
-    start_time = int(time.time()) - (days * 86400)
+    now = int(time.time())
+    start_time = now - (days * 86400)
     
     try:
-        # Query node history
-        cursor = pnodes_node_history.find({
-            "address": address,
-            "timestamp": {"$gte": start_time}
-        }).sort("timestamp", 1)
-        
-        history = []
-        for doc in cursor:
-            doc = sanitize_mongo(doc)
-            history.append(doc)
+        if resolution == "raw":
+            history = load_node_samples(address, start_time)
+            first = history[0] if history else None
+            last = history[-1] if history else None
+            total = len(history)
+            online_count = sum(1 for h in history if h.get("is_online", False))
+        else:
+            first = _node_sample_edge(address, start_time, 1)
+            last = _node_sample_edge(address, start_time, -1)
+            history = get_node_series(
+                address, start_time, now + 1, history_buckets.RESOLUTIONS[resolution]
+            ) if first else []
+            total = sum(point["samples"] for point in history)
+            online_count = round(sum(point["is_online"] * point["samples"] for point in history))
         
-        if not history:
+        if first is None:
             return {
                 "address": address,
                 "available": False,
@@ -754,22 +1518,19 @@ def get_node_history(address: str, days: int = 30):
             }
         
         # Calculate trends
-        first = history[0]
-        last = history[-1]
-        
         uptime_change = last.get("uptime", 0) - first.get("uptime", 0)
         storage_used_change = last.get("storage_used", 0) - first.get("storage_used", 0)
         score_change = last.get("score", 0) - first.get("score", 0)
         
         # Count online vs offline periods
-        online_count = sum(1 for h in history if h.get("is_online", False))
-        offline_count = len(history) - online_count
-        availability_percent = (online_count / len(history) * 100) if history else 0
+        offline_count = total - online_count
+        availability_percent = (online_count / total * 100) if total else 0
         
         return {
             "address": address,
             "available": True,
-            "data_points": len(history),
+            "data_points": total,
+            "resolution": resolution,
             "time_range": {
                 "start": first.get("timestamp"),
                 "end": last.get("timestamp"),
@@ -789,7 +1550,7 @@ def get_node_history(address: str, days: int = 30):
             "availability": {
                 "online_snapshots": online_count,
                 "offline_snapshots": offline_count,
-                "total_snapshots": len(history),
+                "total_snapshots": total,
                 "availability_percent": round(availability_percent, 2)
             },
             "current_status": {
@@ -822,38 +1583,53 @@ def get_node_metrics_summary(address: str, hours: int = 24):
         dict with aggregated metrics
     """
     start_time = int(time.time()) - (hours * 3600)
+    first_full_hour = history_buckets.bucket_of(start_time - 1) + 1
     
     try:
-        cursor = pnodes_node_history.find({
-            "address": address,
-            "timestamp": {"$gte": start_time}
-        })
-        
-        snapshots = list(cursor)
+        # Whole hours: MongoDB merges the precomputed bucket stats ($group)
+        # and returns one document. Only the partial first hour (and legacy
+        # documents) are read sample by sample.
+        grouped = next(pnodes_node_buckets.aggregate(
+            history_buckets.summary_pipeline(address, first_full_hour)
+        ), {})
+        partial = _load_legacy_samples(address, start_time)
+        first_hour = pnodes_node_buckets.find_one(
+            {"address": address, "hour": first_full_hour - 1}
+        )
+        if first_hour:
+            partial.extend(history_buckets.expand_bucket(first_hour, start_time))
         
-        if not snapshots:
+        total = grouped.get("count", 0) + len(partial)
+        if not total:
             return {
                 "available": False,
                 "message": "No data available for this time period"
             }
         
-        # Calculate aggregates
-        online_count = sum(1 for s in snapshots if s.get("is_online", False))
+        online_count = grouped.get("online", 0)
+        online_count += sum(1 for s in partial if s.get("is_online", False))
         
-        scores = [s.get("score", 0) for s in snapshots if s.get("score", 0) > 0]
-        storage_usages = [s.get("storage_usage_percent", 0) for s in snapshots]
-        peer_counts = [s.get("peer_count", 0) for s in snapshots]
+        stats = history_buckets.merge_stats([
+            history_buckets.stats_from_summary(grouped),
+            history_buckets.sample_stats(partial)
+        ])
+        
+        def avg(metric):
+            values = stats.get(metric)
+            return round(values["sum"] / values["n"], 2) if values else 0
+        
+        score = stats.get("score")
         
         return {
             "available": True,
             "time_range_hours": hours,
-            "snapshots_analyzed": len(snapshots),
-            "availability_percent": round((online_count / len(snapshots) * 100), 2),
-            "avg_score": round(sum(scores) / len(scores), 2) if scores else 0,
-            "avg_storage_usage": round(sum(storage_usages) / len(storage_usages), 2) if storage_usages else 0,
-            "avg_peer_count": round(sum(peer_counts) / len(peer_counts), 2) if peer_counts else 0,
-            "min_score": min(scores) if scores else 0,
-            "max_score": max(scores) if scores else 0,
+            "snapshots_analyzed": total,
+            "availability_percent": round((online_count / total * 100), 2),
+            "avg_score": avg("score"),
+            "avg_storage_usage": avg("storage_usage_percent"),
+            "avg_peer_count": avg("peer_count"),
+            "min_score": score["min"] if score else 0,
+            "max_score": score["max"] if score else 0,
         }
         
     except Exception as e:
@@ -861,4 +1637,344 @@ def get_node_metrics_summary(address: str, hours: int = 24):
         return {
             "available": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+def get_node_aggregate(address: str, metric: str, fn: str, start_time: int,
+                       end_time: int, bucket_seconds: int = None) -> list:
+    """
+    Aggregate one node metric per time bucket inside MongoDB.
+    
+    Args:
+        address: Node address (IP:port)
+        metric: One of history_buckets.METRICS
+        fn: One of history_buckets.AGGREGATE_FUNCTIONS
+        start_time: First timestamp (inclusive)
+        end_time: Last timestamp (exclusive)
+        bucket_seconds: Output bucket size (None = one value for the range)
+    
+    Returns:
+        List of {"timestamp", "value", "samples"}, oldest first
+    """
+    pipeline = history_buckets.aggregate_pipeline(
+        address, metric, fn, start_time, end_time, bucket_seconds
+    )
+    return [
+        {
+            "timestamp": int(doc["_id"]) if doc["_id"] is not None else start_time,
+            "value": round(doc["value"], 4) if doc.get("value") is not None else None,
+            "samples": doc["samples"]
+        }
+        for doc in pnodes_node_buckets.aggregate(pipeline)
+    ]
+
+
+# ============================================================================
+# ALERT LIFECYCLE
+# ============================================================================
+
+def setup_alert_indexes():
+    """
+    Create indexes for the alert lifecycle collection.
+    Call this in setup_indexes().
+    """
+    try:
+        # Open alerts are looked up by id when they resolve
+        pnodes_alerts.create_index([("status", 1), ("alert_id", 1)])
+        logger.info("✅ Created index on pnodes_alerts.status+alert_id")
+
+        # Per-node alert history
+        pnodes_alerts.create_index([("address", 1), ("opened_at", -1)])
+        logger.info("✅ Created index on pnodes_alerts.address+opened_at")
+
+        # Transition sequence numbers (for resuming alert feeds)
+        pnodes_alerts.create_index([("opened_seq", 1)])
+        pnodes_alerts.create_index([("resolved_seq", 1)], sparse=True)
+        logger.info("✅ Created indexes on pnodes_alerts.opened_seq/resolved_seq")
+
+    except Exception as e:
+        logger.error(f"❌ Error creating alert indexes: {e}")
+
+
+def save_alert_transitions(opened: list, resolved: list) -> bool:
+    """
+    Persist one cycle's alert transitions.
+
+    Only transitions are written: an upsert per newly opened alert (keyed
+    by opened_seq, so retrying after a partial write adds no duplicates)
+    and an update per resolved one. Alerts that stay open cost nothing.
+
+    Args:
+        opened: Alerts opened this cycle (from AlertEngine.evaluate)
+        resolved: Alerts resolved this cycle
+
+    Returns:
+        True if everything was written (or there was nothing to write)
+    """
+    operations = [
+        UpdateOne(
+            {"opened_seq": alert["opened_seq"]},
+            {"$setOnInsert": dict(alert, status="open")},
+            upsert=True
+        )
+        for alert in opened
+    ]
+    for alert in resolved:
+        operations.append(UpdateOne(
+            {"alert_id": alert["alert_id"], "status": "open"},
+            {"$set": {
+                "status": "resolved",
+                "resolved_at": alert["resolved_at"],
+                "resolved_seq": alert["resolved_seq"],
+            }}
+        ))
+
+    if not operations:
+        return True
+
+    try:
+        pnodes_alerts.bulk_write(operations, ordered=True)
+        logger.info(f"✅ Alert transitions saved: {len(opened)} opened, {len(resolved)} resolved")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to save alert transitions: {e}")
+        return False
+
+
+def get_open_alerts() -> list:
+    """
+    Return all alerts currently open, used to restore alert state on startup.
+    """
+    try:
+        return list(pnodes_alerts.find({"status": "open"}, {"_id": 0, "status": 0}))
+    except Exception as e:
+        logger.error(f"❌ Failed to load open alerts: {e}")
+        return []
+
+
+def get_last_alert_seq() -> int:
+    """
+    Return the highest alert transition sequence number stored.
+    """
+    last_seq = 0
+    try:
+        for field in ("opened_seq", "resolved_seq"):
+            doc = pnodes_alerts.find_one({field: {"$exists": True}}, {field: 1}, sort=[(field, -1)])
+            if doc:
+                last_seq = max(last_seq, doc[field])
+    except Exception as e:
+        logger.error(f"❌ Failed to read last alert sequence: {e}")
+    return last_seq
+
+
+def get_alert_transitions(after_seq: int, limit: int = 5000) -> list:
+    """
+    Alert transitions with a sequence number above after_seq, oldest first.
+    
+    Used to resume the alert stream past the in-memory ring buffer.
+    
+    Args:
+        after_seq: Last sequence number the client received
+        limit: Max transitions to return
+    
+    Returns:
+        [{"seq", "event": "opened" | "resolved", "alert"}]
+    """
+    events = []
+    try:
+        for doc in pnodes_alerts.find(
+            {"opened_seq": {"$gt": after_seq}}, {"_id": 0}
+        ).sort("opened_seq", 1).limit(limit):
+            alert = {k: v for k, v in doc.items() if k not in ("status", "resolved_at", "resolved_seq")}
+            events.append({"seq": doc["opened_seq"], "event": "opened", "alert": alert})
+        
+        for doc in pnodes_alerts.find(
+            {"resolved_seq": {"$gt": after_seq}}, {"_id": 0, "status": 0}
+        ).sort("resolved_seq", 1).limit(limit):
+            events.append({"seq": doc["resolved_seq"], "event": "resolved", "alert": doc})
+    except Exception as e:
+        logger.error(f"❌ Failed to read alert transitions: {e}")
+    
+    events.sort(key=lambda e: e["seq"])
+    return events[:limit]
+
+
+def get_alert_history(address: str, limit: int = 50, severity: str = None) -> list:
+    """
+    Return opened and resolved alerts for one node, newest first.
+
+    Args:
+        address: Node address (IP:port)
+        limit: Max alerts to return
+        severity: Only alerts of this severity
+    """
+    query = {"address": address}
+    if severity:
+        query["severity"] = severity
+    try:
+        cursor = pnodes_alerts.find(query, {"_id": 0}).sort("opened_at", -1).limit(limit)
+        return list(cursor)
+    except Exception as e:
+        logger.error(f"❌ Failed to get alert history for {address}: {e}")
+        return []
+
+
+# ============================================================================
+# GOSSIP PRESENCE BITMAPS (see presence.py)
+# ============================================================================
+
+def setup_presence_indexes():
+    """
+    Create indexes for the presence bitmap collection.
+    Call this in setup_indexes().
+    """
+    try:
+        # Window reads: one node (plus the network bitmap) over a day range
+        pnodes_presence.create_index([("address", 1), ("day", 1)])
+        logger.info("✅ Created index on pnodes_presence.address+day")
+
+        # Pruning by day
+        pnodes_presence.create_index([("day", 1)])
+        logger.info("✅ Created index on pnodes_presence.day")
+
+    except Exception as e:
+        logger.error(f"❌ Error creating presence indexes: {e}")
+
+
+def record_presence(addresses, timestamp: int = None):
+    """
+    Set this cycle's presence bit for every address seen in gossip.
+
+    One unordered bulk write per cycle ($bit OR upserts); the network
+    bitmap is set as well.
+
+    Args:
+        addresses: Addresses present in the current snapshot
+        timestamp: Cycle timestamp (snapshot last_updated)
+    """
+    slot = presence.slot_of(timestamp or time.time())
+    operations = [presence.bit_update(presence.NETWORK_KEY, slot)]
+    operations.extend(presence.bit_update(address, slot) for address in addresses if address)
+
+    try:
+        pnodes_presence.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"❌ Failed to record presence bitmaps: {e}")
+
+
+def get_presence_windows(address: str, windows: dict = None, now: int = None) -> dict:
+    """
+    Sliding-window gossip stats for one node from its presence bitmaps.
+
+    All windows come from a single query over the longest one (at most
+    31 day buckets for the node plus the same for the network bitmap).
+
+    Args:
+        address: Node address (IP:port)
+        windows: name -> window length in seconds (default 1h/24h/7d/30d)
+        now: Window end timestamp
+
+    Returns:
+        name -> window stats (see presence.window_stats)
+    """
+    windows = windows or presence.WINDOWS
+    end_slot = presence.slot_of(now or time.time()) + 1
+    total_slots = max(windows.values()) // presence.SLOT_SECONDS
+    bits, observed = _load_presence(address, end_slot - total_slots, end_slot)
+    return presence.windows_stats(bits, observed, total_slots, windows)
+
+
+def get_presence_windows_batch(addresses: list, windows: dict = None, now: int = None) -> dict:
+    """
+    get_presence_windows() for several nodes with a single query.
+
+    Args:
+        addresses: Node addresses (IP:port)
+        windows: name -> window length in seconds (default 1h/24h/7d/30d)
+        now: Window end timestamp
+
+    Returns:
+        address -> (name -> window stats)
+    """
+    windows = windows or presence.WINDOWS
+    end_slot = presence.slot_of(now or time.time()) + 1
+    total_slots = max(windows.values()) // presence.SLOT_SECONDS
+    bitmaps = _load_presence_bitmaps(addresses, end_slot - total_slots, end_slot)
+    observed = bitmaps[presence.NETWORK_KEY]
+    return {
+        address: presence.windows_stats(bitmaps[address], observed, total_slots, windows)
+        for address in addresses
+    }
+
+
+def get_node_availability(address: str, window_seconds: int, now: int = None) -> dict:
+    """
+    Availability and outage stats for one node over the last window_seconds.
+
+    Reads only the node's and the collector's day buckets (two small
+    documents per day), so a 30-day window is ~62 documents regardless of
+    how many history snapshots exist.
+
+    Args:
+        address: Node address (IP:port)
+        window_seconds: Window length in seconds
+        now: Window end timestamp
+
+    Returns:
+        Dict with window bounds, availability (see presence.window_stats)
+        and outages (see presence.outage_stats)
+    """
+    end_slot = presence.slot_of(now or time.time()) + 1
+    length = max(1, window_seconds // presence.SLOT_SECONDS)
+    start_slot = end_slot - length
+    bits, observed = _load_presence(address, start_slot, end_slot)
+
+    stats = presence.window_stats(bits, observed, length)
+    return {
+        "window_seconds": length * presence.SLOT_SECONDS,
+        "window_start": start_slot * presence.SLOT_SECONDS,
+        "window_end": end_slot * presence.SLOT_SECONDS,
+        "availability": {
+            "uptime_percent": stats["availability_percent"],
+            "observed_cycles": stats["observed_cycles"],
+            "present_cycles": stats["present_cycles"],
+            "coverage_percent": round(stats["observed_cycles"] / length * 100, 2),
+        },
+        "outages": presence.outage_stats(bits, observed, length, start_slot),
+    }
+
+
+def _load_presence(address: str, start_slot: int, end_slot: int) -> tuple:
+    """Node and collector bitmaps for [start_slot, end_slot) in one query."""
+    bitmaps = _load_presence_bitmaps([address], start_slot, end_slot)
+    return bitmaps[address], bitmaps[presence.NETWORK_KEY]
+
+
+def _load_presence_bitmaps(addresses: list, start_slot: int, end_slot: int) -> dict:
+    """Bitmaps of several nodes plus the collector's, in one $in query."""
+    first_day, last_day = presence.day_range(start_slot, end_slot)
+
+    addresses = list(addresses) + [presence.NETWORK_KEY]
+    docs = pnodes_presence.find(
+        {"address": {"$in": addresses}, "day": {"$gte": first_day, "$lte": last_day}},
+        {"address": 1, "day": 1, "w": 1}
+    )
+    return presence.assemble_bitmaps(docs, addresses, start_slot, end_slot)
+
+
+def prune_presence(days: int = 35):
+    """
+    Delete presence day buckets older than `days` days.
+
+    Args:
+        days: Number of day buckets to keep (default 35, covers the 30d window)
+    """
+    cutoff_day = presence.slot_of(time.time()) // presence.SLOTS_PER_DAY - days
+    try:
+        result = pnodes_presence.delete_many({"day": {"$lt": cutoff_day}})
+        if result.deleted_count > 0:
+            logger.info(f"🗑️  Pruned {result.deleted_count} presence bucket(s)")
+        return result.deleted_count
+    except Exception as e:
+        logger.error(f"❌ Failed to prune presence buckets: {e}")
+        return 0
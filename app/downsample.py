@@ -0,0 +1,140 @@
+# app/downsample.py
+"""
+Server-side downsampling of chart series.
+
+Two methods, both returning at most `threshold` points in time order:
+
+- lttb: Largest-Triangle-Three-Buckets. Keeps real points, chosen to
+  preserve the visual shape of one metric (peaks and dips survive).
+- average: Splits the series into `threshold` contiguous groups and
+  averages every numeric field per group.
+
+Points are dicts in the history entry shape (timestamp + metrics).
+"""
+
+from numbers import Number
+from typing import Dict, Iterable, List
+
+METHODS = ("lttb", "average")
+
+# LTTB picks from real points, so read up to this many times max_points
+# before downsampling instead of a pre-averaged coarser resolution
+LTTB_OVERSAMPLE = 10
+
+
+def _value(point: Dict, key: str) -> float:
+    value = point.get(key)
+    return float(value) if isinstance(value, Number) else 0.0
+
+
+def lttb(points: List[Dict], threshold: int, y_key: str, x_key: str = "timestamp") -> List[Dict]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept. Each of the threshold - 2
+    buckets in between keeps the point forming the largest triangle with
+    the previously kept point and the average of the next bucket.
+
+    Args:
+        points: Points sorted by x_key
+        threshold: Max number of points to return
+        y_key: Metric whose shape is preserved
+        x_key: Time field
+
+    Returns:
+        Selected points (the original dicts)
+    """
+    n = len(points)
+    if threshold >= n:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:threshold]
+
+    xs = [_value(p, x_key) for p in points]
+    ys = [_value(p, y_key) for p in points]
+
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        # Point in this bucket with the largest triangle area
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def average(points: List[Dict], threshold: int, keys: Iterable[str] = None) -> List[Dict]:
+    """
+    Bucket-average downsampling.
+
+    Args:
+        points: Points sorted by time
+        threshold: Max number of points to return
+        keys: Numeric fields to average (default: every numeric field of
+              the first point except the timestamp)
+
+    Returns:
+        New points: averaged fields and "samples" (number of points
+        averaged); timestamp and other fields come from the group's
+        first point
+    """
+    n = len(points)
+    if threshold >= n or threshold < 1:
+        return list(points)
+
+    if keys is None:
+        keys = [
+            key for key, value in points[0].items()
+            if isinstance(value, Number) and not isinstance(value, bool) and key != "timestamp"
+        ]
+    keys = list(keys)
+
+    result = []
+    for i in range(threshold):
+        group = points[i * n // threshold:(i + 1) * n // threshold]
+        if not group:
+            continue
+        point = dict(group[0])
+        for key in keys:
+            point[key] = round(sum(_value(p, key) for p in group) / len(group), 2)
+        point["samples"] = sum(p.get("samples", 1) for p in group)
+        result.append(point)
+    return result
+
+
+def downsample(points: List[Dict], max_points: int, method: str, y_key: str) -> List[Dict]:
+    """
+    Apply a METHODS downsampler when points exceed max_points.
+
+    Args:
+        points: Points sorted by time
+        max_points: Max number of points to return
+        method: "lttb" or "average"
+        y_key: Metric preserved by LTTB
+    """
+    if len(points) <= max_points:
+        return points
+    if method == "lttb":
+        return lttb(points, max_points, y_key)
+    return average(points, max_points)
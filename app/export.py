@@ -0,0 +1,382 @@
+# app/export.py
+"""
+Bulk export of the registry and history to columnar files.
+
+Writes Parquet (or Arrow IPC) files partitioned by UTC day, for offline
+analysis without paging through the history endpoints:
+
+    exports/
+        registry/date=2024-12-19/registry.parquet
+        snapshots/date=2024-12-19/part-1703030400-0.parquet
+        node_history/date=2024-12-19/part-1703030400-0.parquet
+        _export_state.json
+
+Datasets:
+- registry: Full copy of pnodes_registry, replaced once per day
+- snapshots: Network history entries (pnodes_snapshots)
+- node_history: Per-node samples (pnodes_node_buckets, plus legacy
+  pnodes_node_history documents)
+
+snapshots and node_history are incremental: each run exports only what
+was written since the previous run's high-water mark, kept in
+_export_state.json. Rows are read in cursor batches and written as one
+row group per BATCH_ROWS rows, so memory stays bounded however much
+history is exported.
+
+Requires pyarrow (optional dependency: pip install pyarrow).
+
+Usage:
+    python -m app.export --out exports
+    python -m app.export --out exports --datasets snapshots --full
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Rows per row group (and per cursor-to-file batch)
+BATCH_ROWS = 10000
+
+# Rows newer than this are left for the next run, so a cycle still being
+# written is never half-exported
+EXPORT_LAG_SECONDS = 300
+
+STATE_FILE = "_export_state.json"
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Column name -> kind ("int", "float", "bool", "str" or "json" for nested
+# values stored as JSON text). Fields not listed are not exported.
+COLUMNS = {
+    "registry": [
+        ("address", "str"),
+        ("pubkey", "str"),
+        ("version", "str"),
+        ("is_public", "bool"),
+        ("rpc_port", "int"),
+        ("last_ip", "str"),
+        ("first_seen", "int"),
+        ("last_seen", "int"),
+        ("last_checked", "int"),
+        ("created_at", "int"),
+        ("uptime", "int"),
+        ("storage_committed", "int"),
+        ("storage_used", "int"),
+        ("storage_usage_percent", "float"),
+        ("gossip_appearances", "int"),
+        ("gossip_disappearances", "int"),
+        ("consistency_score", "float"),
+        ("last_gossip_appearance", "int"),
+        ("last_gossip_drop", "int"),
+        ("source_ips", "json"),
+    ],
+    "snapshots": [
+        ("timestamp", "int"),
+        ("total_pnodes", "int"),
+        ("total_ip_nodes", "int"),
+        ("public_pnodes", "int"),
+        ("private_pnodes", "int"),
+        ("avg_cpu_percent", "float"),
+        ("avg_ram_used_percent", "float"),
+        ("total_active_streams", "int"),
+        ("total_bytes_processed", "int"),
+        ("total_storage_committed", "int"),
+        ("total_storage_used", "int"),
+        ("avg_storage_usage_percent", "float"),
+        ("storage_utilization_ratio", "float"),
+        ("avg_peer_count", "float"),
+        ("version_diversity_index", "int"),
+        ("version_distribution", "json"),
+    ],
+    "node_history": [
+        ("address", "str"),
+        ("timestamp", "int"),
+        ("is_online", "bool"),
+        ("version", "str"),
+        ("is_public", "bool"),
+        ("uptime", "int"),
+        ("storage_committed", "int"),
+        ("storage_used", "int"),
+        ("storage_usage_percent", "float"),
+        ("peer_count", "int"),
+        ("score", "float"),
+        ("trust_score", "float"),
+        ("capacity_score", "float"),
+        ("peer_sources", "json"),
+    ],
+}
+
+DATASETS = tuple(COLUMNS)
+
+# Datasets exported incrementally by timestamp
+INCREMENTAL = ("snapshots", "node_history")
+
+
+def _convert(value, kind: str):
+    """One value as its column kind (None if missing or unconvertible)."""
+    if value is None:
+        return None
+    try:
+        if kind == "json":
+            return json.dumps(value, default=str, sort_keys=True)
+        if kind == "bool":
+            return bool(value)
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_row(row: Dict, columns: List[Tuple[str, str]]) -> Dict:
+    """Row with exactly the dataset's columns, each of a single type."""
+    return {name: _convert(row.get(name), kind) for name, kind in columns}
+
+
+def partition_day(timestamp: int) -> str:
+    """UTC day partition (YYYY-MM-DD) of a unix timestamp."""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+def day_batches(rows: Iterable[Dict], batch_rows: int = BATCH_ROWS,
+                day: str = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Group rows into (day, rows) batches of at most batch_rows.
+
+    A batch never spans two days. Rows are partitioned by their
+    "timestamp", or all go to `day` when it is given.
+    """
+    current, batch = None, []
+    for row in rows:
+        row_day = day or partition_day(row["timestamp"])
+        if batch and (row_day != current or len(batch) >= batch_rows):
+            yield current, batch
+            batch = []
+        current = row_day
+        batch.append(row)
+    if batch:
+        yield current, batch
+
+
+def require_pyarrow():
+    """Raise a clear error when the optional dependency is missing."""
+    if pa is None:
+        raise RuntimeError("Export requires pyarrow (pip install pyarrow)")
+
+
+def arrow_schema(columns: List[Tuple[str, str]]):
+    types = {"int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(), "str": pa.string(), "json": pa.string()}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+class PartitionWriter:
+    """
+    Writes (day, rows) batches to one file per day partition.
+
+    Consecutive batches of the same day go to the same file, as separate
+    row groups. Files are written under a temporary name and renamed when
+    closed, so readers never see a partial file.
+
+    Attributes:
+        files: Paths of the completed files
+        rows: Rows written
+    """
+
+    def __init__(self, root: str, dataset: str, fmt: str = "parquet", name: str = None):
+        require_pyarrow()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}. Use one of: {', '.join(FORMATS)}")
+        self.root = root
+        self.dataset = dataset
+        self.fmt = fmt
+        self.name = name or f"part-{int(time.time())}"
+        self.schema = arrow_schema(COLUMNS[dataset])
+        self.files: List[str] = []
+        self.rows = 0
+        self._day = None
+        self._writer = None
+        self._path = None
+        self._parts = 0
+
+    def write(self, day: str, rows: List[Dict]):
+        if day != self._day:
+            self._close_file()
+            self._open_file(day)
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        self._writer.write_table(table)
+        self.rows += len(rows)
+
+    def close(self):
+        self._close_file()
+
+    def _open_file(self, day: str):
+        directory = os.path.join(self.root, self.dataset, f"date={day}")
+        os.makedirs(directory, exist_ok=True)
+        # Incremental runs may revisit a day; each visit gets its own part
+        suffix = "" if self.dataset == "registry" else f"-{self._parts}"
+        self._path = os.path.join(directory, f"{self.name}{suffix}{FORMATS[self.fmt]}")
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(self._path + ".tmp", self.schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(self._path + ".tmp", self.schema)
+        self._day = day
+        self._parts += 1
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._path + ".tmp", self._path)
+        self.files.append(self._path)
+        self._writer = None
+        self._day = None
+
+
+def write_dataset(rows: Iterable[Dict], root: str, dataset: str, fmt: str = "parquet",
+                  name: str = None, day: str = None) -> Dict:
+    """
+    Normalize and write rows of one dataset.
+
+    Args:
+        rows: Source documents (consumed lazily)
+        root: Export directory
+        dataset: One of DATASETS
+        fmt: "parquet" or "arrow"
+        name: File name prefix (default part-<run timestamp>)
+        day: Put every row in this partition instead of by timestamp
+
+    Returns:
+        {"rows", "files", "last_timestamp"}
+    """
+    columns = COLUMNS[dataset]
+    last_timestamp = None
+
+    def normalized():
+        nonlocal last_timestamp
+        for row in rows:
+            row = normalize_row(row, columns)
+            if row.get("timestamp") is not None:
+                last_timestamp = max(last_timestamp or 0, row["timestamp"])
+            yield row
+
+    writer = PartitionWriter(root, dataset, fmt, name)
+    try:
+        for batch_day, batch in day_batches(normalized(), day=day):
+            writer.write(batch_day, batch)
+    finally:
+        writer.close()
+
+    return {"rows": writer.rows, "files": writer.files, "last_timestamp": last_timestamp}
+
+
+def dataset_rows(dataset: str, after: int, until: int) -> Iterable[Dict]:
+    """
+    Source rows of a dataset with timestamp in (after, until].
+
+    The registry has no time range; every entry is returned.
+    """
+    from . import db
+
+    if dataset == "registry":
+        return db.iter_registry()
+    if dataset == "snapshots":
+        return db.iter_history_points(after + 1, until, "raw")
+    return db.iter_all_node_samples(after + 1, until + 1)
+
+
+def load_state(root: str) -> Dict:
+    try:
+        with open(os.path.join(root, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(root: str, state: Dict):
+    """Write the export state atomically."""
+    path = os.path.join(root, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def run_export(root: str, datasets: Iterable[str] = DATASETS, fmt: str = "parquet",
+               full: bool = False, now: int = None) -> Dict:
+    """
+    Export datasets to `root`, incrementally unless full is set.
+
+    Args:
+        root: Export directory
+        datasets: Datasets to export
+        fmt: "parquet" or "arrow"
+        full: Ignore the saved high-water marks and export everything
+        now: Run timestamp
+
+    Returns:
+        dataset -> {"rows", "files", "after", "until"}
+    """
+    require_pyarrow()
+    now = int(now or time.time())
+    until = now - EXPORT_LAG_SECONDS
+    os.makedirs(root, exist_ok=True)
+    state = load_state(root)
+    results = {}
+
+    for dataset in datasets:
+        if dataset not in COLUMNS:
+            raise ValueError(f"Unknown dataset: {dataset}. Use one of: {', '.join(DATASETS)}")
+
+        started = time.time()
+        if dataset in INCREMENTAL:
+            after = 0 if full else state.get(dataset, {}).get("last_timestamp", 0)
+            result = write_dataset(dataset_rows(dataset, after, until), root, dataset, fmt, f"part-{now}")
+            # Nothing newer than `until` was read, even if the range was empty
+            mark = until if after < until else after
+        else:
+            after = None
+            result = write_dataset(dataset_rows(dataset, 0, until), root, dataset, fmt,
+                                   dataset, day=partition_day(now))
+            mark = None
+
+        state[dataset] = {"last_timestamp": mark, "exported_at": now, "rows": result["rows"]}
+        save_state(root, state)
+        results[dataset] = {"rows": result["rows"], "files": result["files"], "after": after, "until": until}
+        logger.info(
+            f"📦 Exported {result['rows']} {dataset} row(s) to {len(result['files'])} file(s) "
+            f"in {time.time() - started:.1f}s"
+        )
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export registry and history to Parquet/Arrow")
+    parser.add_argument("--out", default="exports", help="Export directory (default: exports)")
+    parser.add_argument("--datasets", default=",".join(DATASETS),
+                        help=f"Comma-separated datasets (default: {','.join(DATASETS)})")
+    parser.add_argument("--format", default="parquet", choices=list(FORMATS))
+    parser.add_argument("--full", action="store_true", help="Re-export everything, ignoring the saved state")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    datasets = [d.strip() for d in args.datasets.split(",") if d.strip()]
+    results = run_export(args.out, datasets, args.format, args.full)
+    for dataset, result in results.items():
+        print(f"{dataset}: {result['rows']} rows, {len(result['files'])} file(s)")
+
+
+if __name__ == "__main__":
+    main()
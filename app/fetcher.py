@@ -11,10 +11,14 @@ from .db import (
     mark_node_status, 
     save_snapshot_history, 
     track_gossip_changes,
-    save_node_snapshot,
-    prune_old_node_history  
+    save_node_snapshots,
+    prune_old_node_history,
+    record_presence,
+    prune_presence
 )
-from .config import CACHE_TTL, IP_NODES  # FIXED: Import from config
+from .view import publish_view
+from .config import CACHE_TTL, IP_NODES, STATIC_DIR, STATIC_KEEP_VERSIONS  # FIXED: Import from config
+from . import static_site
 
 # -------------------------------
 # Logging setup
@@ -114,6 +118,8 @@ def fetch_all_nodes_background():
     - Updates persistent registry (pnodes_registry) using ADDRESS as primary key
     - Updates status (pnodes_status) using ADDRESS as primary key
     - Saves historical snapshots
+    - Records per-node gossip presence bitmaps
+    - Publishes the unified node view used by the API
 
     This function starts the worker and returns immediately.
     """
@@ -301,29 +307,38 @@ def fetch_all_nodes_background():
                 logger.error(f"❌ Gossip tracking failed: {e}")
                 # Don't fail the entire snapshot if gossip tracking fails
 
+            # One presence bit per node for sliding-window consistency
+            record_presence((p.get("address") for p in merged_unique), last_updated)
+            if time.localtime(last_updated).tm_hour == 0 and time.localtime(last_updated).tm_min < 2:
+                prune_presence(days=35)
+
 
             # ============================================================================
             # SAVE PER-NODE HISTORY SNAPSHOTS
             # ============================================================================
             logger.info("💾 Saving per-node history snapshots...")
-            for pod in merged_unique:
-                address = pod.get("address")
-                if not address:
-                    continue
+            # One bulk write appends every node's sample to its hourly bucket
+            save_node_snapshots(merged_unique, last_updated)
+
+            # Prune old node history (once per day, check if it's midnight)
+            if time.localtime(last_updated).tm_hour == 0 and time.localtime(last_updated).tm_min < 2:
+                logger.info("🗑️  Running daily node history cleanup...")
                 try:
-                    # Save individual node snapshot
-                    save_node_snapshot(address, pod)
+                    prune_old_node_history(days=30)
                 except Exception as e:
-                    logger.error(f"Failed to save node history for {address}: {e}")
+                    logger.error(f"Failed to prune node history: {e}")
 
-                # Prune old node history (once per day, check if it's midnight)
-                if time.localtime(last_updated).tm_hour == 0 and time.localtime(last_updated).tm_min < 2:
-                    logger.info("🗑️  Running daily node history cleanup...")
-                    try:
-                        prune_old_node_history(days=30)
-                    except Exception as e:
-                        logger.error(f"Failed to prune node history: {e}")    
 
+            # Publish the unified view (scores, totals, health) for the API.
+            # Its aggregates are stored with the snapshot and history entry.
+            aggregates = None
+            view = None
+            try:
+                view = publish_view(snapshot)
+                aggregates = view.aggregates
+                snapshot["aggregates"] = aggregates
+            except Exception as e:
+                logger.error(f"❌ Failed to publish network view: {e}")
 
             # Save snapshot to MongoDB
             try:
@@ -331,11 +346,18 @@ def fetch_all_nodes_background():
                 logger.info("✅ Snapshot updated successfully")
                 
                 # Save snapshot history
-                save_snapshot_history()
+                save_snapshot_history(aggregates)
                 
             except Exception as e:
                 logger.error(f"MongoDB write error: {e}")
 
+            # Render the default payloads of the busiest endpoints to static files
+            if STATIC_DIR and view is not None:
+                try:
+                    await static_site.publish(view, STATIC_DIR, STATIC_KEEP_VERSIONS)
+                except Exception as e:
+                    logger.error(f"❌ Static publishing failed: {e}")
+
             await asyncio.sleep(CACHE_TTL)
             logger.info("Aggregation loop completed, sleeping until next iteration")
 
@@ -1,3 +1,7 @@
+import base64
+import json
+
+
 # Helper function to safely get values with defaults
 def safe_get(data: dict, key: str, default=0):
     """Safely get value from dict, handling None."""
@@ -8,4 +12,20 @@ def safe_get(data: dict, key: str, default=0):
 def safe_get_list(data: dict, key: str):
     """Safely get list from dict, handling None."""
     value = data.get(key, [])
-    return [] if value is None else value
\ No newline at end of file
+    return [] if value is None else value
+
+
+def encode_cursor(values: dict) -> str:
+    """Encode keyset pagination position as an opaque URL-safe token."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a token from encode_cursor(). Returns None if it is invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return values if isinstance(values, dict) else None
+    except Exception:
+        return None
@@ -0,0 +1,321 @@
+# app/history_buckets.py
+"""
+Hourly per-node history buckets.
+
+Instead of one document per node per cycle, each node gets one document
+per hour ("address|hour"). A cycle appends its sample to packed arrays
+(one array per metric, aligned with the timestamp array "t") and folds it
+into running stats (count/sum/min/max), so an hour of 60-second cycles is
+one document instead of 60.
+
+Bucket layout:
+
+    {
+        "_id": "1.2.3.4:9001|489012",
+        "address": "1.2.3.4:9001",
+        "hour": 489012,                  # timestamp // 3600
+        "first": 1760443200, "last": 1760446740,
+        "count": 60, "online": 60,
+        "t": [1760443200, ...],
+        "m": {"uptime": [...], "score": [...], ...},
+        "version": "0.8.0",              # latest in the hour
+        "peer_sources": [...],           # latest in the hour
+        "is_public": true,               # latest in the hour
+        "stats": {"score": {"n": 60, "sum": ..., "min": ..., "max": ...}, ...}
+    }
+
+Slow-changing fields (version, peer_sources, is_public) are stored once per
+bucket with the latest value instead of being repeated per sample.
+
+This module only builds updates, pipelines and reassembles samples; reads
+and writes live in db.py (save_node_snapshots, get_node_history,
+get_node_series, get_node_metrics_summary, get_node_aggregate).
+"""
+
+import time
+from typing import Dict, Iterable, List
+
+from pymongo import UpdateOne
+
+BUCKET_SECONDS = 3600
+
+# Per-sample numeric metrics, stored as arrays aligned with "t"
+METRICS = [
+    "is_online",
+    "uptime",
+    "storage_committed",
+    "storage_used",
+    "storage_usage_percent",
+    "peer_count",
+    "score",
+    "trust_score",
+    "capacity_score",
+]
+
+# Metrics with precomputed count/sum/min/max per bucket
+STAT_METRICS = ["score", "storage_usage_percent", "peer_count", "storage_used"]
+
+# Stored once per bucket (latest value wins)
+BUCKET_FIELDS = ["version", "peer_sources", "is_public"]
+
+
+def bucket_of(timestamp: int) -> int:
+    """Hour bucket number for a unix timestamp."""
+    return int(timestamp) // BUCKET_SECONDS
+
+
+def node_sample(node_data: dict, timestamp: int) -> Dict:
+    """
+    One history sample for a node, in the per-snapshot document shape.
+
+    Args:
+        node_data: Unified node dict (from the fetch cycle)
+        timestamp: Cycle timestamp
+    """
+    scores = node_data.get("scores", {})
+    peer_sources = node_data.get("peer_sources") or []
+    return {
+        "timestamp": int(timestamp),
+        "is_online": node_data.get("is_online", True),
+        "version": node_data.get("version", "unknown"),
+        "uptime": node_data.get("uptime", 0),
+        "storage_committed": node_data.get("storage_committed", 0),
+        "storage_used": node_data.get("storage_used", 0),
+        "storage_usage_percent": node_data.get("storage_usage_percent", 0),
+        "peer_count": len(peer_sources),
+        "peer_sources": peer_sources,
+        "score": node_data.get("score", 0),
+        "trust_score": scores.get("trust", {}).get("score", 0),
+        "capacity_score": scores.get("capacity", {}).get("score", 0),
+        "is_public": node_data.get("is_public", False),
+    }
+
+
+def bucket_update(address: str, sample: Dict) -> UpdateOne:
+    """
+    Upsert that appends one sample to the node's hour bucket.
+
+    Scores of 0 (not scored yet) are left out of the score stats, matching
+    how the metrics summary has always averaged scores.
+
+    Args:
+        address: Node address (IP:port)
+        sample: Sample from node_sample()
+    """
+    timestamp = sample["timestamp"]
+    hour = bucket_of(timestamp)
+
+    push = {"t": timestamp}
+    for metric in METRICS:
+        push[f"m.{metric}"] = sample.get(metric, 0)
+
+    inc = {"count": 1, "online": 1 if sample.get("is_online") else 0}
+    minimum = {"first": timestamp}
+    maximum = {"last": timestamp}
+    for metric in STAT_METRICS:
+        value = sample.get(metric) or 0
+        if metric == "score" and value <= 0:
+            continue
+        inc[f"stats.{metric}.n"] = 1
+        inc[f"stats.{metric}.sum"] = value
+        minimum[f"stats.{metric}.min"] = value
+        maximum[f"stats.{metric}.max"] = value
+
+    return UpdateOne(
+        {"_id": f"{address}|{hour}"},
+        {
+            "$setOnInsert": {"address": address, "hour": hour},
+            "$set": {field: sample.get(field) for field in BUCKET_FIELDS},
+            "$push": push,
+            "$inc": inc,
+            "$min": minimum,
+            "$max": maximum,
+        },
+        upsert=True
+    )
+
+
+def expand_bucket(doc: Dict, start_time: int = None, end_time: int = None) -> List[Dict]:
+    """
+    Reassemble a bucket into per-snapshot documents.
+
+    Args:
+        doc: Bucket document
+        start_time: Drop samples before this timestamp
+        end_time: Drop samples at or after this timestamp
+
+    Returns:
+        Samples in the per-snapshot shape, oldest first
+    """
+    metrics = doc.get("m") or {}
+    shared = {field: doc.get(field) for field in BUCKET_FIELDS}
+    samples = []
+
+    for i, timestamp in enumerate(doc.get("t") or []):
+        if start_time is not None and timestamp < start_time:
+            continue
+        if end_time is not None and timestamp >= end_time:
+            continue
+        sample = {
+            "address": doc["address"],
+            "timestamp": timestamp,
+            "timestamp_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+        }
+        for metric in METRICS:
+            values = metrics.get(metric) or []
+            sample[metric] = values[i] if i < len(values) else 0
+        sample.update(shared)
+        samples.append(sample)
+
+    return samples
+
+
+def merge_stats(stats_list: Iterable[Dict]) -> Dict[str, Dict]:
+    """
+    Combine per-bucket stats into one count/sum/min/max per metric.
+
+    Args:
+        stats_list: "stats" dicts from bucket documents, or from
+            sample_stats() for partial buckets
+
+    Returns:
+        metric -> {"n", "sum", "min", "max"}
+    """
+    merged = {}
+    for stats in stats_list:
+        for metric, values in (stats or {}).items():
+            if not values.get("n"):
+                continue
+            current = merged.get(metric)
+            if current is None:
+                merged[metric] = dict(values)
+                continue
+            current["n"] += values["n"]
+            current["sum"] += values["sum"]
+            current["min"] = min(current["min"], values["min"])
+            current["max"] = max(current["max"], values["max"])
+    return merged
+
+
+def sample_stats(samples: Iterable[Dict]) -> Dict[str, Dict]:
+    """Stats in the bucket "stats" shape for individual samples."""
+    stats = {}
+    for sample in samples:
+        for metric in STAT_METRICS:
+            value = sample.get(metric) or 0
+            if metric == "score" and value <= 0:
+                continue
+            current = stats.setdefault(metric, {"n": 0, "sum": 0, "min": value, "max": value})
+            current["n"] += 1
+            current["sum"] += value
+            current["min"] = min(current["min"], value)
+            current["max"] = max(current["max"], value)
+    return stats
+
+
+def summary_pipeline(address: str, first_hour: int) -> List[Dict]:
+    """
+    $group over whole-hour buckets: total/online counts and merged stats.
+
+    Args:
+        address: Node address (IP:port)
+        first_hour: First bucket hour to include
+    """
+    group = {"_id": None, "count": {"$sum": "$count"}, "online": {"$sum": "$online"}}
+    for metric in STAT_METRICS:
+        group[f"{metric}_n"] = {"$sum": f"$stats.{metric}.n"}
+        group[f"{metric}_sum"] = {"$sum": f"$stats.{metric}.sum"}
+        group[f"{metric}_min"] = {"$min": f"$stats.{metric}.min"}
+        group[f"{metric}_max"] = {"$max": f"$stats.{metric}.max"}
+
+    return [
+        {"$match": {"address": address, "hour": {"$gte": first_hour}}},
+        {"$group": group},
+    ]
+
+
+def stats_from_summary(doc: Dict) -> Dict[str, Dict]:
+    """summary_pipeline() result -> bucket "stats" shape (for merge_stats)."""
+    stats = {}
+    for metric in STAT_METRICS:
+        if doc.get(f"{metric}_n"):
+            stats[metric] = {
+                "n": doc[f"{metric}_n"],
+                "sum": doc[f"{metric}_sum"],
+                "min": doc[f"{metric}_min"],
+                "max": doc[f"{metric}_max"],
+            }
+    return stats
+
+
+# Aggregation functions for aggregate_pipeline()
+AGGREGATE_FUNCTIONS = ("avg", "min", "max", "sum", "p95")
+
+# Series resolutions for /node/{address}/history, finest first
+RESOLUTIONS = {
+    "1h": 3600,
+    "1d": 86400,
+}
+
+
+def aggregate_pipeline(address: str, metric, fn: str, start_time: int,
+                       end_time: int, bucket_seconds: int = None) -> List[Dict]:
+    """
+    Per-time-bucket aggregate of one or more metrics, computed by MongoDB.
+
+    Unpacks the samples of the matching hour buckets ($unwind with the
+    array index), keeps those in [start_time, end_time) and groups them by
+    time bucket.
+    p95 uses $percentile (MongoDB 7.0+).
+
+    Args:
+        address: Node address (IP:port)
+        metric: One of METRICS, or a list of them
+        fn: One of AGGREGATE_FUNCTIONS
+        start_time: First timestamp (inclusive)
+        end_time: Last timestamp (exclusive)
+        bucket_seconds: Output bucket size (None = one value for the range)
+
+    Returns:
+        Pipeline yielding {"_id": bucket start or None, "value", "samples"};
+        for a list of metrics, one field per metric instead of "value"
+    """
+    metrics = [metric] if isinstance(metric, str) else list(metric)
+    outputs = ["value"] if isinstance(metric, str) else metrics
+
+    def accumulator(name):
+        if fn == "p95":
+            return {"$percentile": {"input": f"$v.{name}", "p": [0.95], "method": "approximate"}}
+        return {f"${fn}": f"$v.{name}"}
+
+    bucket = None
+    if bucket_seconds:
+        bucket = {"$subtract": ["$t", {"$mod": ["$t", bucket_seconds]}]}
+
+    group = {"_id": bucket, "samples": {"$sum": 1}}
+    for name, output in zip(metrics, outputs):
+        group[output] = accumulator(name)
+
+    pipeline = [
+        {"$match": {
+            "address": address,
+            "hour": {"$gte": bucket_of(start_time), "$lte": bucket_of(end_time - 1)},
+        }},
+        {"$project": {"_id": 0, "t": 1, "values": {name: f"$m.{name}" for name in metrics}}},
+        {"$unwind": {"path": "$t", "includeArrayIndex": "i"}},
+        {"$project": {
+            "t": 1,
+            "v": {
+                name: {"$toDouble": {"$arrayElemAt": [f"$values.{name}", "$i"]}}
+                for name in metrics
+            },
+        }},
+        {"$match": {"t": {"$gte": start_time, "$lt": end_time}}},
+        {"$group": group},
+        {"$sort": {"_id": 1}},
+    ]
+    if fn == "p95":
+        pipeline.append({"$set": {
+            output: {"$arrayElemAt": [f"${output}", 0]} for output in outputs
+        }})
+    return pipeline
@@ -1,16 +1,44 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Header, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from app.utils.jsonrpc import jsonrpc_error, INTERNAL_ERROR
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from app.utils.jsonrpc import (
+    jsonrpc_error, jsonrpc_success, validate_params, one_of, between, REQUIRED,
+    PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, INTERNAL_ERROR
+)
 from app.fetcher import fetch_all_nodes_background
 from .db import (
     nodes_current, get_registry, get_registry_entry, get_status, 
     prune_old_nodes, sanitize_mongo, CACHE_TTL, pnodes_registry,
-    setup_indexes, get_growth_metrics, get_node_history  # ADDED
+    setup_indexes, get_growth_metrics, get_node_history,  # ADDED
+    get_consistency_stats, get_presence_windows, get_presence_windows_batch,
+    get_node_availability, get_registry_entries,
+    backfill_rollups, get_history_points, get_node_aggregate,
+    iter_history_points, iter_node_samples, get_alert_history
+)
+from .alerts import get_alerts_summary, filter_alerts
+from .view import (
+    current_view, get_node, alerts_for_node, lookup_nodes, changes_since, wait_for_cycle,
+    pinned_view
+)
+from .helpers import safe_get, safe_get_list, encode_cursor, decode_cursor
+from .presence import WINDOWS
+from .rollups import choose_resolution, METRICS as HISTORY_METRICS
+from .history_buckets import METRICS as NODE_HISTORY_METRICS, RESOLUTIONS as NODE_HISTORY_RESOLUTIONS
+from .downsample import downsample, LTTB_OVERSAMPLE
+from .stream import delta_hub, StreamFilter, SEND_TIMEOUT
+from .ndjson import wants_ndjson, encode_lines, NDJSON_MEDIA_TYPE
+from . import static_site
+from .config import STATIC_DIR
+from .export import (
+    write_dataset, dataset_rows as export_rows, partition_day, require_pyarrow,
+    DATASETS as EXPORT_DATASETS, FORMATS as EXPORT_FORMATS
+)
+from .alert_feed import (
+    alert_feed, format_event, matches as alert_event_matches,
+    KEEPALIVE_SECONDS, RETRY_MILLISECONDS
 )
-from .alerts import check_node_alerts, get_alerts_summary, filter_alerts
-from .scoring import calculate_all_scores
-from .helpers import safe_get, safe_get_list
+import asyncio, calendar, json, os, shutil, tempfile
 import time, logging
 
 
@@ -43,6 +71,7 @@ app.add_middleware(
 async def startup_event():
     """Initialize database indexes and start background worker."""
     setup_indexes()
+    backfill_rollups()
     fetch_all_nodes_background()
 
 
@@ -74,8 +103,20 @@ async def health_check():
     
     data = snapshot.get("data", {})
     summary = data.get("summary", {})
+    return health_status(summary, len(data.get("nodes", {})))
+
+
+def health_status(summary: dict, total_ip_nodes: int, now: int = None) -> dict:
+    """
+    /health body for a snapshot summary.
+    
+    Args:
+        summary: Snapshot summary (last_updated, total_pnodes)
+        total_ip_nodes: Number of IP nodes in the snapshot
+        now: Current timestamp
+    """
     last_updated = summary.get("last_updated", 0)
-    now = int(time.time())
+    now = now or int(time.time())
     age_seconds = now - last_updated
     
     # If snapshot is older than 2x CACHE_TTL, something is wrong
@@ -95,7 +136,7 @@ async def health_check():
         "last_updated": last_updated,
         "cache_ttl": CACHE_TTL,
         "total_pnodes": summary.get("total_pnodes", 0),
-        "total_ip_nodes": len(data.get("nodes", {})),
+        "total_ip_nodes": total_ip_nodes,
         "timestamp": now
     }
 
@@ -238,7 +279,7 @@ async def root():
         "advanced_endpoints": {
             "compare_nodes": {
                 "path": "/pnodes/compare",
-                "description": "Compare 2-5 nodes side-by-side",
+                "description": "Compare 2-100 nodes side-by-side",
                 "example": "/pnodes/compare?addresses=node1:9001,node2:9001"
             },
             "operators": {
@@ -255,6 +296,11 @@ async def root():
                 "path": "/node/{address}/consistency",
                 "description": "Node gossip consistency details",
                 "example": "/node/109.199.96.218:9001/consistency"
+            },
+            "node_availability": {
+                "path": "/node/{address}/availability",
+                "description": "Uptime percentage and outages over a window",
+                "example": "/node/109.199.96.218:9001/availability?window=7d"
             }
         },
         
@@ -296,7 +342,7 @@ async def root():
                     "1. GET /network/health (overall status)",
                     "2. GET /network/topology (graph data)",
                     "3. GET /network/analytics (comprehensive metrics)",
-                    "4. WebSocket /ws/pnodes (real-time updates - coming soon)"
+                    "4. WebSocket /ws/pnodes (real-time node deltas)"
                 ]
             }
         },
@@ -425,14 +471,33 @@ async def prune_registry(days: int = 90):
         )
 
 
+# Documents per MongoDB cursor batch for NDJSON responses
+NDJSON_BATCH_SIZE = 500
+
+
+def ndjson_response(rows, headers: dict = None) -> StreamingResponse:
+    """
+    Stream rows as NDJSON (see ndjson.py).
+    
+    `rows` is consumed lazily in the threadpool, so blocking cursor reads
+    don't hold up the event loop.
+    """
+    return StreamingResponse(encode_lines(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
 @app.get("/graveyard", summary="List inactive nodes (graveyard)")
-async def graveyard_nodes(days: int = 90, skip: int = 0, limit: int = 100):
+async def graveyard_nodes(days: int = 90, skip: int = 0, limit: int = 100, accept: str = Header(None)):
     """
     Returns nodes not seen in `days` days.
+    
+    With `Accept: application/x-ndjson`, streams one registry entry per line
+    straight from the cursor.
     """
     try:
         threshold = int(time.time()) - days * 24 * 3600
         cursor = pnodes_registry.find({"last_seen": {"$lt": threshold}}).sort("last_seen", -1).skip(skip).limit(limit)
+        if wants_ndjson(accept):
+            return ndjson_response(sanitize_mongo(doc) for doc in cursor.batch_size(NDJSON_BATCH_SIZE))
         items = [sanitize_mongo(doc) for doc in cursor]
         return {
             "count": len(items),
@@ -451,7 +516,9 @@ async def get_pnodes_unified(
     limit: int = Query(100, ge=1, le=1000),
     skip: int = 0,
     sort_by: str = Query("last_seen", regex="^(last_seen|uptime|score|storage_used|storage_usage_percent|first_seen)$"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$")
+    sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    since: int = Query(None, description="Only nodes changed since this cycle (summary.last_updated of a previous response)"),
+    accept: str = Header(None)
 ):
     """
     Unified pNode endpoint - single source of truth for frontend.
@@ -468,166 +535,52 @@ async def get_pnodes_unified(
     - skip: pagination offset
     - sort_by: field to sort by
     - sort_order: "asc" or "desc"
+    - since: cycle id (summary.last_updated) the client already has. Only
+      nodes added or changed since then are returned, plus the addresses
+      to drop in "removed". limit and skip are ignored: every changed node
+      is returned. uptime, last_seen and scores alone don't count as a
+      change. Falls back to a full (paginated) response when the cycle is
+      older than the last hour.
+    
+    With `Accept: application/x-ndjson`, streams the page of nodes one per
+    line (pagination totals in the X-Total-Count / X-Cycle headers).
     
     Returns comprehensive data suitable for building rich UI.
     """
-    # Get current snapshot for online status
-    snapshot = nodes_current.find_one({"_id": "snapshot"})
-    if not snapshot or "data" not in snapshot:
+    ndjson = wants_ndjson(accept)
+    if ndjson and since is not None:
+        return JSONResponse(
+            jsonrpc_error("since is not supported with NDJSON responses", INVALID_REQUEST),
+            status_code=400
+        )
+    
+    # Get the unified view published by the background worker
+    view = current_view()
+    if view is None:
         return JSONResponse(
             jsonrpc_error("Snapshot not available", INTERNAL_ERROR),
             status_code=503
         )
     
-    snapshot_data = snapshot["data"]
-    current_pnodes = snapshot_data.get("merged_pnodes_unique", [])
-    
-    # Build map of currently online nodes by address
-    online_map = {}
-    for pnode in current_pnodes:
-        addr = pnode.get("address")
-        if addr:
-            online_map[addr] = pnode
-    
-    # Get all registry entries
     now = int(time.time())
-    all_registry = list(pnodes_registry.find())
-    
-    # Merge snapshot data with registry data
-    merged_pnodes = []
-    processed_addresses = set()
-    
-    # First: Process all online nodes (from snapshot)
-    for pnode in current_pnodes:
-        address = pnode.get("address")
-        if not address:
-            continue
-        
-        processed_addresses.add(address)
-        
-        # Get corresponding registry entry (if exists)
-        registry_entry = pnodes_registry.find_one({"address": address})
-        
-        # Build unified entry with NULL-SAFE access
-        unified_entry = {
-            # Identity
-            "address": address,
-            "pubkey": pnode.get("pubkey") or "",
-            
-            # Status
-            "is_online": True,
-            "last_seen": safe_get(pnode, "last_seen_timestamp", now),
-            "last_checked": now,
-            
-            # Network info (from snapshot - most current)
-            "version": pnode.get("version") or "unknown",
-            "uptime": safe_get(pnode, "uptime", 0),
-            "is_public": bool(pnode.get("is_public")) if pnode.get("is_public") is not None else False,
-            "rpc_port": safe_get(pnode, "rpc_port", 6000),
-            
-            # Storage metrics (from snapshot) - NULL-SAFE
-            "storage_committed": safe_get(pnode, "storage_committed", 0),
-            "storage_used": safe_get(pnode, "storage_used", 0),
-            "storage_usage_percent": safe_get(pnode, "storage_usage_percent", 0.0),
-            
-            # Network topology (from snapshot) - NULL-SAFE
-            "peer_sources": safe_get_list(pnode, "peer_sources"),
-            "peer_count": len(safe_get_list(pnode, "peer_sources")),
-            
-            # Historical data (from registry if available) - NULL-SAFE
-            "first_seen": (
-                safe_get(registry_entry, "first_seen", safe_get(pnode, "last_seen_timestamp", now))
-                if registry_entry else safe_get(pnode, "last_seen_timestamp", now)
-            ),
-            "source_ips": (
-                safe_get_list(registry_entry, "source_ips") if registry_entry 
-                else safe_get_list(pnode, "peer_sources")
-            ),
-        }
-        
-        # Calculate performance score - WRAP IN TRY/CATCH
-        try:
-            score_data = calculate_all_scores(unified_entry)
-            unified_entry["scores"] = score_data
-            unified_entry["score"] = score_data["stake_confidence"]["composite_score"]
-            unified_entry["tier"] = score_data["stake_confidence"]["rating"]
-        except Exception as e:
-            # If scoring fails, set defaults
-            logger.error(f"Scoring failed for {address}: {e}")
-            unified_entry["scores"] = {
-                "trust": {"score": 0, "breakdown": {}},
-                "capacity": {"score": 0, "breakdown": {}},
-                "stake_confidence": {"composite_score": 0, "rating": "unknown"}
-            }
-            unified_entry["score"] = 0
-            unified_entry["tier"] = "unknown"
-        
-        merged_pnodes.append(unified_entry)
-    
-    # Second: Add offline nodes from registry (if status is "all" or "offline")
-    if status in ["all", "offline"]:
-        for reg_entry in all_registry:
-            address = reg_entry.get("address")
-            if not address or address in processed_addresses:
-                continue  # Already added as online
-            
-            # Check if truly offline (not seen in 2x CACHE_TTL)
-            last_seen = safe_get(reg_entry, "last_seen", 0)
-            is_offline = (now - last_seen) > 2 * CACHE_TTL
-            
-            if not is_offline:
-                continue  # Still considered online somehow
-            
-            # Build offline entry - NULL-SAFE
-            unified_entry = {
-                # Identity
-                "address": address,
-                "pubkey": reg_entry.get("pubkey") or "",
-                
-                # Status
-                "is_online": False,
-                "last_seen": last_seen,
-                "last_checked": now,
-                "offline_duration": now - last_seen,
-                
-                # Network info (from last known state) - NULL-SAFE
-                "version": reg_entry.get("version") or "unknown",
-                "uptime": 0,  # Offline = no uptime
-                "is_public": bool(reg_entry.get("is_public")) if reg_entry.get("is_public") is not None else False,
-                "rpc_port": safe_get(reg_entry, "rpc_port", 6000),
-                
-                # Storage metrics (from last known state) - NULL-SAFE
-                "storage_committed": safe_get(reg_entry, "storage_committed", 0),
-                "storage_used": safe_get(reg_entry, "storage_used", 0),
-                "storage_usage_percent": safe_get(reg_entry, "storage_usage_percent", 0.0),
-                
-                # Network topology
-                "peer_sources": [],
-                "peer_count": 0,
-                
-                # Historical data - NULL-SAFE
-                "first_seen": safe_get(reg_entry, "first_seen", last_seen),
-                "source_ips": safe_get_list(reg_entry, "source_ips"),
-            }
-            
-            # Score is 0 for offline nodes
-            unified_entry["scores"] = {
-                "trust": {"score": 0, "breakdown": {}},
-                "capacity": {"score": 0, "breakdown": {}},
-                "stake_confidence": {"composite_score": 0, "rating": "offline"}
-            }
-            unified_entry["score"] = 0
-            unified_entry["tier"] = "offline"
-            
-            merged_pnodes.append(unified_entry)
     
-    # Filter by status
-    if status == "online":
-        filtered_nodes = [p for p in merged_pnodes if p.get("is_online", False)]
-    elif status == "offline":
-        filtered_nodes = [p for p in merged_pnodes if not p.get("is_online", True)]
+    def status_matches(node):
+        if status == "online":
+            return node.get("is_online", False)
+        if status == "offline":
+            return not node.get("is_online", True)
+        return True
+    
+    changes = changes_since(since) if since is not None else None
+    removed = []
+    if changes is not None:
+        changed, gone = changes
+        nodes = [view.by_address[a] for a in changed]
+        filtered_nodes = [p for p in nodes if status_matches(p)]
+        # Nodes that left the view, or no longer match the status filter
+        removed = sorted(gone | {p["address"] for p in nodes if not status_matches(p)})
     else:
-        filtered_nodes = merged_pnodes
+        filtered_nodes = [p for p in view.nodes if status_matches(p)]
     
     # Sort with NULL-SAFE handling
     reverse = (sort_order == "desc")
@@ -644,55 +597,19 @@ async def get_pnodes_unified(
             reverse=True
         )
     
-    # Calculate accurate counts
-    total_count = len(merged_pnodes)
-    online_count = len([p for p in merged_pnodes if p.get("is_online", False)])
-    offline_count = total_count - online_count
+    # Paginate (delta responses return every changed node)
+    paginated = filtered_nodes if changes is not None else filtered_nodes[skip:skip + limit]
     
-    # Paginate
-    paginated = filtered_nodes[skip:skip + limit]
-    
-    # Calculate version distribution (online nodes only) - NULL-SAFE
-    version_distribution = {}
-    for node in merged_pnodes:
-        if node.get("is_online", False):
-            v = node.get("version") or "unknown"
-            version_distribution[v] = version_distribution.get(v, 0) + 1
-    
-    # Calculate network-wide totals - NULL-SAFE
-    total_storage_committed = sum(
-        safe_get(p, "storage_committed", 0) for p in merged_pnodes
-    )
-    total_storage_used = sum(
-        safe_get(p, "storage_used", 0) for p in merged_pnodes
-    )
-    
-    # Calculate average uptime (online nodes only) - NULL-SAFE
-    if online_count > 0:
-        total_uptime_hours = sum(
-            safe_get(p, "uptime", 0) / 3600 
-            for p in merged_pnodes 
-            if p.get("is_online", False)
-        )
-        avg_uptime_hours = total_uptime_hours / online_count
-    else:
-        avg_uptime_hours = 0
+    if ndjson:
+        return ndjson_response(paginated, {
+            "X-Total-Count": str(len(filtered_nodes)),
+            "X-Cycle": str(view.cycle_id),
+        })
     
     # Return comprehensive response
-    return {
-        "summary": {
-            "total_pnodes": total_count,
-            "online_pnodes": online_count,
-            "offline_pnodes": offline_count,
-            "snapshot_age_seconds": now - safe_get(snapshot_data.get("summary", {}), "last_updated", now),
-            "last_updated": safe_get(snapshot_data.get("summary", {}), "last_updated", now),
-        },
-        "network_stats": {
-            "total_storage_committed": total_storage_committed,
-            "total_storage_used": total_storage_used,
-            "avg_uptime_hours": round(avg_uptime_hours, 2),
-            "version_distribution": version_distribution,
-        },
+    response = {
+        "summary": view.summary(now),
+        "network_stats": view.network_stats,
         "pagination": {
             "total": len(filtered_nodes),
             "limit": limit,
@@ -707,6 +624,124 @@ async def get_pnodes_unified(
         "pnodes": paginated,
         "timestamp": now
     }
+    if since is not None:
+        response["delta"] = {
+            "since": since,
+            "cycle": view.cycle_id,
+            "full": changes is None,
+            "removed": removed,
+        }
+    return response
+
+
+@app.websocket("/ws/pnodes")
+async def ws_pnodes(
+    websocket: WebSocket,
+    status: str = Query("all", regex="^(all|online|offline)$"),
+    version: str = None,
+    tier: str = None,
+    is_public: bool = None,
+    min_score: float = None,
+    addresses: str = None
+):
+    """
+    Real-time node updates.
+    
+    Sends a compact snapshot of the nodes matching the filter, then one
+    delta per ingestion cycle (added nodes, removed addresses and changed
+    fields only). See stream.py for the message formats.
+    
+    Parameters (initial filter):
+    - status: "all" (default), "online" or "offline"
+    - version, tier, is_public, min_score: optional node filters
+    - addresses: comma-separated addresses to watch
+    
+    The filter can be changed at any time by sending
+    {"type": "subscribe", "filter": {...}}, which is answered with a new
+    snapshot. Clients that fall behind get a fresh snapshot instead of the
+    deltas they missed.
+    """
+    await websocket.accept()
+    
+    try:
+        stream_filter = StreamFilter(
+            status=status, version=version, tier=tier, is_public=is_public, min_score=min_score,
+            addresses=[a.strip() for a in addresses.split(",") if a.strip()] if addresses else None
+        )
+    except ValueError as e:
+        await websocket.send_json({"type": "error", **jsonrpc_error(str(e), INVALID_REQUEST)})
+        await websocket.close(code=1008)
+        return
+    
+    if delta_hub.cycle is None:
+        delta_hub.prime(current_view())
+    
+    subscriber = delta_hub.subscribe(stream_filter)
+    subscriber.request_snapshot()
+    
+    async def send_updates():
+        while True:
+            message = await subscriber.queue.get()
+            if subscriber.resync:
+                subscriber.resync = False
+                message = json.dumps(delta_hub.snapshot(subscriber.filter))
+            elif message is None:
+                continue
+            await asyncio.wait_for(websocket.send_text(message), SEND_TIMEOUT)
+    
+    async def receive_filters():
+        while True:
+            try:
+                request = json.loads(await websocket.receive_text())
+                if not isinstance(request, dict) or request.get("type") != "subscribe":
+                    raise ValueError('Expected {"type": "subscribe", "filter": {...}}')
+                subscriber.request_snapshot(StreamFilter.from_dict(request.get("filter")))
+            except ValueError as e:
+                await websocket.send_json({"type": "error", **jsonrpc_error(str(e), INVALID_REQUEST)})
+    
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(receive_filters())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                logger.warning(f"⚠️  Closing /ws/pnodes subscriber: {error!r}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        delta_hub.unsubscribe(subscriber)
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+
+@app.get("/changes", summary="Wait for the next snapshot (long-poll)")
+async def get_changes(
+    after: int = Query(None, description="Version (cycle id) the client already has"),
+    timeout: int = Query(25, ge=1, le=55, description="Max seconds to hold the request")
+):
+    """
+    Long-poll for new data.
+    
+    Returns as soon as a snapshot newer than `after` is published (right
+    away if one already is), or with changed=false after `timeout`
+    seconds. Clients refetch their queries only when changed is true and
+    pass the returned version as `after` on the next call.
+    
+    Parameters:
+    - after: version from the previous response (omit for the current one)
+    - timeout: seconds to wait (1-55, default 25)
+    """
+    version = await wait_for_cycle(after, timeout)
+    if version is None:
+        version = after
+    
+    return {
+        "version": version,
+        "changed": version is not None and version != after,
+        "timestamp": int(time.time())
+    }
 
 
 @app.get("/recommendations", summary="Top pNodes for staking")
@@ -731,7 +766,9 @@ async def get_staking_recommendations(
     - require_public: Only include public RPC nodes
     """
     # Get all online nodes
-    response = await get_pnodes_unified(status="online", limit=10000)
+    response = await get_pnodes_unified(
+        status="online", limit=10000, skip=0, sort_by="last_seen", sort_order="desc", since=None, accept=None
+    )
     all_nodes = response.get("pnodes", [])
     
     scored = []
@@ -903,15 +940,18 @@ async def get_network_health():
     - Network statistics
     - Active alerts
     """   
-    # Get all nodes
-    response = await get_pnodes_unified(status="all", limit=10000)
-    all_nodes = response.get("pnodes", [])
+    # Health is maintained per ingestion cycle on the published view
+    view = current_view()
+    if view is None:
+        return JSONResponse(
+            jsonrpc_error("Snapshot not available", INTERNAL_ERROR),
+            status_code=503
+        )
     
-    # Calculate health score
-    health_data = calculate_network_health_score(all_nodes)
+    health_data = view.health
     
     alerts = []
-    online_count = len([n for n in all_nodes if n.get("is_online", False)])
+    online_count = view.online_count
     
     # Alert: Low node count
     if online_count < 50:
@@ -923,7 +963,7 @@ async def get_network_health():
         })
     
     # Alert: Version fragmentation
-    version_counts = response.get("network_stats", {}).get("version_distribution", {})
+    version_counts = view.network_stats.get("version_distribution", {})
     if len(version_counts) > 3:
         alerts.append({
             "severity": "medium",
@@ -943,8 +983,8 @@ async def get_network_health():
     
     return {
         "health": health_data,
-        "network_stats": response.get("network_stats", {}),
-        "summary": response.get("summary", {}),
+        "network_stats": view.network_stats,
+        "summary": view.summary(),
         "alerts": alerts,
         "timestamp": int(time.time())
     }
@@ -969,7 +1009,9 @@ async def get_operators(
     - min_nodes: Only show operators with at least N nodes
     """
     # Get all nodes
-    response = await get_pnodes_unified(status="all", limit=10000)
+    response = await get_pnodes_unified(
+        status="all", limit=10000, skip=0, sort_by="last_seen", sort_order="desc", since=None, accept=None
+    )
     all_nodes = response.get("pnodes", [])
     
     operators = {}
@@ -1042,29 +1084,54 @@ async def get_operators(
 
 @app.get("/network/history", summary="Network metrics over time")
 async def get_network_history(
-    hours: int = Query(24, ge=1, le=720)  # Up to 30 days
+    hours: int = Query(24, ge=1, le=720),  # Up to 30 days
+    max_points: int = Query(1000, ge=10, le=5000, description="Max points returned"),
+    resolution: str = Query("auto", regex="^(auto|raw|5m|1h|1d)$", description="Source resolution"),
+    method: str = Query("average", regex="^(average|lttb)$", description="Downsampling method"),
+    metric: str = Query("total_pnodes", description="Metric whose shape LTTB preserves"),
+    accept: str = Header(None)
 ):
     """
     Returns historical network metrics for trend analysis.
     
     Parameters:
     - hours: How many hours of history to return (max 720 = 30 days)
+    - max_points: Max points returned (default 1000)
+    - resolution: auto, raw, 5m, 1h or 1d (default auto)
+    - method: average (bucket averages) or lttb (shape-preserving)
+    - metric: Metric LTTB preserves (default total_pnodes)
+    
+    With resolution=auto, average reads the finest 5m/1h/1d rollup that
+    fits max_points; lttb reads a finer one (up to 10x max_points) and keeps
+    the points that preserve the chart shape. Anything still over
+    max_points is downsampled, so the response size is bounded.
+    
+    With `Accept: application/x-ndjson`, the points stored at the chosen
+    resolution are streamed one per line straight from the cursor, without
+    downsampling or summary (max_points only guides resolution=auto).
     
     Perfect for rendering charts showing network growth over time.
     """
     from .db import pnodes_snapshots
     
+    if metric not in HISTORY_METRICS:
+        return JSONResponse(
+            jsonrpc_error(f"Unknown metric: {metric}. Use one of: {', '.join(HISTORY_METRICS)}", INVALID_REQUEST),
+            status_code=400
+        )
+    
     now = int(time.time())
     start_time = now - (hours * 3600)
+    if resolution == "auto":
+        budget = max_points * LTTB_OVERSAMPLE if method == "lttb" else max_points
+        resolution = choose_resolution(hours * 3600, budget, CACHE_TTL)
     
-    cursor = pnodes_snapshots.find({
-        "timestamp": {"$gte": start_time}
-    }).sort("timestamp", 1)
+    if wants_ndjson(accept):
+        return ndjson_response(iter_history_points(start_time, now, resolution), {"X-Resolution": resolution})
     
-    history = []
-    for doc in cursor:
-        doc = sanitize_mongo(doc)
-        history.append(doc)
+    history = get_history_points(start_time, now, resolution)
+    source_points = len(history)
+    history = downsample(history, max_points, method, metric)
     
     if not history:
         return {
@@ -1072,14 +1139,19 @@ async def get_network_history(
             "summary": {
                 "data_points": 0,
                 "time_range_hours": hours,
+                "resolution": resolution,
                 "message": "No historical data available yet. Wait a few minutes for snapshots to accumulate."
             },
             "timestamp": now
         }
     
     # Calculate trends - NULL-SAFE
+    # Compare the first and last raw snapshot, whatever the resolution
     first = history[0]
     last = history[-1]
+    if resolution != "raw":
+        first = pnodes_snapshots.find_one({"timestamp": {"$gte": start_time}}, sort=[("timestamp", 1)]) or first
+        last = pnodes_snapshots.find_one({"timestamp": {"$lte": now}}, sort=[("timestamp", -1)]) or last
     
     first_count = safe_get(first, "total_pnodes", 0)
     last_count = safe_get(last, "total_pnodes", 0)
@@ -1105,7 +1177,10 @@ async def get_network_history(
         "history": history,
         "summary": {
             "data_points": len(history),
+            "source_points": source_points,
             "time_range_hours": hours,
+            "resolution": resolution,
+            "downsampling": method if source_points > len(history) else None,
             "start_timestamp": safe_get(first, "timestamp", 0),
             "end_timestamp": safe_get(last, "timestamp", 0),
             "start_time_readable": first.get("timestamp_readable", ""),
@@ -1177,88 +1252,38 @@ async def get_network_analytics():
     - Storage utilization trends
     - Network connectivity health
     """
-    # Get current snapshot
-    snapshot = nodes_current.find_one({"_id": "snapshot"})
-    if not snapshot or "data" not in snapshot:
+    # Current-state counters are maintained per ingestion cycle
+    view = current_view()
+    if view is None:
         return JSONResponse(
             jsonrpc_error("Snapshot not available", INTERNAL_ERROR),
             status_code=503
         )
     
-    data = snapshot["data"]
-    summary = data.get("summary", {})
+    aggregates = view.aggregates
     
     # Get growth metrics for different time periods
     growth_24h = get_growth_metrics(24)
     growth_7d = get_growth_metrics(168)  # 7 days
     
-    # Analyze current state
-    pnodes = data.get("merged_pnodes_unique", [])
-    
-    # Version analysis
-    version_dist = {}
-    latest_version_count = 0
-    outdated_count = 0
+    # Version analysis (online nodes)
+    version_dist = aggregates["version_distribution"]
+    latest_version_count = version_dist.get("0.7.0", 0)  # Latest version
+    outdated_count = sum(count for v, count in version_dist.items() if v.startswith("0.6"))
     
-    for pnode in pnodes:
-        v = pnode.get("version") or "unknown"
-        version_dist[v] = version_dist.get(v, 0) + 1
-        
-        if v == "0.7.0":  # Latest version
-            latest_version_count += 1
-        elif v and v.startswith("0.6"):
-            outdated_count += 1
-    
-    total_nodes = len(pnodes)
+    total_nodes = aggregates["online_nodes"]
     version_compliance_pct = (
         (latest_version_count / total_nodes * 100) 
         if total_nodes > 0 else 0
     )
     
-    # Storage analysis
-    storage_buckets = {
-        "empty": 0,        # 0-10%
-        "low": 0,          # 10-30%
-        "optimal": 0,      # 30-70%
-        "high": 0,         # 70-90%
-        "critical": 0      # 90-100%
-    }
-    
-    for pnode in pnodes:
-        usage = pnode.get("storage_usage_percent") or 0
-        if usage < 10:
-            storage_buckets["empty"] += 1
-        elif usage < 30:
-            storage_buckets["low"] += 1
-        elif usage < 70:
-            storage_buckets["optimal"] += 1
-        elif usage < 90:
-            storage_buckets["high"] += 1
-        else:
-            storage_buckets["critical"] += 1
-    
-    # Network connectivity analysis
-    peer_count_dist = {
-        "isolated": 0,     # 0-1 peers
-        "weak": 0,         # 2 peers
-        "good": 0,         # 3-4 peers
-        "excellent": 0     # 5+ peers
-    }
-    
-    for pnode in pnodes:
-        peer_count = len(pnode.get("peer_sources") or [])
-        if peer_count <= 1:
-            peer_count_dist["isolated"] += 1
-        elif peer_count == 2:
-            peer_count_dist["weak"] += 1
-        elif peer_count <= 4:
-            peer_count_dist["good"] += 1
-        else:
-            peer_count_dist["excellent"] += 1
+    # Storage and connectivity buckets
+    storage_buckets = aggregates["storage_buckets"]
+    peer_count_dist = aggregates["peer_count_distribution"]
     
     # Public vs Private ratio
-    public_count = sum(1 for p in pnodes if p.get("is_public"))
-    private_count = total_nodes - public_count
+    public_count = aggregates["public_nodes"]
+    private_count = aggregates["private_nodes"]
     
     return {
         "current_state": {
@@ -1366,7 +1391,12 @@ def generate_network_recommendations(version_compliance, storage_buckets, peer_d
 @app.get("/node/{address:path}/history", summary="Get node historical data")
 async def get_node_history_endpoint(
     address: str, 
-    days: int = Query(30, ge=1, le=90, description="Days of history to retrieve")
+    days: int = Query(30, ge=1, le=90, description="Days of history to retrieve"),
+    max_points: int = Query(1000, ge=10, le=5000, description="Max history points returned"),
+    resolution: str = Query("auto", regex="^(auto|raw|1h|1d)$", description="Source resolution"),
+    method: str = Query("average", regex="^(average|lttb)$", description="Downsampling method"),
+    metric: str = Query("score", description="Metric whose shape LTTB preserves"),
+    accept: str = Header(None)
 ):
     """
     Get historical metrics for a specific node.
@@ -1381,14 +1411,40 @@ async def get_node_history_endpoint(
     Parameters:
     - address: Node address (IP:port format, e.g., "109.199.96.218:9001")
     - days: How many days of history (1-90, default 30)
+    - max_points: Max history points returned (default 1000)
+    - resolution: auto, raw, 1h or 1d (default auto)
+    - method: average (bucket averages) or lttb (shape-preserving)
+    - metric: Metric LTTB preserves (default score)
     
     Returns:
-        - history: Array of snapshots with timestamps
+        - history: Array of snapshots with timestamps (downsampled to max_points)
         - trends: Calculated trends (uptime change, storage growth, score change)
-        - availability: Online/offline statistics
+        - availability: Online/offline statistics (over all snapshots)
         - current_status: Latest known state
+    
+    With resolution=auto, raw samples are read only while the range fits
+    max_points (10x for lttb); longer ranges read 1h or 1d averages
+    computed by MongoDB, so the samples are never loaded. Anything still
+    over max_points is downsampled.
+    
+    With `Accept: application/x-ndjson`, every sample in the range is
+    streamed one per line from the hourly buckets, without downsampling.
     """
-    result = get_node_history(address, days)
+    if metric not in NODE_HISTORY_METRICS:
+        return JSONResponse(
+            jsonrpc_error(f"Unknown metric: {metric}. Use one of: {', '.join(NODE_HISTORY_METRICS)}", INVALID_REQUEST),
+            status_code=400
+        )
+    
+    if wants_ndjson(accept):
+        start_time = int(time.time()) - days * 86400
+        return ndjson_response(iter_node_samples(address, start_time))
+    
+    if resolution == "auto":
+        budget = max_points * LTTB_OVERSAMPLE if method == "lttb" else max_points
+        resolution = choose_resolution(days * 86400, budget, CACHE_TTL, NODE_HISTORY_RESOLUTIONS)
+    
+    result = get_node_history(address, days, resolution)
     
     if not result.get("available"):
         return JSONResponse(
@@ -1402,6 +1458,16 @@ async def get_node_history_endpoint(
             status_code=200  # Not an error, just no data yet
         )
     
+    # Trends and availability above use every snapshot; only the series is reduced
+    history = downsample(result["history"], max_points, method, metric)
+    result["downsampling"] = {
+        "method": method if len(history) < len(result["history"]) else None,
+        "source_points": len(result["history"]),
+        "returned_points": len(history),
+        "max_points": max_points
+    }
+    result["history"] = history
+    
     return result
 
 
@@ -1443,6 +1509,63 @@ async def get_node_metrics_endpoint(
     }
 
 
+# Output buckets for /node/{address}/aggregate
+AGGREGATE_BUCKETS = {"5m": 300, "15m": 900, "1h": 3600, "6h": 21600, "1d": 86400, "all": None}
+
+
+@app.get("/node/{address:path}/aggregate", summary="Aggregate a node metric over time buckets")
+async def get_node_aggregate_endpoint(
+    address: str,
+    metric: str = Query("score", description="Metric to aggregate"),
+    fn: str = Query("avg", regex="^(avg|min|max|sum|p95)$", description="Aggregation function"),
+    bucket: str = Query("1h", regex="^(5m|15m|1h|6h|1d|all)$", description="Output bucket size"),
+    hours: int = Query(24, ge=1, le=720, description="Hours to analyze")
+):
+    """
+    Aggregate one metric of a node per time bucket.
+    
+    Computed by a MongoDB pipeline over the hourly history buckets; only
+    the aggregated values are returned.
+    
+    Parameters:
+    - address: Node address
+    - metric: score, trust_score, capacity_score, uptime, storage_used,
+      storage_committed, storage_usage_percent, peer_count or is_online
+    - fn: avg, min, max, sum or p95 (p95 needs MongoDB 7.0+)
+    - bucket: 5m, 15m, 1h, 6h, 1d or all (one value for the whole range)
+    - hours: Time window (1-720 hours, default 24)
+    
+    Example: `/node/109.199.96.218:9001/aggregate?metric=score&fn=p95&bucket=1d&hours=168`
+    """
+    if metric not in NODE_HISTORY_METRICS:
+        return JSONResponse(
+            jsonrpc_error(f"Unknown metric: {metric}. Use one of: {', '.join(NODE_HISTORY_METRICS)}", INVALID_REQUEST),
+            status_code=400
+        )
+    
+    now = int(time.time())
+    start_time = now - hours * 3600
+    
+    try:
+        points = get_node_aggregate(address, metric, fn, start_time, now + 1, AGGREGATE_BUCKETS[bucket])
+    except Exception as e:
+        logger.error(f"Aggregate query failed for {address}: {e}")
+        return JSONResponse(
+            jsonrpc_error(f"Failed to aggregate {metric}: {str(e)}", INTERNAL_ERROR),
+            status_code=500
+        )
+    
+    return {
+        "address": address,
+        "metric": metric,
+        "fn": fn,
+        "bucket": bucket,
+        "time_range_hours": hours,
+        "points": points,
+        "timestamp": now
+    }
+
+
 @app.get("/nodes/history-status", summary="Check which nodes have history data")
 async def get_nodes_history_status():
     """
@@ -1456,49 +1579,28 @@ async def get_nodes_history_status():
         - oldest_snapshot: Timestamp of oldest data
         - newest_snapshot: Timestamp of newest data
     """
-    from .db import pnodes_node_history
+    from .db import get_history_catalog
     
     try:
-        # Get unique addresses with history
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$address",
-                    "count": {"$sum": 1},
-                    "first_seen": {"$min": "$timestamp"},
-                    "last_seen": {"$max": "$timestamp"}
-                }
-            },
-            {
-                "$sort": {"count": -1}
-            },
-            {
-                "$limit": 100
-            }
-        ]
-        
-        results = list(pnodes_node_history.aggregate(pipeline))
-        
-        # Get global stats
-        oldest = pnodes_node_history.find_one(sort=[("timestamp", 1)])
-        newest = pnodes_node_history.find_one(sort=[("timestamp", -1)])
+        # Per-node extent is maintained by the history writer (no collection scan)
+        entries, totals, node_count = get_history_catalog(limit=100)
         
         return {
-            "total_nodes_with_history": len(results),
+            "total_nodes_with_history": node_count,
             "nodes": [
                 {
-                    "address": r["_id"],
-                    "snapshots": r["count"],
-                    "first_seen": r["first_seen"],
-                    "last_seen": r["last_seen"],
-                    "days_tracked": (r["last_seen"] - r["first_seen"]) / 86400
+                    "address": e["address"],
+                    "snapshots": e["points"],
+                    "first_seen": e["first_ts"],
+                    "last_seen": e["last_ts"],
+                    "days_tracked": (e["last_ts"] - e["first_ts"]) / 86400
                 }
-                for r in results
+                for e in entries
             ],
             "global_stats": {
-                "oldest_snapshot": oldest.get("timestamp") if oldest else None,
-                "newest_snapshot": newest.get("timestamp") if newest else None,
-                "total_snapshots": pnodes_node_history.count_documents({})
+                "oldest_snapshot": totals.get("first_ts"),
+                "newest_snapshot": totals.get("last_ts"),
+                "total_snapshots": totals.get("points", 0)
             },
             "timestamp": int(time.time())
         }
@@ -1519,7 +1621,9 @@ logger = logging.getLogger(__name__)
 @app.get("/pnodes/{address:path}/alerts", summary="Get alerts for specific node")
 async def get_node_alerts(
     address: str,
-    severity: str = Query(None, regex="^(critical|warning|info)$")
+    severity: str = Query(None, regex="^(critical|warning|info)$"),
+    history: bool = Query(False, description="Include opened and resolved alerts from pnodes_alerts"),
+    limit: int = Query(50, ge=1, le=500, description="Max history entries")
 ):
     """
     Get all active alerts for a specific node.
@@ -1534,22 +1638,17 @@ async def get_node_alerts(
     Parameters:
     - address: Node address (IP:port)
     - severity: Filter by severity (critical, warning, info)
+    - history: Also return past alerts (open and resolved), newest first
+    - limit: Max history entries (1-500)
     
     Returns:
         - alerts: Array of alert objects
         - summary: Count by severity
         - node_info: Basic node details
+        - history: Past alerts (only with history=true)
     """
-    # Get node data
-    response = await get_pnodes_unified(status="all", limit=10000)
-    all_nodes = response.get("pnodes", [])
-    
-    # Find the specific node
-    node_data = None
-    for node in all_nodes:
-        if node.get("address") == address:
-            node_data = node
-            break
+    # Single-node lookup (alerts are evaluated once per ingestion cycle)
+    node_data = get_node(address)
     
     if not node_data:
         return JSONResponse(
@@ -1560,13 +1659,8 @@ async def get_node_alerts(
             status_code=404
         )
     
-    # Get historical data (if available)
-    # For now, pass None - will be implemented when per-node history exists
-    historical_data = None
-    
-    # Check for alerts
     try:
-        alerts = check_node_alerts(node_data, historical_data)
+        alerts = alerts_for_node(node_data)
         
         # Filter by severity if requested
         if severity:
@@ -1575,7 +1669,7 @@ async def get_node_alerts(
         # Get summary
         summary = get_alerts_summary(alerts)
         
-        return {
+        response = {
             "address": address,
             "alerts": alerts,
             "summary": summary,
@@ -1589,8 +1683,11 @@ async def get_node_alerts(
             },
             "timestamp": int(time.time())
         }
+        if history:
+            response["history"] = get_alert_history(address, limit, severity)
+        return response
     except Exception as e:
-        logger.error(f"Alert check failed for {address}: {e}")
+        logger.error(f"Alert lookup failed for {address}: {e}")
         return JSONResponse(
             {
                 "error": "Alert check failed",
@@ -1617,70 +1714,107 @@ async def get_all_alerts(
     Parameters:
     - severity: Filter by severity level
     - alert_type: Filter by alert type (offline, low_uptime, etc.)
-    - limit: Max nodes to check (default 100)
+    - limit: Max critical nodes to return (default 100)
     
     Returns:
-        - alerts_by_node: Dict of address -> alerts array
         - summary: Overall alert statistics
         - critical_nodes: Nodes with critical alerts
     """
-    # Get all nodes
-    response = await get_pnodes_unified(status="all", limit=limit)
-    all_nodes = response.get("pnodes", [])
-    
-    alerts_by_node = {}
-    all_alerts = []
-    critical_nodes = []
+    # Alerts are evaluated once per ingestion cycle
+    view = current_view()
+    if view is None:
+        return JSONResponse(
+            jsonrpc_error("Snapshot not available", INTERNAL_ERROR),
+            status_code=503
+        )
     
-    for node in all_nodes:
-        address = node.get("address")
-        if not address:
-            continue
-        
-        try:
-            # Check alerts for this node
-            alerts = check_node_alerts(node)
-            
-            if alerts:
-                alerts_by_node[address] = alerts
-                all_alerts.extend(alerts)
-                
-                # Track critical nodes
-                has_critical = any(a.get("severity") == "critical" for a in alerts)
-                if has_critical:
-                    critical_nodes.append({
-                        "address": address,
-                        "alert_count": len(alerts),
-                        "critical_alerts": [a for a in alerts if a.get("severity") == "critical"]
-                    })
-        except Exception as e:
-            logger.error(f"Alert check failed for {address}: {e}")
-            continue
+    index = view.alerts
     
     # Filter alerts if requested
-    if severity or alert_type:
-        filtered_alerts = filter_alerts(all_alerts, severity=severity, alert_type=alert_type)
-        summary = get_alerts_summary(filtered_alerts)
-    else:
-        filtered_alerts = all_alerts
-        summary = get_alerts_summary(all_alerts)
-    
-    # Sort critical nodes by alert count
-    critical_nodes.sort(key=lambda x: x["alert_count"], reverse=True)
+    summary = get_alerts_summary(index.select(severity=severity, alert_type=alert_type))
     
     return {
         "summary": summary,
-        "critical_nodes": critical_nodes,
-        "nodes_checked": len(all_nodes),
-        "nodes_with_alerts": len(alerts_by_node),
+        "critical_nodes": index.critical_nodes()[:limit],
+        "nodes_checked": view.total_count,
+        "nodes_with_alerts": len(index.by_address),
         "filters": {
             "severity": severity,
             "alert_type": alert_type
         },
+        "evaluated_at": index.evaluated_at,
         "timestamp": int(time.time())
     }
 
 
+@app.get("/alerts/stream", summary="Stream alert transitions (Server-Sent Events)")
+async def stream_alerts(
+    request: Request,
+    severity: str = Query(None, regex="^(critical|warning|info)$"),
+    address: str = Query(None, description="Only alerts for this node"),
+    after: int = Query(None, ge=0, description="Resume after this event id"),
+    last_event_id: str = Header(None)
+):
+    """
+    Push alert open/resolve events as the ingestion cycle detects them.
+    
+    Each event is `id: <sequence>`, `event: opened|resolved` and the alert
+    as JSON data. Reconnecting EventSource clients send Last-Event-ID and
+    get exactly the transitions they missed (from memory, or from MongoDB
+    for older gaps). Without an id only new transitions are sent.
+    
+    Parameters:
+    - severity: Only alerts of this severity
+    - address: Only alerts for this node
+    - after: Resume point for clients that can't send Last-Event-ID
+    """
+    if last_event_id is not None:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            return JSONResponse(
+                jsonrpc_error(f"Invalid Last-Event-ID: {last_event_id}", INVALID_REQUEST),
+                status_code=400
+            )
+    
+    # Subscribe before replaying so nothing published in between is lost
+    queue = alert_feed.subscribe()
+    backlog, complete = alert_feed.replay(after) if after is not None else ([], True)
+    
+    async def events():
+        last_seq = after if after is not None else -1
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            for event in backlog:
+                last_seq = event["seq"]
+                if alert_event_matches(event, severity, address):
+                    yield format_event(event)
+            if not complete:
+                return  # Client resumes from the last event id
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return  # Fell behind; client resumes from the last event id
+                if event["seq"] <= last_seq:
+                    continue
+                last_seq = event["seq"]
+                if alert_event_matches(event, severity, address):
+                    yield format_event(event)
+        finally:
+            alert_feed.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/alerts/critical", summary="Get only critical alerts")
 async def get_critical_alerts_only():
     """
@@ -1689,12 +1823,303 @@ async def get_critical_alerts_only():
     Returns only nodes with critical severity alerts.
     Perfect for dashboards and alerting systems.
     """
-    response = await get_all_alerts(severity="critical", limit=1000)
+    response = await get_all_alerts(severity="critical", alert_type=None, limit=1000)
     return response
 
+DASHBOARD_SECTIONS = ("health", "network_health", "pnodes", "history", "critical_alerts", "analytics")
+
+
+@app.get("/dashboard", summary="Dashboard sections in one response")
+async def get_dashboard(
+    sections: str = Query(",".join(DASHBOARD_SECTIONS), description="Comma-separated sections"),
+    pnodes_limit: int = Query(5, ge=1, le=100, description="Top nodes (by score) in the pnodes section"),
+    history_hours: int = Query(24, ge=1, le=720),
+    history_points: int = Query(300, ge=10, le=5000)
+):
+    """
+    Several page payloads in one round trip, all from the same cycle.
+    
+    Each section is the body of the matching endpoint, computed against one
+    pinned view:
+    - health: /health
+    - network_health: /network/health
+    - pnodes: /pnodes?status=online&sort_by=score&limit=pnodes_limit
+    - history: /network/history?hours=history_hours&max_points=history_points&method=lttb
+    - critical_alerts: /alerts/critical
+    - analytics: /network/analytics
+    
+    A section that fails is reported under "errors" with its error body;
+    the others are still returned.
+    """
+    requested = list(dict.fromkeys(s.strip() for s in sections.split(",") if s.strip()))
+    unknown = [s for s in requested if s not in DASHBOARD_SECTIONS]
+    if unknown or not requested:
+        return JSONResponse(
+            jsonrpc_error(f"Unknown section(s): {', '.join(unknown)}. Use: {', '.join(DASHBOARD_SECTIONS)}", INVALID_REQUEST),
+            status_code=400
+        )
+    
+    view = current_view()
+    if view is None:
+        return JSONResponse(
+            jsonrpc_error("Snapshot not available", INTERNAL_ERROR),
+            status_code=503
+        )
+    
+    now = int(time.time())
+    builders = {
+        "health": lambda: health_status(view.snapshot_summary, view.ip_node_count, now),
+        "network_health": get_network_health,
+        "pnodes": lambda: get_pnodes_unified(
+            status="online", limit=pnodes_limit, skip=0, sort_by="score", sort_order="desc",
+            since=None, accept=None
+        ),
+        "history": lambda: get_network_history(
+            hours=history_hours, max_points=history_points, resolution="auto",
+            method="lttb", metric="total_pnodes", accept=None
+        ),
+        "critical_alerts": get_critical_alerts_only,
+        "analytics": get_network_analytics,
+    }
+    
+    results, errors = {}, {}
+    with pinned_view(view):
+        for name in requested:
+            try:
+                body = builders[name]()
+                if asyncio.iscoroutine(body):
+                    body = await body
+            except Exception as e:
+                logger.error(f"Dashboard section {name} failed: {e}")
+                body = JSONResponse(jsonrpc_error(str(e), INTERNAL_ERROR), status_code=500)
+            if isinstance(body, JSONResponse):
+                errors[name] = json.loads(body.body)
+            else:
+                results[name] = body
+    
+    return {
+        "cycle": view.cycle_id,
+        "sections": results,
+        "errors": errors,
+        "timestamp": now
+    }
+
+# JSON-RPC methods: name -> (network handler, node handler), each a
+# (function, params spec) pair. The node variant is used when params
+# include "address".
+SEVERITIES = ("critical", "warning", "info")
+
+RPC_METHODS = {
+    "pnodes": (
+        (lambda p: get_pnodes_unified(accept=None, **p), {
+            "status": (str, "online", one_of("all", "online", "offline")),
+            "limit": (int, 100, between(1, 1000)),
+            "skip": (int, 0, between(0)),
+            "sort_by": (str, "last_seen", one_of(
+                "last_seen", "uptime", "score", "storage_used", "storage_usage_percent", "first_seen"
+            )),
+            "sort_order": (str, "desc", one_of("asc", "desc")),
+            "since": (int, None, None),
+        }),
+        None,
+    ),
+    "node": (
+        None,
+        (lambda p: rpc_node(**p), {
+            "address": (str, REQUIRED, None),
+            "include_alerts": (bool, False, None),
+        }),
+    ),
+    "alerts": (
+        (lambda p: get_all_alerts(**p), {
+            "severity": (str, None, one_of(*SEVERITIES)),
+            "alert_type": (str, None, None),
+            "limit": (int, 100, between(1, 500)),
+        }),
+        (lambda p: get_node_alerts(**p), {
+            "address": (str, REQUIRED, None),
+            "severity": (str, None, one_of(*SEVERITIES)),
+            "history": (bool, False, None),
+            "limit": (int, 50, between(1, 500)),
+        }),
+    ),
+    "history": (
+        (lambda p: get_network_history(accept=None, **p), {
+            "hours": (int, 24, between(1, 720)),
+            "max_points": (int, 1000, between(10, 5000)),
+            "resolution": (str, "auto", one_of("auto", "raw", "5m", "1h", "1d")),
+            "method": (str, "average", one_of("average", "lttb")),
+            "metric": (str, "total_pnodes", None),
+        }),
+        (lambda p: get_node_history_endpoint(accept=None, **p), {
+            "address": (str, REQUIRED, None),
+            "days": (int, 30, between(1, 90)),
+            "max_points": (int, 1000, between(10, 5000)),
+            "resolution": (str, "auto", one_of("auto", "raw", "1h", "1d")),
+            "method": (str, "average", one_of("average", "lttb")),
+            "metric": (str, "score", None),
+        }),
+    ),
+    "consistency": (
+        (lambda p: get_gossip_consistency(**p), {
+            "min_consistency": (float, 0.0, between(0.0, 1.0)),
+            "sort_by": (str, "consistency_score", one_of("consistency_score", "gossip_disappearances", "address")),
+            "limit": (int, 100, between(1, 500)),
+            "cursor": (str, None, None),
+        }),
+        (lambda p: get_node_consistency(**p), {
+            "address": (str, REQUIRED, None),
+            "window": (str, None, one_of("1h", "24h", "7d", "30d")),
+        }),
+    ),
+}
+
+# Calls accepted in one batch request
+MAX_RPC_BATCH = 100
+
+
+async def rpc_node(address: str, include_alerts: bool):
+    """"node" method: the unified node, optionally with its open alerts."""
+    node = get_node(address)
+    if node is None:
+        return JSONResponse(
+            jsonrpc_error(f"Node not found: {address}", INVALID_PARAMS),
+            status_code=404
+        )
+    if include_alerts:
+        return {**node, "alerts": alerts_for_node(node)}
+    return node
+
+
+def rpc_error_from_response(response: JSONResponse, id) -> dict:
+    """
+    JSON-RPC error for an endpoint's error response.
+
+    Endpoints answer with either a jsonrpc_error() body or a plain
+    {"error": "..."} body; 4xx statuses map to INVALID_PARAMS.
+    """
+    body = json.loads(response.body)
+    error = body.get("error")
+    if isinstance(error, dict):
+        message, code = error.get("message"), error.get("code", INTERNAL_ERROR)
+    else:
+        message = error or "Request failed"
+        code = INVALID_PARAMS if 400 <= response.status_code < 500 else INTERNAL_ERROR
+    result = jsonrpc_error(message, code, id)
+    result["error"]["data"] = {"status_code": response.status_code}
+    return result
+
+
+async def rpc_call(call) -> dict:
+    """
+    Execute one JSON-RPC request object.
+
+    Returns:
+        Response object, or None for a notification (no "id")
+    """
+    if not isinstance(call, dict) or call.get("jsonrpc") != "2.0" or not isinstance(call.get("method"), str):
+        return jsonrpc_error("Invalid Request", INVALID_REQUEST, None)
+
+    id = call.get("id")
+    notification = "id" not in call
+    if not isinstance(id, (str, int, type(None))) or isinstance(id, bool):
+        return jsonrpc_error("Invalid Request: id must be a string, number or null", INVALID_REQUEST, None)
+
+    method = RPC_METHODS.get(call["method"])
+    if method is None:
+        result = jsonrpc_error(
+            f"Method not found: {call['method']}. Use one of: {', '.join(RPC_METHODS)}",
+            METHOD_NOT_FOUND, id
+        )
+        return None if notification else result
+
+    params = call.get("params")
+    network, node = method
+    handler = node if (isinstance(params, dict) and "address" in params) or network is None else network
+
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown param(s): address ({call['method']} has no per-node form)")
+        function, spec = handler
+        values = validate_params(params, spec)
+        body = await function(values)
+    except ValueError as e:
+        body = JSONResponse(jsonrpc_error(str(e), INVALID_PARAMS), status_code=400)
+    except Exception as e:
+        logger.error(f"RPC method {call['method']} failed: {e}")
+        body = JSONResponse(jsonrpc_error(str(e), INTERNAL_ERROR), status_code=500)
+
+    if notification:
+        return None
+    if isinstance(body, JSONResponse):
+        if body.status_code >= 400:
+            return rpc_error_from_response(body, id)
+        body = json.loads(body.body)
+    return jsonrpc_success(body, id)
+
+
+def run_rpc_call(call) -> dict:
+    """rpc_call() on its own event loop, for a worker thread."""
+    return asyncio.run(rpc_call(call))
+
+
+@app.post("/rpc", summary="JSON-RPC 2.0 API (single and batch)")
+async def rpc(request: Request):
+    """
+    JSON-RPC 2.0 access to the analytics queries.
+    
+    Methods (params by name, same names and limits as the REST endpoints):
+    - pnodes: /pnodes
+    - node: unified node for params.address (include_alerts: true adds its alerts)
+    - alerts: /alerts, or /pnodes/{address}/alerts with params.address
+    - history: /network/history, or /node/{address}/history with params.address
+    - consistency: /network/consistency, or /node/{address}/consistency with params.address
+    
+    A batch (JSON array of up to MAX_RPC_BATCH requests) runs its calls
+    concurrently against one pinned view, so every result comes from the
+    same cycle. The handlers make synchronous MongoDB queries, so each call
+    runs in a worker thread (asyncio.to_thread copies the context, pinned
+    view included) and the event loop is never blocked by a batch.
+    Notifications (no "id") get no response entry; a batch of only
+    notifications returns 204.
+    """
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        return JSONResponse(jsonrpc_error("Parse error", PARSE_ERROR, None))
+    
+    batch = isinstance(payload, list)
+    calls = payload if batch else [payload]
+    if not calls:
+        return JSONResponse(jsonrpc_error("Invalid Request: empty batch", INVALID_REQUEST, None))
+    if len(calls) > MAX_RPC_BATCH:
+        return JSONResponse(
+            jsonrpc_error(f"Batch too large: {len(calls)} calls (max {MAX_RPC_BATCH})", INVALID_REQUEST, None)
+        )
+    
+    view = current_view()
+    with pinned_view(view):
+        responses = await asyncio.gather(*(asyncio.to_thread(run_rpc_call, call) for call in calls))
+    responses = [r for r in responses if r is not None]
+    
+    if not responses:
+        return Response(status_code=204)
+    return JSONResponse(responses if batch else responses[0])
+
+
+MAX_COMPARE_NODES = 100
+MAX_BATCH_NODES = 500
+
+# Registry fields read for include_consistency
+CONSISTENCY_FIELDS = {
+    "_id": 0, "address": 1, "gossip_appearances": 1, "gossip_disappearances": 1,
+    "consistency_score": 1, "last_gossip_drop": 1, "last_gossip_appearance": 1
+}
+
+
 @app.get("/pnodes/compare", summary="Compare multiple nodes side-by-side")
 async def compare_nodes(
-    addresses: str = Query(..., description="Comma-separated addresses (2-5 nodes)")
+    addresses: str = Query(..., description=f"Comma-separated addresses (2-{MAX_COMPARE_NODES} nodes)")
 ):
     """
     Compare multiple nodes side-by-side.
@@ -1705,7 +2130,7 @@ async def compare_nodes(
     - Identifying best performers
     
     Parameters:
-    - addresses: Comma-separated list of addresses (max 5)
+    - addresses: Comma-separated list of addresses (max 100)
       Example: "192.168.1.1:9001,10.0.0.5:9001"
     
     Returns:
@@ -1713,8 +2138,8 @@ async def compare_nodes(
         - winners: Best node for each category
         - recommendations: Which to choose and why
     """
-    # Parse addresses
-    address_list = [a.strip() for a in addresses.split(",") if a.strip()]
+    # Parse addresses (duplicates ignored, order kept)
+    address_list = list(dict.fromkeys(a.strip() for a in addresses.split(",") if a.strip()))
     
     # Validate count
     if len(address_list) < 2:
@@ -1726,21 +2151,17 @@ async def compare_nodes(
             status_code=400
         )
     
-    if len(address_list) > 5:
+    if len(address_list) > MAX_COMPARE_NODES:
         return JSONResponse(
             {
-                "error": "Maximum 5 nodes can be compared at once",
+                "error": f"Maximum {MAX_COMPARE_NODES} nodes can be compared at once",
                 "provided": len(address_list)
             },
             status_code=400
         )
     
-    # Get all nodes
-    response = await get_pnodes_unified(status="all", limit=10000)
-    all_nodes = response.get("pnodes", [])
-    
-    # Build map for quick lookup
-    nodes_map = {node.get("address"): node for node in all_nodes if node.get("address")}
+    # Batched lookup of just the requested nodes
+    nodes_map = lookup_nodes(address_list)
     
     # Find requested nodes
     comparison_nodes = []
@@ -1889,6 +2310,98 @@ async def compare_nodes(
         "timestamp": int(time.time())
     }
 
+
+@app.post("/pnodes/batch", summary="Unified data for a list of nodes")
+async def get_pnodes_batch(request: Request):
+    """
+    Unified records for many nodes in one request (e.g. a staking portfolio).
+    
+    Body (JSON):
+    - addresses: List of node addresses (1-500)
+    - include_alerts: Add each node's open alerts (default false)
+    - include_consistency: Add each node's gossip consistency (default false)
+    - window: Consistency window (1h, 24h, 7d, 30d; default lifetime)
+    
+    Nodes and alerts come from the published view. Consistency costs one
+    registry query and one presence query for the whole list, so the
+    number of database queries does not grow with the number of addresses.
+    
+    Returns:
+        - nodes: Unified nodes, in request order
+        - missing: Addresses not found
+        - summary: Counts
+    """
+    try:
+        body = json.loads(await request.body())
+        params = validate_params(body, {
+            "addresses": (list, REQUIRED, None),
+            "include_alerts": (bool, False, None),
+            "include_consistency": (bool, False, None),
+            "window": (str, None, one_of("1h", "24h", "7d", "30d")),
+        })
+    except ValueError as e:
+        return JSONResponse(jsonrpc_error(f"Invalid body: {e}", INVALID_REQUEST), status_code=400)
+    
+    if not all(isinstance(a, str) for a in params["addresses"]):
+        return JSONResponse(jsonrpc_error("addresses must be strings", INVALID_REQUEST), status_code=400)
+    
+    # Duplicates ignored, order kept
+    address_list = list(dict.fromkeys(a.strip() for a in params["addresses"] if a.strip()))
+    if not address_list or len(address_list) > MAX_BATCH_NODES:
+        return JSONResponse(
+            jsonrpc_error(f"Provide 1-{MAX_BATCH_NODES} addresses ({len(address_list)} given)", INVALID_REQUEST),
+            status_code=400
+        )
+    
+    nodes_map = lookup_nodes(address_list)
+    found = [a for a in address_list if a in nodes_map]
+    
+    consistency = {}
+    if params["include_consistency"] and found:
+        now = int(time.time())
+        try:
+            entries = get_registry_entries(found, CONSISTENCY_FIELDS)
+            windows = get_presence_windows_batch(found, now=now)
+        except Exception as e:
+            logger.error(f"Batch consistency lookup failed: {e}")
+            return JSONResponse(
+                jsonrpc_error(f"Failed to read consistency: {str(e)}", INTERNAL_ERROR),
+                status_code=500
+            )
+        consistency = {
+            a: consistency_summary(entries.get(a, {}), windows.get(a, {}), params["window"])
+            for a in found
+        }
+    
+    nodes = []
+    alert_count = 0
+    for address in found:
+        node = nodes_map[address]
+        if params["include_alerts"]:
+            alerts = alerts_for_node(node)
+            alert_count += len(alerts)
+            node = {**node, "alerts": alerts}
+        if params["include_consistency"]:
+            node = {**node, "consistency": consistency[address]}
+        nodes.append(node)
+    
+    summary = {
+        "requested": len(address_list),
+        "found": len(found),
+        "missing": len(address_list) - len(found),
+        "online": sum(1 for n in nodes if n.get("is_online")),
+    }
+    if params["include_alerts"]:
+        summary["alerts"] = alert_count
+    
+    return {
+        "nodes": nodes,
+        "missing": [a for a in address_list if a not in nodes_map],
+        "summary": summary,
+        "timestamp": int(time.time())
+    }
+
+
 # ============================================================================
 # GOSSIP CONSISTENCY ENDPOINTS
 # ============================================================================
@@ -1897,7 +2410,8 @@ async def compare_nodes(
 async def get_gossip_consistency(
     min_consistency: float = Query(0.0, ge=0.0, le=1.0, description="Minimum consistency score filter"),
     sort_by: str = Query("consistency_score", regex="^(consistency_score|gossip_disappearances|address)$"),
-    limit: int = Query(100, ge=1, le=500)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str = Query(None, description="next_cursor from the previous page")
 ):
     """
     Analyze gossip consistency across the network.
@@ -1916,30 +2430,47 @@ async def get_gossip_consistency(
     Parameters:
     - min_consistency: Only show nodes with consistency >= this (0.0-1.0)
     - sort_by: Sort field (default: consistency_score)
-    - limit: Max results
+    - limit: Max results per page
+    - cursor: Resume after the last node of the previous page
     
     Returns:
-        - nodes: Array of nodes with consistency metrics
+        - nodes: Array of nodes with consistency metrics (one page)
         - summary: Network-wide consistency stats
-        - flapping_nodes: Nodes with poor consistency
+        - flapping_nodes: Nodes with poor consistency (on this page)
+        - next_cursor: Token for the next page (None on the last page)
     """
-    # Build query
-    query = {}
-    if min_consistency > 0:
-        query["consistency_score"] = {"$gte": min_consistency}
+    # Only nodes with gossip tracking data; the (sort field, address)
+    # compound index serves both the filter and the keyset sort
+    query = {"consistency_score": {"$gte": min_consistency}}
+    direction = -1 if sort_by == "consistency_score" else 1
+    
+    if cursor:
+        position = decode_cursor(cursor)
+        if not position or "address" not in position or (sort_by != "address" and "value" not in position):
+            return JSONResponse(
+                jsonrpc_error("Invalid cursor", INVALID_REQUEST),
+                status_code=400
+            )
+        if sort_by == "address":
+            query["address"] = {"$gt": position["address"]}
+        else:
+            past = "$lt" if direction == -1 else "$gt"
+            query = {"$and": [query, {"$or": [
+                {sort_by: {past: position["value"]}},
+                {sort_by: position["value"], "address": {"$gt": position["address"]}}
+            ]}]}
     
-    # Fetch nodes with consistency data
-    cursor = pnodes_registry.find(query).sort(
-        sort_by, 
-        -1 if sort_by == "consistency_score" else 1
-    ).limit(limit)
+    sort = [(sort_by, direction)] if sort_by == "address" else [(sort_by, direction), ("address", 1)]
+    cursor_docs = pnodes_registry.find(query).sort(sort).limit(limit)
     
     nodes_with_metrics = []
     flapping_nodes = []
+    last_doc = None
     
     now = int(time.time())
     
-    for doc in cursor:
+    for doc in cursor_docs:
+        last_doc = doc
         doc = sanitize_mongo(doc)
         
         address = doc.get("address")
@@ -1977,33 +2508,17 @@ async def get_gossip_consistency(
         if consistency < 0.8:
             flapping_nodes.append(node_data)
     
-    # Calculate network-wide statistics
-    all_consistency = list(pnodes_registry.find({}, {
-        "consistency_score": 1,
-        "gossip_appearances": 1,
-        "gossip_disappearances": 1
-    }))
-    
-    if all_consistency:
-        consistency_scores = [
-            doc.get("consistency_score", 1.0) 
-            for doc in all_consistency 
-            if doc.get("consistency_score") is not None
-        ]
-        
-        avg_consistency = sum(consistency_scores) / len(consistency_scores) if consistency_scores else 0
-        
-        total_appearances = sum(doc.get("gossip_appearances", 0) for doc in all_consistency)
-        total_disappearances = sum(doc.get("gossip_disappearances", 0) for doc in all_consistency)
-        
-        flapping_count = sum(1 for score in consistency_scores if score < 0.8)
-        stable_count = sum(1 for score in consistency_scores if score >= 0.8)
-    else:
-        avg_consistency = 0
-        total_appearances = 0
-        total_disappearances = 0
-        flapping_count = 0
-        stable_count = 0
+    next_cursor = None
+    if last_doc is not None and len(nodes_with_metrics) == limit:
+        position = {"address": last_doc.get("address")}
+        if sort_by != "address":
+            position["value"] = last_doc.get(sort_by)
+        next_cursor = encode_cursor(position)
+    
+    # Network-wide statistics (maintained by the gossip tracker)
+    stats = get_consistency_stats()
+    tracked = stats.get("tracked_nodes", 0)
+    avg_consistency = stats.get("score_sum", 0) / tracked if tracked > 0 else 0
     
     # Determine network health
     if avg_consistency >= 0.9:
@@ -2018,15 +2533,16 @@ async def get_gossip_consistency(
     return {
         "nodes": nodes_with_metrics,
         "summary": {
-            "total_nodes": len(all_consistency),
-            "flapping_nodes": flapping_count,
-            "stable_nodes": stable_count,
+            "total_nodes": pnodes_registry.estimated_document_count(),
+            "flapping_nodes": stats.get("flapping_nodes", 0),
+            "stable_nodes": stats.get("stable_nodes", 0),
             "avg_consistency_score": round(avg_consistency, 4),
-            "total_network_appearances": total_appearances,
-            "total_network_disappearances": total_disappearances,
+            "total_network_appearances": stats.get("total_appearances", 0),
+            "total_network_disappearances": stats.get("total_disappearances", 0),
             "network_health": network_health
         },
         "flapping_nodes": flapping_nodes,
+        "next_cursor": next_cursor,
         "filters": {
             "min_consistency": min_consistency,
             "sort_by": sort_by
@@ -2035,8 +2551,61 @@ async def get_gossip_consistency(
     }
 
 
+def consistency_status(score: float) -> tuple:
+    """(status, emoji) for a consistency score."""
+    if score < 0.8:
+        return "flapping", "🔴"
+    if score < 0.9:
+        return "unstable", "🟡"
+    return "stable", "🟢"
+
+
+def consistency_summary(registry_entry: dict, windows: dict, window: str = None) -> dict:
+    """
+    Consistency block of one node, as in /node/{address}/consistency.
+
+    Args:
+        registry_entry: Registry document (gossip counters)
+        windows: Presence window stats (see get_presence_windows)
+        window: Score over this window instead of lifetime
+    
+    "window" is the window the score was actually taken from: a requested
+    window with no score (no events or presence data in it) falls back to
+    "lifetime", with the request kept in "requested_window".
+    """
+    appearances = registry_entry.get("gossip_appearances", 0)
+    disappearances = registry_entry.get("gossip_disappearances", 0)
+    lifetime_consistency = consistency = registry_entry.get("consistency_score", 1.0)
+    used = "lifetime"
+    
+    if window and windows.get(window, {}).get("consistency_score") is not None:
+        selected = windows[window]
+        consistency = selected["consistency_score"]
+        appearances = selected["appearances"]
+        disappearances = selected["disappearances"]
+        used = window
+    
+    status, status_emoji = consistency_status(consistency)
+    return {
+        "score": round(consistency, 4),
+        "status": status,
+        "status_emoji": status_emoji,
+        "appearances": appearances,
+        "disappearances": disappearances,
+        "window": used,
+        "requested_window": window or "lifetime",
+        "lifetime_score": round(lifetime_consistency, 4),
+        "last_drop": registry_entry.get("last_gossip_drop"),
+        "last_appearance": registry_entry.get("last_gossip_appearance"),
+        "windows": windows
+    }
+
+
 @app.get("/node/{address:path}/consistency", summary="Get consistency for specific node")
-async def get_node_consistency(address: str):
+async def get_node_consistency(
+    address: str,
+    window: str = Query(None, regex="^(1h|24h|7d|30d)$", description="Score over a sliding window instead of lifetime")
+):
     """
     Get detailed consistency metrics for a specific node.
     
@@ -2044,12 +2613,14 @@ async def get_node_consistency(address: str):
     - Current consistency score
     - Appearance/disappearance history
     - Recent gossip activity
+    - Sliding-window stats (1h/24h/7d/30d) from presence bitmaps
     - Recommendations
     
     Parameters:
     - address: Node address (IP:port format)
+    - window: Base score/status on this window (default: lifetime)
     
-    Example: `/node/109.199.96.218:9001/consistency`
+    Example: `/node/109.199.96.218:9001/consistency?window=24h`
     """
     registry_entry = pnodes_registry.find_one({"address": address})
     
@@ -2064,14 +2635,23 @@ async def get_node_consistency(address: str):
     
     registry_entry = sanitize_mongo(registry_entry)
     
-    appearances = registry_entry.get("gossip_appearances", 0)
-    disappearances = registry_entry.get("gossip_disappearances", 0)
-    consistency = registry_entry.get("consistency_score", 1.0)
     last_drop = registry_entry.get("last_gossip_drop")
     last_appearance = registry_entry.get("last_gossip_appearance")
     
     now = int(time.time())
     
+    # Sliding windows from presence bitmaps (one query for all windows)
+    try:
+        windows = get_presence_windows(address, now=now)
+    except Exception as e:
+        logger.error(f"Presence window lookup failed for {address}: {e}")
+        windows = {}
+    
+    summary = consistency_summary(registry_entry, windows, window)
+    consistency = summary["score"]
+    appearances = summary["appearances"]
+    disappearances = summary["disappearances"]
+    
     # Calculate time-based metrics
     time_since_drop = None
     time_since_drop_hours = None
@@ -2085,17 +2665,6 @@ async def get_node_consistency(address: str):
         time_since_appearance = now - last_appearance
         time_since_appearance_hours = time_since_appearance / 3600
     
-    # Determine status
-    if consistency < 0.8:
-        status = "flapping"
-        status_emoji = "🔴"
-    elif consistency < 0.9:
-        status = "unstable"
-        status_emoji = "🟡"
-    else:
-        status = "stable"
-        status_emoji = "🟢"
-    
     # Generate recommendations
     recommendations = []
     
@@ -2134,14 +2703,18 @@ async def get_node_consistency(address: str):
     return {
         "address": address,
         "consistency": {
-            "score": round(consistency, 4),
-            "status": status,
-            "status_emoji": status_emoji,
+            "score": summary["score"],
+            "status": summary["status"],
+            "status_emoji": summary["status_emoji"],
             "appearances": appearances,
             "disappearances": disappearances,
             "ratio": f"{appearances}:{disappearances}",
-            "total_events": appearances + disappearances
+            "total_events": appearances + disappearances,
+            "window": summary["window"],
+            "requested_window": summary["requested_window"],
+            "lifetime_score": summary["lifetime_score"]
         },
+        "windows": windows,
         "recent_activity": {
             "last_drop": last_drop,
             "last_drop_readable": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(last_drop)) if last_drop else None,
@@ -2162,3 +2735,179 @@ async def get_node_consistency(address: str):
         },
         "timestamp": now
     }
+
+
+@app.get("/node/{address:path}/availability", summary="Get node availability (SLA)")
+async def get_node_availability_endpoint(
+    address: str,
+    window: str = Query("24h", regex="^(1h|24h|7d|30d)$", description="Named window"),
+    hours: int = Query(None, ge=1, le=720, description="Custom window in hours (overrides window)")
+):
+    """
+    Get uptime percentage, outage count and longest outage for a node.
+    
+    Computed from the per-cycle gossip presence bitmaps rather than the
+    history snapshots. Only cycles in which the collector actually ran
+    count towards uptime; a missed cycle continues the previous state.
+    
+    Parameters:
+    - address: Node address (IP:port format)
+    - window: 1h, 24h, 7d or 30d (default: 24h)
+    - hours: Custom window length in hours, 1-720
+    
+    Example: `/node/109.199.96.218:9001/availability?window=7d`
+    """
+    if not pnodes_registry.find_one({"address": address}, {"_id": 1}):
+        return JSONResponse(
+            {
+                "error": f"Node not found: {address}",
+                "suggestion": "Check /registry or /pnodes for valid addresses"
+            },
+            status_code=404
+        )
+    
+    window_seconds = hours * 3600 if hours else WINDOWS[window]
+    now = int(time.time())
+    
+    try:
+        result = get_node_availability(address, window_seconds, now=now)
+    except Exception as e:
+        logger.error(f"Availability lookup failed for {address}: {e}")
+        return JSONResponse(
+            jsonrpc_error(f"Failed to compute availability: {str(e)}", INTERNAL_ERROR),
+            status_code=500
+        )
+    
+    return {
+        "address": address,
+        "window": f"{hours}h" if hours else window,
+        **result,
+        "timestamp": now
+    }
+
+
+@app.get("/export/{dataset}", summary="Download one day of a dataset as Parquet/Arrow")
+async def export_dataset(
+    dataset: str,
+    day: str = Query(None, regex=r"^\d{4}-\d{2}-\d{2}$", description="UTC day (YYYY-MM-DD); required except for registry"),
+    format: str = Query("parquet", regex="^(parquet|arrow)$")
+):
+    """
+    One day partition of an export dataset as a single columnar file.
+    
+    Datasets:
+    - registry: Current copy of the registry (day is ignored)
+    - snapshots: Network history entries of `day`
+    - node_history: Per-node samples of `day`
+    
+    Same files as `python -m app.export`, built on demand with batched
+    cursor reads, so memory stays bounded. For full or recurring dumps use
+    the CLI, which only exports what changed since its last run.
+    """
+    if dataset not in EXPORT_DATASETS:
+        return JSONResponse(
+            jsonrpc_error(f"Unknown dataset: {dataset}. Use one of: {', '.join(EXPORT_DATASETS)}", INVALID_REQUEST),
+            status_code=404
+        )
+    if dataset != "registry" and day is None:
+        return JSONResponse(jsonrpc_error("day is required (YYYY-MM-DD)", INVALID_REQUEST), status_code=400)
+    try:
+        require_pyarrow()
+    except RuntimeError as e:
+        return JSONResponse(jsonrpc_error(str(e), INTERNAL_ERROR), status_code=501)
+    
+    now = int(time.time())
+    if dataset == "registry":
+        day, after, until = partition_day(now), 0, now
+    else:
+        try:
+            start = calendar.timegm(time.strptime(day, "%Y-%m-%d"))
+        except ValueError:
+            return JSONResponse(jsonrpc_error(f"Invalid day: {day}", INVALID_REQUEST), status_code=400)
+        after, until = start - 1, start + 86399
+    
+    directory = tempfile.mkdtemp(prefix="export-")
+    try:
+        result = await asyncio.to_thread(
+            write_dataset, export_rows(dataset, after, until), directory, dataset, format, dataset, day
+        )
+    except Exception as e:
+        shutil.rmtree(directory, ignore_errors=True)
+        logger.error(f"Export of {dataset} failed: {e}")
+        return JSONResponse(jsonrpc_error(f"Export failed: {str(e)}", INTERNAL_ERROR), status_code=500)
+    
+    if not result["files"]:
+        shutil.rmtree(directory, ignore_errors=True)
+        return JSONResponse(jsonrpc_error(f"No {dataset} data for {day}", INVALID_REQUEST), status_code=404)
+    
+    return FileResponse(
+        result["files"][0],
+        media_type="application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.file",
+        filename=f"{dataset}-{day}{EXPORT_FORMATS[format]}",
+        headers={"X-Row-Count": str(result["rows"])},
+        background=BackgroundTask(shutil.rmtree, directory, ignore_errors=True)
+    )
+
+
+# Default payloads rendered to STATIC_DIR after every cycle (see static_site.py)
+static_site.register("pnodes", lambda: get_pnodes_unified(
+    status="online", limit=100, skip=0, sort_by="last_seen", sort_order="desc", since=None, accept=None
+))
+static_site.register("topology", get_network_topology)
+static_site.register("analytics", get_network_analytics)
+static_site.register("recommendations", lambda: get_staking_recommendations(
+    limit=10, min_uptime_days=7, require_public=False
+))
+
+
+@app.get("/static/{name}", summary="Pre-rendered default payloads")
+async def get_static_page(
+    name: str,
+    accept_encoding: str = Header(None),
+    if_none_match: str = Header(None)
+):
+    """
+    Serve a page published by the worker for the latest cycle.
+    
+    Pages (default parameters of each endpoint):
+    - pnodes.json: /pnodes
+    - topology.json: /network/topology
+    - analytics.json: /network/analytics
+    - recommendations.json: /recommendations
+    
+    The pre-compressed .br/.gz file is sent when the client accepts it.
+    In production a reverse proxy can serve STATIC_DIR/current directly
+    instead (see docs/DEPLOYMENT.md).
+    """
+    if not STATIC_DIR:
+        return JSONResponse(
+            jsonrpc_error("Static publishing is disabled (set STATIC_DIR)", INVALID_REQUEST),
+            status_code=404
+        )
+    
+    manifest = static_site.current_manifest(STATIC_DIR)
+    page = name[:-len(".json")] if name.endswith(".json") else name
+    entry = manifest["files"].get(page) if manifest else None
+    if entry is None:
+        return JSONResponse(
+            jsonrpc_error(f"Static page not found: {name}", INVALID_REQUEST),
+            status_code=404
+        )
+    
+    etag = f'"{entry["etag"]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_TTL}",
+        "Vary": "Accept-Encoding",
+        "X-Static-Version": str(manifest["version"]),
+    }
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    
+    # Read from the manifest's own version, not whatever `current` points to now
+    path = os.path.join(STATIC_DIR, static_site.VERSIONS, str(manifest["version"]), entry["path"])
+    encoding = static_site.choose_encoding(accept_encoding, entry["encodings"])
+    if encoding:
+        path += static_site.ENCODINGS[encoding]
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type="application/json", headers=headers)
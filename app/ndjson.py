@@ -0,0 +1,78 @@
+# app/ndjson.py
+"""
+Newline-delimited JSON (NDJSON) encoding for streamed responses.
+
+Large list endpoints (/pnodes, /graveyard, /network/history,
+/node/{address}/history) answer `Accept: application/x-ndjson` with one
+JSON object per line instead of one JSON document:
+
+    {"address": "1.2.3.4:9001", "is_online": true, ...}
+    {"address": "5.6.7.8:9001", "is_online": false, ...}
+
+Rows are encoded as the source (MongoDB cursor or in-memory view) yields
+them and flushed CHUNK_ROWS at a time, so time to first byte and memory
+do not grow with the result size.
+
+A failure after the response has started can't change the status code;
+it is reported as a final {"error": {...}} line instead.
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Media types accepted as a request for NDJSON
+NDJSON_TYPES = (NDJSON_MEDIA_TYPE, "application/ndjson", "application/jsonl")
+
+# Rows encoded per chunk written to the socket
+CHUNK_ROWS = 200
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """
+    Whether an Accept header asks for NDJSON.
+
+    Args:
+        accept: Accept header value (None if absent)
+    """
+    if not accept:
+        return False
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        if media_type.strip().lower() not in NDJSON_TYPES:
+            continue
+        # application/x-ndjson;q=0 means "not acceptable"
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0"):
+            continue
+        return True
+    return False
+
+
+def encode_lines(rows: Iterable[Dict], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encode rows as NDJSON, chunk_rows lines per yielded chunk.
+
+    Args:
+        rows: Any iterable of JSON-serializable dicts (consumed lazily)
+        chunk_rows: Lines per chunk
+
+    Yields:
+        UTF-8 encoded chunks, each ending with a newline
+    """
+    lines = []
+    try:
+        for row in rows:
+            lines.append(json.dumps(row, default=str))
+            if len(lines) >= chunk_rows:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+    except Exception as e:
+        logger.error(f"❌ NDJSON stream failed: {e}")
+        lines.append(json.dumps({"error": {"message": f"Stream interrupted: {str(e)}"}}))
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
@@ -0,0 +1,276 @@
+# app/presence.py
+"""
+Per-node gossip presence bitmaps.
+
+Every ingestion cycle sets one bit per node that appeared in gossip. Bits
+are stored in fixed-size day buckets of SLOTS_PER_DAY cycles (one document
+per node per bucket, 1440 bits = a UTC day at the default 60s TTL) as
+64-bit words. A separate "__network__" bitmap records which cycles the
+collector actually ran, so gaps in collection are not counted against nodes.
+
+Window statistics (availability, appearances/disappearances, consistency,
+outages) are computed with popcounts, bit-transition counts and shifts over
+the assembled bitmap instead of scanning per-node history documents.
+
+This module only does the bit math; reads and writes live in db.py
+(record_presence, get_presence_windows, get_node_availability).
+"""
+
+from typing import Dict, Iterable
+
+from bson.int64 import Int64
+from pymongo import UpdateOne
+
+from .config import CACHE_TTL
+
+SLOT_SECONDS = CACHE_TTL
+SLOTS_PER_DAY = 86400 // SLOT_SECONDS
+WORD_BITS = 64
+NETWORK_KEY = "__network__"
+
+# Named windows served by the API
+WINDOWS = {
+    "1h": 3600,
+    "24h": 86400,
+    "7d": 7 * 86400,
+    "30d": 30 * 86400,
+}
+
+# int.bit_count() is Python 3.10+
+_bit_count = getattr(int, "bit_count", None)
+
+
+def slot_of(timestamp: int) -> int:
+    """Cycle slot number for a unix timestamp."""
+    return int(timestamp) // SLOT_SECONDS
+
+
+def popcount(bits: int) -> int:
+    """Number of set bits."""
+    return _bit_count(bits) if _bit_count else bin(bits).count("1")
+
+
+def to_int64(word: int) -> Int64:
+    """Unsigned 64-bit word -> signed Int64 as stored by MongoDB."""
+    return Int64(word - (1 << 64) if word >= (1 << 63) else word)
+
+
+def from_int64(word) -> int:
+    """Signed Int64 from MongoDB -> unsigned 64-bit word."""
+    return int(word) & ((1 << 64) - 1)
+
+
+def bit_update(address: str, slot: int) -> UpdateOne:
+    """
+    Upsert that sets one presence bit with $bit OR.
+
+    Args:
+        address: Node address (or NETWORK_KEY)
+        slot: Cycle slot number
+    """
+    day, slot_in_day = divmod(slot, SLOTS_PER_DAY)
+    word, bit = divmod(slot_in_day, WORD_BITS)
+    return UpdateOne(
+        {"_id": f"{address}|{day}"},
+        {
+            "$setOnInsert": {"address": address, "day": day},
+            "$bit": {f"w.{word}": {"or": to_int64(1 << bit)}},
+        },
+        upsert=True
+    )
+
+
+def day_range(start_slot: int, end_slot: int) -> tuple:
+    """First and last day bucket covering [start_slot, end_slot)."""
+    return start_slot // SLOTS_PER_DAY, (end_slot - 1) // SLOTS_PER_DAY
+
+
+def assemble_bitmaps(docs: Iterable[Dict], addresses: Iterable[str],
+                     start_slot: int, end_slot: int) -> Dict[str, int]:
+    """
+    Combine day bucket documents into one bitmap per address.
+
+    Bit k of each returned int is slot start_slot + k.
+
+    Args:
+        docs: Presence documents ({address, day, w: {word: Int64}})
+        addresses: Addresses to return (missing ones get 0)
+        start_slot: First slot (inclusive)
+        end_slot: Last slot (exclusive)
+    """
+    first_day, _ = day_range(start_slot, end_slot)
+    bitmaps = {address: 0 for address in addresses}
+
+    for doc in docs:
+        day_bits = 0
+        for word, value in (doc.get("w") or {}).items():
+            day_bits |= from_int64(value) << (int(word) * WORD_BITS)
+        bitmaps[doc["address"]] = bitmaps.get(doc["address"], 0) | (
+            day_bits << ((doc["day"] - first_day) * SLOTS_PER_DAY)
+        )
+
+    offset = start_slot - first_day * SLOTS_PER_DAY
+    mask = (1 << max(0, end_slot - start_slot)) - 1
+    return {address: (bits >> offset) & mask for address, bits in bitmaps.items()}
+
+
+def window_stats(bits: int, observed: int, length: int) -> Dict:
+    """
+    Presence statistics over one window.
+
+    Args:
+        bits: Node presence bitmap (bit k = slot k of the window)
+        observed: Collector bitmap for the same window
+        length: Window length in slots
+
+    Returns:
+        Dict with observed/present cycles, availability, appearances,
+        disappearances, state changes and consistency score
+    """
+    mask = (1 << length) - 1
+    observed &= mask
+    bits &= observed
+
+    observed_cycles = popcount(observed)
+    present_cycles = popcount(bits)
+
+    # Transitions only count between two consecutive observed cycles
+    pairs = observed & (observed >> 1)
+    following = bits >> 1
+    disappearances = popcount(bits & ~following & pairs)
+    appearances = popcount(~bits & following & pairs)
+
+    # Present in the first observed cycle counts as an appearance,
+    # matching the lifetime counters in the registry
+    if observed and bits & (observed & -observed):
+        appearances += 1
+
+    events = appearances + disappearances
+    return {
+        "observed_cycles": observed_cycles,
+        "present_cycles": present_cycles,
+        "availability_percent": round(present_cycles / observed_cycles * 100, 2) if observed_cycles else None,
+        "appearances": appearances,
+        "disappearances": disappearances,
+        "state_changes": popcount((bits ^ following) & pairs),
+        "consistency_score": round(appearances / events, 4) if events else None,
+    }
+
+
+def windows_stats(bits: int, observed: int, total_slots: int, windows: Dict[str, int]) -> Dict[str, Dict]:
+    """
+    window_stats() for several windows ending at the same slot.
+
+    Args:
+        bits: Node bitmap covering the last `total_slots` slots
+        observed: Collector bitmap for the same range
+        total_slots: Length of the bitmaps in slots
+        windows: name -> window length in seconds
+
+    Returns:
+        name -> window_stats() dict (plus window_seconds)
+    """
+    results = {}
+    for name, seconds in windows.items():
+        length = min(seconds // SLOT_SECONDS, total_slots)
+        shift = total_slots - length
+        stats = window_stats(bits >> shift, observed >> shift, length)
+        stats["window_seconds"] = seconds
+        results[name] = stats
+    return results
+
+
+def fill_forward(values: int, known: int, length: int) -> int:
+    """
+    Give every unknown slot the value of the nearest known slot before it.
+
+    Pointer-jumping over the whole bitmap: O(log length) big-int operations.
+    Slots before the first known slot stay 0.
+
+    Args:
+        values: Bit values (only meaningful where known)
+        known: Slots whose value is known
+        length: Bitmap length in slots
+    """
+    mask = (1 << length) - 1
+    values &= known
+    shift = 1
+    while shift < length:
+        unknown = ~known & mask
+        values |= (values << shift) & unknown & mask
+        known |= (known << shift) & mask
+        shift <<= 1
+    return values & mask
+
+
+def longest_run(bits: int) -> tuple:
+    """
+    Length and start of the longest run of consecutive set bits.
+
+    runs[k] has bit i set when bits i..i+2^k-1 are all set; the length is
+    then found by binary lifting, so this costs O(log n) big-int operations
+    however long the runs are.
+
+    Returns:
+        (length, start bit) - (0, None) when no bit is set
+    """
+    if not bits:
+        return 0, None
+
+    runs = [bits]
+    while True:
+        step = 1 << (len(runs) - 1)
+        doubled = runs[-1] & (runs[-1] >> step)
+        if not doubled:
+            break
+        runs.append(doubled)
+
+    length, current = 0, bits
+    for k in range(len(runs) - 1, -1, -1):
+        candidate = current & (runs[k] >> length) if length else runs[k]
+        if candidate:
+            current = candidate
+            length += 1 << k
+    return length, (current & -current).bit_length() - 1
+
+
+def outage_stats(bits: int, observed: int, length: int, start_slot: int) -> Dict:
+    """
+    Outage statistics over one window.
+
+    An outage is a run of consecutive cycles in which the node was absent
+    from gossip. Cycles the collector missed continue the state of the
+    last observed cycle, so collection gaps neither split nor create
+    outages.
+
+    Args:
+        bits: Node presence bitmap (bit k = slot start_slot + k)
+        observed: Collector bitmap for the same window
+        length: Window length in slots
+        start_slot: Slot number of bit 0
+
+    Returns:
+        Dict with outage count, longest/total/current outage in seconds
+        and when the longest outage started
+    """
+    mask = (1 << length) - 1
+    observed &= mask
+    down = fill_forward(observed & ~bits, observed, length)
+
+    # Run starts: down now, not down in the previous slot
+    count = popcount(down & ~(down << 1))
+
+    longest_slots, longest_start = longest_run(down)
+
+    # Ongoing outage: run of down slots ending at the last slot
+    current_slots = 0
+    if down >> (length - 1) & 1:
+        current_slots = length - (mask & ~down).bit_length()
+
+    return {
+        "outage_count": count,
+        "longest_outage_seconds": longest_slots * SLOT_SECONDS,
+        "longest_outage_started_at": (start_slot + longest_start) * SLOT_SECONDS if longest_slots else None,
+        "total_outage_seconds": popcount(down) * SLOT_SECONDS,
+        "current_outage_seconds": current_slots * SLOT_SECONDS,
+    }
@@ -0,0 +1,202 @@
+# app/rollups.py
+"""
+Multi-resolution rollups of network history.
+
+Every pnodes_snapshots entry is also folded into 5-minute, hourly and daily
+rollup documents (one per resolution per bucket) holding count, sum, min,
+max and last value for each numeric metric, plus summed version counts.
+/network/history reads the finest resolution that fits the requested point
+budget instead of sanitizing every raw snapshot.
+
+Rollup layout:
+
+    {
+        "_id": "1h|1703001600",
+        "resolution": "1h",
+        "timestamp": 1703001600,        # bucket start
+        "count": 60,
+        "last_timestamp": 1703005140,
+        "sum": {"total_pnodes": 13200, ...},
+        "min": {...}, "max": {...}, "last": {...},
+        "versions": {"0．8．0": 9000, ...}   # summed counts, dots escaped
+    }
+
+This module only builds updates and points; reads and writes live in db.py
+(save_snapshot_history, backfill_rollups, get_history_points,
+get_growth_metrics).
+"""
+
+import time
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+# Resolution name -> bucket seconds, finest first
+RESOLUTIONS = {
+    "5m": 300,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+# How long each resolution is kept (raw snapshots are kept 30 days)
+RETENTION_SECONDS = {
+    "5m": 35 * 86400,
+    "1h": 180 * 86400,
+    "1d": 730 * 86400,
+}
+
+# Numeric fields of a snapshot history entry
+METRICS = [
+    "total_pnodes",
+    "total_ip_nodes",
+    "public_pnodes",
+    "private_pnodes",
+    "avg_cpu_percent",
+    "avg_ram_used_percent",
+    "total_active_streams",
+    "total_bytes_processed",
+    "total_storage_committed",
+    "total_storage_used",
+    "avg_storage_usage_percent",
+    "storage_utilization_ratio",
+    "avg_peer_count",
+    "version_diversity_index",
+]
+
+# MongoDB update paths can't contain "." so version keys are escaped
+_DOT = "．"
+
+
+def escape_key(key: str) -> str:
+    """Make a version string safe to use as a field name in update paths."""
+    return str(key).replace(".", _DOT)
+
+
+def unescape_key(key: str) -> str:
+    """Reverse escape_key()."""
+    return key.replace(_DOT, ".")
+
+
+def bucket_start(timestamp: int, resolution: str) -> int:
+    """Start of the bucket containing timestamp."""
+    seconds = RESOLUTIONS[resolution]
+    return int(timestamp) // seconds * seconds
+
+
+def rollup_updates(entry: Dict) -> List[UpdateOne]:
+    """
+    Upserts that fold one snapshot history entry into every resolution.
+
+    Args:
+        entry: pnodes_snapshots entry (see db.save_snapshot_history)
+
+    Returns:
+        One UpdateOne per resolution
+    """
+    timestamp = int(entry["timestamp"])
+
+    inc = {"count": 1}
+    minimum, maximum, last = {}, {}, {"last_timestamp": timestamp}
+    for metric in METRICS:
+        value = entry.get(metric) or 0
+        inc[f"sum.{metric}"] = value
+        minimum[f"min.{metric}"] = value
+        maximum[f"max.{metric}"] = value
+        last[f"last.{metric}"] = value
+    for version, count in (entry.get("version_distribution") or {}).items():
+        inc[f"versions.{escape_key(version)}"] = count
+
+    operations = []
+    for resolution in RESOLUTIONS:
+        start = bucket_start(timestamp, resolution)
+        operations.append(UpdateOne(
+            {"_id": f"{resolution}|{start}"},
+            {
+                "$setOnInsert": {"resolution": resolution, "timestamp": start},
+                "$inc": inc,
+                "$min": minimum,
+                "$max": maximum,
+                "$set": last,
+            },
+            upsert=True
+        ))
+    return operations
+
+
+def choose_resolution(span_seconds: int, max_points: int, raw_interval: int,
+                      resolutions: Dict[str, int] = None) -> str:
+    """
+    Finest resolution whose point count over the span fits max_points.
+
+    Args:
+        span_seconds: Requested window length
+        max_points: Point budget
+        raw_interval: Seconds between raw snapshots (CACHE_TTL)
+        resolutions: Resolution -> seconds, finest first (default RESOLUTIONS)
+
+    Returns:
+        "raw" or a resolutions key (the coarsest one if nothing fits)
+    """
+    resolutions = resolutions or RESOLUTIONS
+    if span_seconds // raw_interval <= max_points:
+        return "raw"
+    for resolution, seconds in resolutions.items():
+        if span_seconds // seconds <= max_points:
+            return resolution
+    return list(resolutions)[-1]
+
+
+def resolution_for_age(age_seconds: int) -> str:
+    """Finest resolution still retained for buckets age_seconds old."""
+    for resolution, seconds in RETENTION_SECONDS.items():
+        if age_seconds < seconds:
+            return resolution
+    return list(RESOLUTIONS)[-1]
+
+
+def last_entry(doc: Dict) -> Dict:
+    """
+    State at the end of a rollup bucket, in the snapshot history entry shape.
+
+    Used as the "N hours ago" side of growth comparisons.
+    """
+    timestamp = doc.get("last_timestamp", doc["timestamp"])
+    entry = {
+        "timestamp": timestamp,
+        "timestamp_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+    }
+    entry.update(doc.get("last") or {})
+    return entry
+
+
+def rollup_point(doc: Dict) -> Dict:
+    """
+    Chart point for a rollup document, in the snapshot history entry shape.
+
+    Metric fields hold the bucket average; min/max/last are returned under
+    "range" and "last". version_distribution holds the average count of
+    nodes per version over the bucket.
+    """
+    count = doc.get("count") or 1
+    sums = doc.get("sum") or {}
+    timestamp = doc["timestamp"]
+
+    point = {
+        "timestamp": timestamp,
+        "timestamp_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+        "resolution": doc.get("resolution"),
+        "samples": doc.get("count", 0),
+    }
+    for metric in METRICS:
+        point[metric] = round(sums.get(metric, 0) / count, 2)
+
+    point["version_distribution"] = {
+        unescape_key(version): round(total / count, 2)
+        for version, total in (doc.get("versions") or {}).items()
+    }
+    point["range"] = {
+        metric: [(doc.get("min") or {}).get(metric), (doc.get("max") or {}).get(metric)]
+        for metric in METRICS
+    }
+    point["last"] = doc.get("last") or {}
+    return point
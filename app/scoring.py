@@ -138,7 +138,9 @@ Implements 3-score system:
 """
 
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
 
 # Update this as new versions release
 LATEST_VERSION = "0.8.0"
@@ -325,6 +327,359 @@ def calculate_all_scores(pnode_data: Dict) -> Dict:
     }
 
 
+# ============================================================================
+# BATCH (VECTORIZED) SCORING
+# ============================================================================
+
+def _round_column(values: np.ndarray, ndigits: int = 2) -> np.ndarray:
+    """
+    Round a float column exactly like the builtin round().
+
+    np.round scales by 10**ndigits before rounding, which disagrees with
+    round() on values such as 2.675, so results would drift from the scalar
+    functions.
+    """
+    return np.array([round(v, ndigits) for v in values.tolist()], dtype=float)
+
+
+def _version_points(versions: Sequence) -> np.ndarray:
+    """Version compliance points (20/10/0), evaluated once per distinct version."""
+    points_by_version = {}
+    points = np.empty(len(versions), dtype=float)
+    for i, version in enumerate(versions):
+        if version not in points_by_version:
+            if version == LATEST_VERSION:
+                points_by_version[version] = 20
+            elif version and version.startswith("0.6"):
+                points_by_version[version] = 10
+            else:
+                points_by_version[version] = 0
+        points[i] = points_by_version[version]
+    return points
+
+
+def calculate_scores_batch(
+    uptime: Sequence,
+    peer_count: Sequence,
+    version: Sequence,
+    consistency: Optional[Sequence] = None,
+    storage_committed: Optional[Sequence] = None,
+    storage_usage_percent: Optional[Sequence] = None,
+    growth_trend: Optional[Sequence] = None,
+) -> Dict:
+    """
+    Score a whole network in one vectorized pass.
+
+    Column-oriented equivalent of calculate_all_scores(): every argument is a
+    sequence with one entry per node (same order, same length). Results are
+    identical to the scalar functions.
+
+    Args:
+        uptime: uptime in seconds
+        peer_count: number of IP nodes reporting the node (len(peer_sources))
+        version: version strings
+        consistency: gossip consistency 0-1 (default 1.0)
+        storage_committed: bytes committed (default 0)
+        storage_usage_percent: usage percent (default 0)
+        growth_trend: growth trend 0-1 (default 0.5)
+
+    Returns:
+        dict of numpy columns: trust, capacity, composite (all rounded),
+        rating, and the unrounded per-factor breakdown columns
+    """
+    n = len(uptime)
+
+    def column(values, default):
+        if values is None:
+            return np.full(n, default, dtype=float)
+        return np.asarray(values, dtype=float)
+
+    # Trust score (same factors and weights as calculate_trust_score)
+    uptime_points = np.minimum(column(uptime, 0) / 86400 / 30, 1.0) * 40
+    gossip_points = np.minimum(column(peer_count, 0) / 3, 1.0) * 30
+    version_points = _version_points(version)
+    consistency_points = column(consistency, 1.0) * 10
+    trust = _round_column(uptime_points + gossip_points + version_points + consistency_points)
+
+    # Capacity score (same factors and weights as calculate_capacity_score)
+    committed_points = np.minimum(column(storage_committed, 0) / (1024**3) / 100, 1.0) * 30
+    usage = column(storage_usage_percent, 0)
+    balanced = (usage >= 20) & (usage <= 80)
+    balance_points = np.where(
+        balanced,
+        40.0,
+        np.where(usage < 20, (usage / 20) * 40, ((100 - usage) / 20) * 40),
+    )
+    growth_points = column(growth_trend, 0.5) * 30
+    capacity = _round_column(committed_points + balance_points + growth_points)
+
+    # Stake confidence (60% trust, 40% capacity on the rounded scores)
+    raw_composite = (trust * 0.6) + (capacity * 0.4)
+    composite = _round_column(raw_composite)
+    rating = np.select(
+        [raw_composite >= 80, raw_composite >= 60],
+        ["low_risk", "medium_risk"],
+        default="high_risk",
+    )
+
+    return {
+        "count": n,
+        "trust": trust,
+        "capacity": capacity,
+        "composite": composite,
+        "rating": rating,
+        "breakdown": {
+            "uptime": uptime_points,
+            "gossip_presence": gossip_points,
+            "version_compliance": version_points,
+            "gossip_consistency": consistency_points,
+            "storage_committed": committed_points,
+            "usage_balance": balance_points,
+            "usage_balanced": balanced,
+            "growth_trend": growth_points,
+        },
+    }
+
+
+_RATING_STYLE = {
+    "low_risk": ("#10b981", "🟢"),
+    "medium_risk": ("#f59e0b", "🟡"),
+    "high_risk": ("#ef4444", "🔴"),
+}
+
+
+def expand_batch_scores(batch: Dict) -> List[Dict]:
+    """
+    Turn calculate_scores_batch() columns into per-node score dicts.
+
+    The output matches calculate_all_scores() for each node, including the
+    int/float types of the breakdown values.
+
+    Args:
+        batch: Result of calculate_scores_batch()
+
+    Returns:
+        List of score dicts, one per node
+    """
+    breakdown = batch["breakdown"]
+    uptime = _round_column(breakdown["uptime"]).tolist()
+    gossip = _round_column(breakdown["gossip_presence"]).tolist()
+    version = breakdown["version_compliance"].astype(int).tolist()
+    consistency = _round_column(breakdown["gossip_consistency"]).tolist()
+    committed = _round_column(breakdown["storage_committed"]).tolist()
+    balance = _round_column(breakdown["usage_balance"]).tolist()
+    balanced = breakdown["usage_balanced"].tolist()
+    growth = _round_column(breakdown["growth_trend"]).tolist()
+    trust = batch["trust"].tolist()
+    capacity = batch["capacity"].tolist()
+    composite = batch["composite"].tolist()
+    rating = batch["rating"].tolist()
+
+    results = []
+    for i in range(batch["count"]):
+        color, emoji = _RATING_STYLE[rating[i]]
+        results.append({
+            "trust": {
+                "score": trust[i],
+                "breakdown": {
+                    "uptime": uptime[i],
+                    "gossip_presence": gossip[i],
+                    "version_compliance": version[i],
+                    "gossip_consistency": consistency[i],
+                },
+            },
+            "capacity": {
+                "score": capacity[i],
+                "breakdown": {
+                    "storage_committed": committed[i],
+                    # The scalar path keeps the in-range 40 as an int
+                    "usage_balance": 40 if balanced[i] else balance[i],
+                    "growth_trend": growth[i],
+                },
+            },
+            "stake_confidence": {
+                "composite_score": composite[i],
+                "rating": rating[i],
+                "color": color,
+                "emoji": emoji,
+            },
+        })
+    return results
+
+
+def calculate_all_scores_batch(nodes: List[Dict]) -> List[Dict]:
+    """
+    Calculate all scores for a list of pNodes in one vectorized pass.
+
+    Convenience wrapper that builds the columns for calculate_scores_batch()
+    from node dicts (same fields and defaults as calculate_all_scores).
+
+    Args:
+        nodes: List of node data dicts
+
+    Returns:
+        List of score dicts in the same order as `nodes`
+    """
+    if not nodes:
+        return []
+
+    batch = calculate_scores_batch(
+        uptime=[n.get("uptime", 0) for n in nodes],
+        peer_count=[len(n.get("peer_sources", []) or []) for n in nodes],
+        version=[n.get("version", "") for n in nodes],
+        consistency=[n.get("consistency_score", 1.0) for n in nodes],
+        storage_committed=[n.get("storage_committed", 0) for n in nodes],
+        storage_usage_percent=[n.get("storage_usage_percent", 0) for n in nodes],
+        growth_trend=[n.get("growth_trend", 0.5) for n in nodes],
+    )
+    return expand_batch_scores(batch)
+
+
+class NetworkHealthAggregator:
+    """
+    Running totals behind the network health score.
+    
+    Keeps one small contribution tuple per node (online flag, version,
+    composite score, peer count) and the sums over them, so the four health
+    factors can be read at any time without touching the node list. Feed it
+    nodes that already carry `scores` (as built for /pnodes); nodes without
+    them are scored on the fly.
+    
+    Use update() once per ingestion cycle: only nodes whose contribution
+    changed are re-applied.
+    """
+    
+    def __init__(self):
+        self.total_nodes = 0
+        self.online_nodes = 0
+        self.version_counts = {}      # online nodes only
+        self.quality_cents = 0        # sum of composite scores * 100 (online)
+        self.total_peers = 0          # sum of peer counts (online)
+        self._contributions = {}
+    
+    @staticmethod
+    def _contribution(node: Dict) -> tuple:
+        if not node.get("is_online", False):
+            return (False, None, 0, 0)
+        
+        scores = node.get("scores") or calculate_all_scores(node)
+        composite = scores.get("stake_confidence", {}).get("composite_score", 0) or 0
+        return (
+            True,
+            node.get("version", "unknown"),
+            int(round(composite * 100)),
+            len(node.get("peer_sources") or []),
+        )
+    
+    def _apply(self, contribution: tuple, sign: int):
+        is_online, version, quality_cents, peers = contribution
+        self.total_nodes += sign
+        if not is_online:
+            return
+        self.online_nodes += sign
+        self.quality_cents += sign * quality_cents
+        self.total_peers += sign * peers
+        count = self.version_counts.get(version, 0) + sign
+        if count:
+            self.version_counts[version] = count
+        else:
+            self.version_counts.pop(version, None)
+    
+    def set_node(self, key: str, node: Dict = None):
+        """Add, replace or (with node=None) remove a single node's contribution."""
+        contribution = self._contribution(node) if node is not None else None
+        old = self._contributions.get(key)
+        if old == contribution:
+            return
+        if old is not None:
+            self._apply(old, -1)
+            del self._contributions[key]
+        if contribution is not None:
+            self._apply(contribution, 1)
+            self._contributions[key] = contribution
+    
+    def update(self, nodes_by_key: Dict[str, Dict]):
+        """
+        Bring the totals in line with a new set of nodes.
+        
+        Args:
+            nodes_by_key: Mapping of node key (address) -> node dict
+        """
+        for key in [k for k in self._contributions if k not in nodes_by_key]:
+            self.set_node(key, None)
+        for key, node in nodes_by_key.items():
+            self.set_node(key, node)
+    
+    def health(self) -> Dict:
+        """
+        Return the health score from the current totals.
+        
+        Same shape and factors as calculate_network_health_score().
+        """
+        if not self.total_nodes:
+            return {
+                "health_score": 0,
+                "status": "unknown",
+                "factors": {}
+            }
+        
+        online_count = self.online_nodes
+        factors = {}
+        health_score = 0
+        
+        # Factor 1: Node availability (30%)
+        availability_ratio = online_count / self.total_nodes
+        availability_score = availability_ratio * 30
+        factors["availability"] = round(availability_score, 2)
+        health_score += availability_score
+        
+        # Factor 2: Version consistency (25%)
+        if self.version_counts:
+            most_common_version_count = max(self.version_counts.values())
+            version_consistency = most_common_version_count / online_count if online_count else 0
+            version_score = version_consistency * 25
+        else:
+            version_score = 0
+        factors["version_consistency"] = round(version_score, 2)
+        health_score += version_score
+        
+        # Factor 3: Average node quality (25%)
+        if online_count:
+            avg_node_score = self.quality_cents / online_count / 100
+            quality_score = (avg_node_score / 100) * 25
+        else:
+            quality_score = 0
+        factors["node_quality"] = round(quality_score, 2)
+        health_score += quality_score
+        
+        # Factor 4: Network connectivity (20%)
+        if online_count:
+            avg_peer_count = self.total_peers / online_count
+            # Optimal: 3+ peers per node
+            connectivity_ratio = min(avg_peer_count / 3, 1.0)
+            connectivity_score = connectivity_ratio * 20
+        else:
+            connectivity_score = 0
+        factors["connectivity"] = round(connectivity_score, 2)
+        health_score += connectivity_score
+        
+        # Determine status
+        if health_score >= 80:
+            status = "healthy"
+        elif health_score >= 60:
+            status = "fair"
+        elif health_score >= 40:
+            status = "degraded"
+        else:
+            status = "critical"
+        
+        return {
+            "health_score": round(health_score, 2),
+            "status": status,
+            "factors": factors
+        }
+
+
 def calculate_network_health_score(all_nodes: List[Dict]) -> Dict:
     """
     Calculate overall network health based on all nodes.
@@ -335,90 +690,20 @@ def calculate_network_health_score(all_nodes: List[Dict]) -> Dict:
     - Average node quality (25%)
     - Network connectivity (20%)
     
+    Single pass over the nodes; uses each node's precomputed `scores` when
+    present. For repeated evaluation across cycles keep a
+    NetworkHealthAggregator instead.
+    
     Args:
         all_nodes: List of all nodes (online + offline)
     
     Returns:
         dict with health_score, status, and factor breakdown
     """
-    if not all_nodes:
-        return {
-            "health_score": 0,
-            "status": "unknown",
-            "factors": {}
-        }
-    
-    online_nodes = [n for n in all_nodes if n.get("is_online", False)]
-    total_nodes = len(all_nodes)
-    online_count = len(online_nodes)
-    
-    factors = {}
-    health_score = 0
-    
-    # Factor 1: Node availability (30%)
-    availability_ratio = online_count / total_nodes if total_nodes > 0 else 0
-    availability_score = availability_ratio * 30
-    factors["availability"] = round(availability_score, 2)
-    health_score += availability_score
-    
-    # Factor 2: Version consistency (25%)
-    version_counts = {}
-    for node in online_nodes:
-        v = node.get("version", "unknown")
-        version_counts[v] = version_counts.get(v, 0) + 1
-    
-    if version_counts:
-        most_common_version_count = max(version_counts.values())
-        version_consistency = most_common_version_count / online_count if online_count else 0
-        version_score = version_consistency * 25
-    else:
-        version_score = 0
-    factors["version_consistency"] = round(version_score, 2)
-    health_score += version_score
-    
-    # Factor 3: Average node quality (25%)
-    if online_nodes:
-        total_quality = 0
-        for node in online_nodes:
-            scores = calculate_all_scores(node)
-            node_quality = scores["stake_confidence"]["composite_score"]
-            total_quality += node_quality
-        avg_node_score = total_quality / online_count
-        quality_score = (avg_node_score / 100) * 25
-    else:
-        quality_score = 0
-    factors["node_quality"] = round(quality_score, 2)
-    health_score += quality_score
-    
-    # Factor 4: Network connectivity (20%)
-    if online_nodes:
-        total_peers = sum(
-            len(n.get("peer_sources", [])) for n in online_nodes
-        )
-        avg_peer_count = total_peers / online_count if online_count else 0
-        # Optimal: 3+ peers per node
-        connectivity_ratio = min(avg_peer_count / 3, 1.0)
-        connectivity_score = connectivity_ratio * 20
-    else:
-        connectivity_score = 0
-    factors["connectivity"] = round(connectivity_score, 2)
-    health_score += connectivity_score
-    
-    # Determine status
-    if health_score >= 80:
-        status = "healthy"
-    elif health_score >= 60:
-        status = "fair"
-    elif health_score >= 40:
-        status = "degraded"
-    else:
-        status = "critical"
-    
-    return {
-        "health_score": round(health_score, 2),
-        "status": status,
-        "factors": factors
-    }
+    aggregator = NetworkHealthAggregator()
+    for i, node in enumerate(all_nodes):
+        aggregator.set_node(str(i), node)
+    return aggregator.health()
 
 
 def get_tier_color(tier: str) -> str:
@@ -0,0 +1,223 @@
+# app/static_site.py
+"""
+Per-cycle static JSON publishing.
+
+Most traffic is anonymous reads of a few endpoints with default
+parameters. After every cycle the worker renders those payloads once and
+writes them as static files, so a reverse proxy (or the /static route)
+can serve them without running any endpoint code:
+
+    STATIC_DIR/
+        current -> versions/1703001294      (symlink, swapped atomically)
+        versions/1703001294/
+            manifest.json
+            pnodes.json  pnodes.json.gz  pnodes.json.br
+            topology.json ...
+
+Each version directory is complete before `current` is switched to it,
+and the previous STATIC_KEEP_VERSIONS versions are kept so requests
+already reading an older version can finish.
+
+Pages are registered by main.py (register()) with the endpoint call that
+builds them; publish() renders them all against one pinned view.
+
+.br files need the optional brotli package; without it only .json and
+.json.gz are written.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+CURRENT = "current"
+VERSIONS = "versions"
+
+# Encodings written next to each page: Content-Encoding -> file suffix
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# page name -> zero-argument callable returning the body (or an awaitable)
+PAGES: Dict[str, Callable] = {}
+
+# Manifest of the version `current` points to (None until published/loaded)
+manifest: Optional[Dict] = None
+
+
+def register(name: str, builder: Callable):
+    """Publish `builder()`'s body as <name>.json every cycle."""
+    PAGES[name] = builder
+
+
+def encode_page(body) -> Dict[str, bytes]:
+    """
+    Encoded variants of one page.
+
+    Returns:
+        {"identity": JSON bytes, "gzip": ..., "br": ...} (br only when
+        brotli is installed)
+    """
+    raw = json.dumps(body, default=str, separators=(",", ":")).encode()
+    variants = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(raw)
+    return variants
+
+
+def write_version(root: str, version: int, pages: Dict[str, Dict[str, bytes]],
+                  keep: int = 3, now: int = None) -> Dict:
+    """
+    Write one version of every page and make it current.
+
+    Args:
+        root: Static directory
+        version: Version id (the view's cycle id)
+        pages: page name -> encode_page() output
+        keep: Older versions to keep after the swap
+        now: Generation timestamp
+
+    Returns:
+        The version's manifest
+    """
+    versions_dir = os.path.join(root, VERSIONS)
+    final = os.path.join(versions_dir, str(version))
+    staging = final + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    files = {}
+    for name, variants in pages.items():
+        filename = f"{name}.json"
+        with open(os.path.join(staging, filename), "wb") as f:
+            f.write(variants["identity"])
+        for encoding, suffix in ENCODINGS.items():
+            if encoding in variants:
+                with open(os.path.join(staging, filename + suffix), "wb") as f:
+                    f.write(variants[encoding])
+        files[name] = {
+            "path": filename,
+            "bytes": len(variants["identity"]),
+            "encodings": {e: len(variants[e]) for e in ENCODINGS if e in variants},
+            "etag": hashlib.sha256(variants["identity"]).hexdigest()[:32],
+        }
+
+    version_manifest = {"version": version, "generated_at": int(now or time.time()), "files": files}
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(version_manifest, f, indent=2)
+
+    # Republishing a version replaces it
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(staging, final)
+
+    # Atomic swap: a new symlink renamed over the old one. A link left by an
+    # interrupted swap would make os.symlink fail, so it goes first.
+    link = os.path.join(root, CURRENT)
+    tmp = link + ".tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(os.path.join(VERSIONS, str(version)), tmp)
+    os.replace(tmp, link)
+
+    prune_versions(versions_dir, str(version), keep)
+    return version_manifest
+
+
+def prune_versions(versions_dir: str, current: str, keep: int):
+    """Delete all but the newest `keep` versions older than `current`."""
+    older = sorted(
+        (int(v) for v in os.listdir(versions_dir) if v.isdigit() and v != current),
+        reverse=True
+    )
+    for version in older[keep:]:
+        shutil.rmtree(os.path.join(versions_dir, str(version)), ignore_errors=True)
+
+
+def load_manifest(root: str) -> Optional[Dict]:
+    """Manifest of the current version on disk (None if nothing published)."""
+    try:
+        with open(os.path.join(root, CURRENT, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def current_manifest(root: str) -> Optional[Dict]:
+    """Manifest last published by this process, or the one on disk."""
+    global manifest
+    if manifest is None:
+        manifest = load_manifest(root)
+    return manifest
+
+
+def choose_encoding(accept_encoding: Optional[str], available) -> Optional[str]:
+    """
+    Best pre-compressed variant the client accepts (br, then gzip).
+
+    Args:
+        accept_encoding: Accept-Encoding header value
+        available: Encodings written for the page
+
+    Returns:
+        "br", "gzip", or None for the uncompressed file
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0"):
+            continue
+        accepted.add(coding.strip().lower())
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+async def publish(view, root: str, keep: int = 3) -> Optional[Dict]:
+    """
+    Render every registered page against `view` and publish a version.
+
+    Pages are built on the event loop (they are endpoint calls); encoding
+    and file writes run in a thread. A page that fails is left out of this
+    version and logged.
+    """
+    global manifest
+    from .view import pinned_view
+
+    started = time.time()
+    bodies = {}
+    with pinned_view(view):
+        for name, builder in PAGES.items():
+            try:
+                body = builder()
+                if asyncio.iscoroutine(body):
+                    body = await body
+            except Exception as e:
+                logger.error(f"❌ Static page {name} failed: {e}")
+                continue
+            if not isinstance(body, dict):
+                logger.error(f"❌ Static page {name} returned an error response, skipped")
+                continue
+            bodies[name] = body
+
+    if not bodies:
+        return None
+
+    def write():
+        pages = {name: encode_page(body) for name, body in bodies.items()}
+        return write_version(root, view.cycle_id, pages, keep)
+
+    manifest = await asyncio.to_thread(write)
+    logger.info(f"📄 Published {len(bodies)} static page(s) for cycle {view.cycle_id} in {time.time() - started:.2f}s")
+    return manifest
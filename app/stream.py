@@ -0,0 +1,290 @@
+# app/stream.py
+"""
+Real-time node deltas for WebSocket clients (/ws/pnodes).
+
+A client gets one compact snapshot of the nodes matching its filter, then
+one delta per ingestion cycle with only what changed:
+
+    {"type": "snapshot", "cycle": 1703001234, "filter": {...}, "nodes": [...]}
+    {"type": "delta", "cycle": 1703001294, "previous_cycle": 1703001234,
+     "added": [{...}], "removed": ["1.2.3.4:9001"],
+     "changed": {"5.6.7.8:9001": {"score": 71.2, "uptime": 86460}}}
+
+DeltaHub keeps the compact state of every node and diffs it against the
+nodes the view publisher reports as added/removed/changed, so a cycle
+costs O(changed nodes). Each delta is serialized once per distinct filter
+and shared by every subscriber using that filter.
+
+Slow consumers: every subscriber has a small bounded queue. When it
+overflows, the queued deltas are dropped and the subscriber is sent a
+fresh snapshot instead once it catches up, so one slow dashboard never
+holds memory or blocks the broadcast.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields sent for each node (the full unified node is on /pnodes)
+COMPACT_FIELDS = (
+    "address",
+    "pubkey",
+    "is_online",
+    "version",
+    "uptime",
+    "is_public",
+    "storage_committed",
+    "storage_used",
+    "storage_usage_percent",
+    "peer_count",
+    "score",
+    "tier",
+    "last_seen",
+)
+
+# Deltas buffered per subscriber before it's switched to a resync
+QUEUE_SIZE = 8
+
+# Seconds a single send may take before the connection is dropped
+SEND_TIMEOUT = 10
+
+
+def compact_node(node: Dict) -> Dict:
+    """Streamed representation of a unified node."""
+    return {field: node.get(field) for field in COMPACT_FIELDS}
+
+
+class StreamFilter:
+    """
+    Server-side subscription filter.
+
+    Attributes:
+        status: "online", "offline" or "all"
+        version: Exact version, or None
+        tier: Stake confidence rating, or None
+        is_public: True/False, or None for both
+        min_score: Minimum score, or None
+        addresses: Set of addresses, or None for every node
+    """
+
+    STATUSES = ("all", "online", "offline")
+
+    def __init__(self, status: str = "all", version: str = None, tier: str = None,
+                 is_public: bool = None, min_score: float = None, addresses: Iterable[str] = None):
+        if status not in self.STATUSES:
+            raise ValueError(f"Invalid status: {status}. Use one of: {', '.join(self.STATUSES)}")
+        if is_public is not None and not isinstance(is_public, bool):
+            raise ValueError("is_public must be true or false")
+        if min_score is not None:
+            min_score = float(min_score)
+
+        self.status = status
+        self.version = version or None
+        self.tier = tier or None
+        self.is_public = is_public
+        self.min_score = min_score
+        self.addresses = frozenset(addresses) if addresses else None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "StreamFilter":
+        """
+        Build a filter from a client "subscribe" message.
+
+        Raises:
+            ValueError: Unknown keys or invalid values
+        """
+        data = data or {}
+        unknown = set(data) - {"status", "version", "tier", "is_public", "min_score", "addresses"}
+        if unknown:
+            raise ValueError(f"Unknown filter field(s): {', '.join(sorted(unknown))}")
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    def matches(self, node: Dict) -> bool:
+        """Whether a compact node passes the filter."""
+        if self.addresses is not None and node.get("address") not in self.addresses:
+            return False
+        if self.status == "online" and not node.get("is_online"):
+            return False
+        if self.status == "offline" and node.get("is_online"):
+            return False
+        if self.version is not None and node.get("version") != self.version:
+            return False
+        if self.tier is not None and node.get("tier") != self.tier:
+            return False
+        if self.is_public is not None and bool(node.get("is_public")) != self.is_public:
+            return False
+        if self.min_score is not None and (node.get("score") or 0) < self.min_score:
+            return False
+        return True
+
+    def to_dict(self) -> Dict:
+        return {
+            "status": self.status,
+            "version": self.version,
+            "tier": self.tier,
+            "is_public": self.is_public,
+            "min_score": self.min_score,
+            "addresses": sorted(self.addresses) if self.addresses is not None else None,
+        }
+
+    @property
+    def key(self) -> str:
+        """Identical filters share one serialized delta."""
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+
+class Subscriber:
+    """
+    One connected client: its filter and bounded outgoing queue.
+
+    Attributes:
+        filter: StreamFilter
+        queue: Serialized messages waiting to be sent
+        resync: Set when the queue overflowed; the next message sent is a
+                fresh snapshot instead of the dropped deltas
+    """
+
+    def __init__(self, stream_filter: StreamFilter):
+        self.filter = stream_filter
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        self.resync = False
+
+    def offer(self, message: str):
+        """Queue a delta without blocking; switch to resync on overflow."""
+        if self.resync:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resync = True
+            # Wake the sender so it sends the snapshot
+            self.queue.put_nowait(None)
+
+    def request_snapshot(self, stream_filter: StreamFilter = None):
+        """Change the filter and send a fresh snapshot next."""
+        if stream_filter is not None:
+            self.filter = stream_filter
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.resync = True
+        self.queue.put_nowait(None)
+
+
+class DeltaHub:
+    """
+    Compact node state plus the set of subscribers to broadcast to.
+
+    Attributes:
+        cycle: cycle_id of the last published view (None before the first)
+        state: address -> compact node
+        subscribers: Connected subscribers
+    """
+
+    def __init__(self):
+        self.cycle: Optional[int] = None
+        self.state: Dict[str, Dict] = {}
+        self.subscribers = set()
+
+    def prime(self, view):
+        """Load the full state from a view (first subscriber before the first cycle)."""
+        if self.cycle is not None or view is None:
+            return
+        self.state = {address: compact_node(node) for address, node in view.by_address.items()}
+        self.cycle = view.cycle_id
+
+    def publish(self, view, diff) -> List[tuple]:
+        """
+        Apply one cycle and broadcast the deltas.
+
+        Args:
+            view: Newly published NetworkView
+            diff: NodeDiff between the previous and the new view
+
+        Returns:
+            (address, old compact node or None, new compact node or None)
+            for the nodes whose streamed fields changed
+        """
+        changes = []
+        for address in list(diff.added) + list(diff.changed) + list(diff.refreshed):
+            new = compact_node(view.by_address[address])
+            old = self.state.get(address)
+            if old != new:
+                changes.append((address, old, new))
+                self.state[address] = new
+        for address in diff.removed:
+            old = self.state.pop(address, None)
+            if old is not None:
+                changes.append((address, old, None))
+
+        previous, self.cycle = self.cycle, view.cycle_id
+
+        messages = {}
+        for subscriber in list(self.subscribers):
+            key = subscriber.filter.key
+            if key not in messages:
+                messages[key] = json.dumps(self.delta(subscriber.filter, changes, previous))
+            subscriber.offer(messages[key])
+
+        if self.subscribers:
+            logger.info(
+                f"📡 Broadcast {len(changes)} node change(s) to {len(self.subscribers)} "
+                f"subscriber(s) ({len(messages)} filter(s))"
+            )
+        return changes
+
+    def delta(self, stream_filter: StreamFilter, changes: List[tuple], previous: Optional[int]) -> Dict:
+        """
+        Delta message for one filter.
+
+        A node entering the filter is sent as added, one leaving it as
+        removed, and one staying in it with only its changed fields.
+        """
+        added, removed, changed = [], [], {}
+        for address, old, new in changes:
+            was = old is not None and stream_filter.matches(old)
+            now = new is not None and stream_filter.matches(new)
+            if now and not was:
+                added.append(new)
+            elif was and not now:
+                removed.append(address)
+            elif was and now:
+                fields = {k: v for k, v in new.items() if old.get(k) != v}
+                if fields:
+                    changed[address] = fields
+
+        return {
+            "type": "delta",
+            "cycle": self.cycle,
+            "previous_cycle": previous,
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+        }
+
+    def snapshot(self, stream_filter: StreamFilter) -> Dict:
+        """Snapshot message: every node matching the filter."""
+        return {
+            "type": "snapshot",
+            "cycle": self.cycle,
+            "filter": stream_filter.to_dict(),
+            "nodes": [node for node in self.state.values() if stream_filter.matches(node)],
+        }
+
+    def subscribe(self, stream_filter: StreamFilter) -> Subscriber:
+        subscriber = Subscriber(stream_filter)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+
+delta_hub = DeltaHub()
@@ -20,4 +20,69 @@ def jsonrpc_error(message: str, code: int = -32603, id=1):
 PARSE_ERROR = -32700
 INVALID_REQUEST = -32600
 METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
 INTERNAL_ERROR = -32603
+
+# Marks a parameter without a default in a params spec
+REQUIRED = object()
+
+
+def one_of(*values):
+    """Params spec check: value must be one of `values`."""
+    def check(value):
+        if value not in values:
+            raise ValueError(f"must be one of: {', '.join(map(str, values))}")
+    return check
+
+
+def between(low=None, high=None):
+    """Params spec check: low <= value <= high (None = unbounded)."""
+    def check(value):
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f"must be between {low} and {high}")
+    return check
+
+
+def validate_params(params, spec: dict) -> dict:
+    """
+    Check JSON-RPC by-name params against a spec.
+
+    Args:
+        params: "params" member of the request (object or omitted)
+        spec: name -> (type, default or REQUIRED, check callable or None)
+
+    Returns:
+        Every spec'd parameter, with defaults filled in
+
+    Raises:
+        ValueError: Message suitable for an INVALID_PARAMS error
+    """
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object (by-name parameters)")
+
+    unknown = set(params) - set(spec)
+    if unknown:
+        raise ValueError(f"Unknown param(s): {', '.join(sorted(unknown))}")
+
+    values = {}
+    for name, (kind, default, check) in spec.items():
+        if name not in params or params[name] is None:
+            if default is REQUIRED:
+                raise ValueError(f"Missing required param: {name}")
+            values[name] = default
+            continue
+
+        value = params[name]
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise ValueError(f"{name} must be of type {kind.__name__}")
+        if check is not None:
+            try:
+                check(value)
+            except ValueError as e:
+                raise ValueError(f"{name} {e}")
+        values[name] = value
+    return values
@@ -0,0 +1,571 @@
+# app/view.py
+"""
+Unified pNode view.
+
+Merges the live snapshot (online nodes) with the persistent registry
+(offline nodes), scores every node, and keeps the result for the API.
+
+The background worker publishes a new view once per ingestion cycle, so
+request handlers read precomputed nodes, totals and health instead of
+rebuilding them on every call. Network totals are kept by
+NetworkAggregates (see aggregates.py), updated from the diff between the
+previous and the new view. Alerts are evaluated by AlertEngine in the
+same pass.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set, Tuple
+
+from .aggregates import NetworkAggregates, NodeDiff
+from .alert_feed import alert_feed
+from .alerts import AlertEngine, AlertIndex, check_node_alerts
+from .config import CACHE_TTL
+from .db import (
+    nodes_current, pnodes_registry,
+    save_alert_transitions, get_open_alerts, get_last_alert_seq
+)
+from .helpers import safe_get, safe_get_list
+from .scoring import calculate_all_scores, calculate_all_scores_batch
+from .stream import delta_hub
+
+logger = logging.getLogger(__name__)
+
+# Cycles of node changes kept for /pnodes?since= (one hour at 60s cycles)
+CHANGE_LOG_CYCLES = 60
+
+
+def default_scores(rating: str) -> Dict:
+    """Zero scores used for offline nodes or when scoring fails."""
+    return {
+        "trust": {"score": 0, "breakdown": {}},
+        "capacity": {"score": 0, "breakdown": {}},
+        "stake_confidence": {"composite_score": 0, "rating": rating}
+    }
+
+
+def build_online_entry(pnode: Dict, registry_entry: Optional[Dict], now: int) -> Dict:
+    """
+    Build the unified entry for a node present in the current snapshot.
+
+    Scores are not filled in here; see score_entries().
+
+    Args:
+        pnode: Node from snapshot merged_pnodes_unique
+        registry_entry: Matching registry document (or None)
+        now: Build timestamp
+    """
+    address = pnode.get("address")
+
+    # Build unified entry with NULL-SAFE access
+    return {
+        # Identity
+        "address": address,
+        "pubkey": pnode.get("pubkey") or "",
+
+        # Status
+        "is_online": True,
+        "last_seen": safe_get(pnode, "last_seen_timestamp", now),
+        "last_checked": now,
+
+        # Network info (from snapshot - most current)
+        "version": pnode.get("version") or "unknown",
+        "uptime": safe_get(pnode, "uptime", 0),
+        "is_public": bool(pnode.get("is_public")) if pnode.get("is_public") is not None else False,
+        "rpc_port": safe_get(pnode, "rpc_port", 6000),
+
+        # Storage metrics (from snapshot) - NULL-SAFE
+        "storage_committed": safe_get(pnode, "storage_committed", 0),
+        "storage_used": safe_get(pnode, "storage_used", 0),
+        "storage_usage_percent": safe_get(pnode, "storage_usage_percent", 0.0),
+
+        # Network topology (from snapshot) - NULL-SAFE
+        "peer_sources": safe_get_list(pnode, "peer_sources"),
+        "peer_count": len(safe_get_list(pnode, "peer_sources")),
+
+        # Historical data (from registry if available) - NULL-SAFE
+        "first_seen": (
+            safe_get(registry_entry, "first_seen", safe_get(pnode, "last_seen_timestamp", now))
+            if registry_entry else safe_get(pnode, "last_seen_timestamp", now)
+        ),
+        "source_ips": (
+            safe_get_list(registry_entry, "source_ips") if registry_entry
+            else safe_get_list(pnode, "peer_sources")
+        ),
+    }
+
+
+def build_offline_entry(reg_entry: Dict, now: int) -> Optional[Dict]:
+    """
+    Build the unified entry for a registry node missing from the snapshot.
+
+    Returns None while the node is still within the 2x CACHE_TTL grace
+    period (not yet considered offline).
+
+    Args:
+        reg_entry: Registry document
+        now: Build timestamp
+    """
+    address = reg_entry.get("address")
+
+    # Check if truly offline (not seen in 2x CACHE_TTL)
+    last_seen = safe_get(reg_entry, "last_seen", 0)
+    if (now - last_seen) <= 2 * CACHE_TTL:
+        return None  # Still considered online somehow
+
+    # Build offline entry - NULL-SAFE
+    entry = {
+        # Identity
+        "address": address,
+        "pubkey": reg_entry.get("pubkey") or "",
+
+        # Status
+        "is_online": False,
+        "last_seen": last_seen,
+        "last_checked": now,
+        "offline_duration": now - last_seen,
+
+        # Network info (from last known state) - NULL-SAFE
+        "version": reg_entry.get("version") or "unknown",
+        "uptime": 0,  # Offline = no uptime
+        "is_public": bool(reg_entry.get("is_public")) if reg_entry.get("is_public") is not None else False,
+        "rpc_port": safe_get(reg_entry, "rpc_port", 6000),
+
+        # Storage metrics (from last known state) - NULL-SAFE
+        "storage_committed": safe_get(reg_entry, "storage_committed", 0),
+        "storage_used": safe_get(reg_entry, "storage_used", 0),
+        "storage_usage_percent": safe_get(reg_entry, "storage_usage_percent", 0.0),
+
+        # Network topology
+        "peer_sources": [],
+        "peer_count": 0,
+
+        # Historical data - NULL-SAFE
+        "first_seen": safe_get(reg_entry, "first_seen", last_seen),
+        "source_ips": safe_get_list(reg_entry, "source_ips"),
+    }
+
+    # Score is 0 for offline nodes
+    entry["scores"] = default_scores("offline")
+    entry["score"] = 0
+    entry["tier"] = "offline"
+    return entry
+
+
+def score_entries(entries: List[Dict]):
+    """
+    Attach scores/score/tier to online entries in one vectorized pass.
+
+    Falls back to per-node scoring if the batch fails.
+    """
+    try:
+        batch_scores = calculate_all_scores_batch(entries)
+    except Exception as e:
+        logger.error(f"Batch scoring failed, scoring nodes one by one: {e}")
+        batch_scores = None
+
+    for i, entry in enumerate(entries):
+        # Per-node fallback - WRAP IN TRY/CATCH
+        try:
+            score_data = batch_scores[i] if batch_scores is not None else calculate_all_scores(entry)
+            entry["scores"] = score_data
+            entry["score"] = score_data["stake_confidence"]["composite_score"]
+            entry["tier"] = score_data["stake_confidence"]["rating"]
+        except Exception as e:
+            # If scoring fails, set defaults
+            logger.error(f"Scoring failed for {entry.get('address')}: {e}")
+            entry["scores"] = default_scores("unknown")
+            entry["score"] = 0
+            entry["tier"] = "unknown"
+
+
+def build_unified_nodes(current_pnodes: List[Dict], registry_docs: List[Dict], now: int) -> List[Dict]:
+    """
+    Merge snapshot and registry into the unified node list.
+
+    Online nodes (from the snapshot) come first, then offline registry nodes.
+
+    Args:
+        current_pnodes: Snapshot merged_pnodes_unique
+        registry_docs: All registry documents
+        now: Build timestamp
+    """
+    registry_map = {doc.get("address"): doc for doc in registry_docs if doc.get("address")}
+
+    # First: all online nodes (from snapshot)
+    online = []
+    processed_addresses = set()
+    for pnode in current_pnodes:
+        address = pnode.get("address")
+        if not address:
+            continue
+        processed_addresses.add(address)
+        online.append(build_online_entry(pnode, registry_map.get(address), now))
+
+    score_entries(online)
+
+    # Second: offline nodes from registry
+    offline = []
+    for address, reg_entry in registry_map.items():
+        if address in processed_addresses:
+            continue  # Already added as online
+        entry = build_offline_entry(reg_entry, now)
+        if entry:
+            offline.append(entry)
+
+    return online + offline
+
+
+class NetworkView:
+    """
+    One published, read-only state of the network.
+
+    Attributes:
+        cycle_id: Snapshot last_updated timestamp (identifies the cycle)
+        built_at: When the view was built
+        nodes: Unified nodes, online first
+        by_address: address -> unified node
+        aggregates: Published NetworkAggregates dict
+        network_stats: Totals for the /pnodes network_stats block
+        health: Network health score dict
+        alerts: AlertIndex of the alerts open in this cycle
+    """
+
+    def __init__(self, snapshot_data: Dict, nodes: List[Dict], by_address: Dict[str, Dict],
+                 aggregates: Dict, alerts: AlertIndex, built_at: int):
+        snapshot_summary = snapshot_data.get("summary", {})
+        self.snapshot_summary = snapshot_summary
+        self.ip_node_count = len(snapshot_data.get("nodes", {}))
+        self.last_updated = safe_get(snapshot_summary, "last_updated", built_at)
+        self.cycle_id = self.last_updated
+        self.built_at = built_at
+        self.nodes = nodes
+        self.by_address = by_address
+        self.aggregates = aggregates
+        self.online_count = aggregates["online_nodes"]
+        self.total_count = aggregates["total_nodes"]
+        self.offline_count = aggregates["offline_nodes"]
+        self.network_stats = {
+            "total_storage_committed": aggregates["total_storage_committed"],
+            "total_storage_used": aggregates["total_storage_used"],
+            "avg_uptime_hours": aggregates["avg_uptime_hours"],
+            "version_distribution": aggregates["version_distribution"],
+        }
+        self.health = aggregates["health"]
+        self.alerts = alerts
+
+    def summary(self, now: int = None) -> Dict:
+        """Node counts and snapshot freshness, as returned by /pnodes."""
+        now = now or int(time.time())
+        return {
+            "total_pnodes": self.total_count,
+            "online_pnodes": self.online_count,
+            "offline_pnodes": self.offline_count,
+            "snapshot_age_seconds": now - self.last_updated,
+            "last_updated": self.last_updated,
+        }
+
+
+class ViewPublisher:
+    """
+    Builds and holds the latest NetworkView.
+
+    The aggregates and alert state persist across cycles; each publish diffs
+    the new nodes against the previous view and only re-applies what was
+    added, removed or changed. The addresses touched by the last
+    CHANGE_LOG_CYCLES diffs are kept for changes_since().
+    """
+
+    def __init__(self):
+        self.view: Optional[NetworkView] = None
+        self.aggregates = NetworkAggregates()
+        self.alerts = AlertEngine()
+        self.last_diff = NodeDiff()
+        self.last_transitions = ([], [])
+        # Transitions whose write failed, retried with the next cycle's
+        self.unsaved_transitions = ([], [])
+        # (previous cycle_id, cycle_id, added/changed addresses, removed addresses)
+        self.change_log = deque(maxlen=CHANGE_LOG_CYCLES)
+
+    def changes_since(self, cycle_id: int) -> Optional[Tuple[Set[str], Set[str]]]:
+        """
+        Addresses changed or removed after a published cycle.
+
+        Args:
+            cycle_id: cycle_id of a view the client already has
+
+        Returns:
+            (changed, removed) address sets, or None if cycle_id is not the
+            current cycle and is older than the change log
+        """
+        if self.view is None:
+            return None
+        if cycle_id == self.view.cycle_id:
+            return set(), set()
+
+        touched, start = set(), None
+        for i, (previous, cycle, changed, removed) in enumerate(self.change_log):
+            if previous == cycle_id:
+                start = i
+                break
+        if start is None:
+            return None
+
+        for i in range(start, len(self.change_log)):
+            _, _, changed, removed = self.change_log[i]
+            touched |= changed
+            touched |= removed
+
+        current = self.view.by_address
+        return (
+            {a for a in touched if a in current},
+            {a for a in touched if a not in current},
+        )
+
+    def publish(self, snapshot_data: Dict, registry_docs: List[Dict] = None, now: int = None) -> NetworkView:
+        """
+        Build a view from snapshot data and make it current.
+
+        Args:
+            snapshot_data: Snapshot "data" document (summary + merged_pnodes_unique)
+            registry_docs: Registry documents (read from MongoDB if omitted)
+            now: Build timestamp
+        """
+        now = now or int(time.time())
+        if registry_docs is None:
+            registry_docs = list(pnodes_registry.find())
+
+        nodes = build_unified_nodes(snapshot_data.get("merged_pnodes_unique", []), registry_docs, now)
+        by_address = {n["address"]: n for n in nodes}
+
+        previous = self.view.by_address if self.view else {}
+        previous_cycle = self.view.cycle_id if self.view else None
+        self.last_diff = NodeDiff.between(previous, by_address)
+        self.aggregates.apply_diff(self.last_diff)
+        self.last_transitions = self.alerts.evaluate(by_address, self.last_diff, now)
+
+        self.view = NetworkView(
+            snapshot_data, nodes, by_address,
+            self.aggregates.to_dict(), self.alerts.index(), now
+        )
+        if previous_cycle is not None:
+            # Per-cycle fields (uptime, last_seen) and the scores derived from
+            # them don't count, or every online node would be in every delta
+            self.change_log.append((
+                previous_cycle, self.view.cycle_id,
+                set(self.last_diff.added) | (set(self.last_diff.changed) - self.last_diff.rescored),
+                set(self.last_diff.removed),
+            ))
+        return self.view
+
+
+_publisher = ViewPublisher()
+
+# View pinned for the current request (see pinned_view)
+_pinned_view: ContextVar = ContextVar("pinned_view", default=None)
+
+# Futures parked by /changes long-polls, resolved when a view is published
+_cycle_waiters: List[asyncio.Future] = []
+
+
+def publish_view(snapshot_data: Dict) -> NetworkView:
+    """
+    Publish a new view for the cycle that just produced `snapshot_data`.
+    Called by the background worker before the snapshot is saved, so the
+    view's aggregates can be stored with it.
+    """
+    # Pick up alerts left open by a previous process
+    if _publisher.view is None:
+        _publisher.alerts.restore(get_open_alerts(), get_last_alert_seq())
+        alert_feed.reset(_publisher.alerts.seq)
+
+    view = _publisher.publish(snapshot_data)
+    diff = _publisher.last_diff
+    logger.info(
+        f"✅ Published network view (cycle {view.cycle_id}: "
+        f"{view.online_count} online, {view.offline_count} offline; "
+        f"+{len(diff.added)} -{len(diff.removed)} ~{len(diff.changed)}, {len(diff.refreshed)} refreshed)"
+    )
+
+    # Write alert transitions (with any left over from a failed write), then
+    # push them to /alerts/stream, so the feed never gets ahead of what a
+    # Last-Event-ID replay can read back from MongoDB
+    unsaved_opened, unsaved_resolved = _publisher.unsaved_transitions
+    opened = unsaved_opened + _publisher.last_transitions[0]
+    resolved = unsaved_resolved + _publisher.last_transitions[1]
+    if save_alert_transitions(opened, resolved):
+        _publisher.unsaved_transitions = ([], [])
+        try:
+            alert_feed.publish(opened, resolved)
+        except Exception as e:
+            logger.error(f"❌ Failed to push alert transitions: {e}")
+    else:
+        _publisher.unsaved_transitions = (opened, resolved)
+        logger.warning(f"⚠️ {len(opened) + len(resolved)} alert transition(s) kept for the next cycle")
+
+    # Push this cycle's node changes to /ws/pnodes subscribers
+    try:
+        delta_hub.publish(view, diff)
+    except Exception as e:
+        logger.error(f"❌ Failed to broadcast node deltas: {e}")
+
+    # Wake /changes long-polls
+    waiters = list(_cycle_waiters)
+    _cycle_waiters.clear()
+    for waiter in waiters:
+        if not waiter.done():
+            waiter.set_result(view.cycle_id)
+    return view
+
+
+def load_view() -> Optional[NetworkView]:
+    """
+    Build a view straight from MongoDB without publishing it.
+    Used before this process has completed its first ingestion cycle.
+    """
+    snapshot = nodes_current.find_one({"_id": "snapshot"})
+    if not snapshot or "data" not in snapshot:
+        return None
+
+    return ViewPublisher().publish(snapshot["data"])
+
+
+def current_view() -> Optional[NetworkView]:
+    """
+    Return the latest published view, or one built from MongoDB if the
+    background worker has not published yet. None if no snapshot exists.
+
+    Inside pinned_view(), always the pinned view.
+    """
+    return _pinned_view.get() or _publisher.view or load_view()
+
+
+@contextmanager
+def pinned_view(view: NetworkView):
+    """
+    Make current_view() return `view` for the enclosed code.
+
+    Lets one request compute several endpoints' sections against the same
+    cycle, without rebuilding a view per section before the first publish.
+    """
+    token = _pinned_view.set(view)
+    try:
+        yield view
+    finally:
+        _pinned_view.reset(token)
+
+
+async def wait_for_cycle(after: Optional[int], timeout: float) -> Optional[int]:
+    """
+    Wait until a view other than cycle `after` is published.
+
+    Returns immediately if the current view is already newer. Otherwise
+    parks a future that publish_view() resolves.
+
+    Args:
+        after: cycle_id the client already has (None = return the current one)
+        timeout: Max seconds to wait
+
+    Returns:
+        The new cycle_id, or None on timeout
+    """
+    view = _publisher.view
+    if view is not None and (after is None or view.cycle_id != after):
+        return view.cycle_id
+
+    waiter = asyncio.get_running_loop().create_future()
+    _cycle_waiters.append(waiter)
+    try:
+        return await asyncio.wait_for(waiter, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        if waiter in _cycle_waiters:
+            _cycle_waiters.remove(waiter)
+
+
+def changes_since(cycle_id: int) -> Optional[Tuple[Set[str], Set[str]]]:
+    """
+    (changed, removed) addresses since a cycle of this process's view.
+    None when the cycle is unknown (too old, or no cycle published yet).
+    """
+    return _publisher.changes_since(cycle_id)
+
+
+def load_nodes(addresses: List[str], now: int = None) -> Dict[str, Dict]:
+    """
+    Build unified entries for just the given addresses straight from MongoDB.
+
+    Reads only the matching snapshot pnodes ($filter on the server) and
+    registry documents ($in), so the cost depends on the number of addresses
+    requested rather than the size of the network.
+
+    Args:
+        addresses: Node addresses (IP:port)
+        now: Build timestamp
+
+    Returns:
+        address -> unified node, for the addresses that were found
+    """
+    now = now or int(time.time())
+    wanted = list(dict.fromkeys(addresses))
+    if not wanted:
+        return {}
+
+    pipeline = [
+        {"$match": {"_id": "snapshot"}},
+        {"$project": {
+            "_id": 0,
+            "pnodes": {
+                "$filter": {
+                    "input": "$data.merged_pnodes_unique",
+                    "as": "p",
+                    "cond": {"$in": ["$$p.address", wanted]}
+                }
+            }
+        }}
+    ]
+    docs = list(nodes_current.aggregate(pipeline))
+    snapshot_pnodes = (docs[0].get("pnodes") or []) if docs else []
+    registry_docs = list(pnodes_registry.find({"address": {"$in": wanted}}))
+
+    nodes = build_unified_nodes(snapshot_pnodes, registry_docs, now)
+    return {n["address"]: n for n in nodes}
+
+
+def lookup_nodes(addresses: List[str]) -> Dict[str, Dict]:
+    """
+    Unified nodes for a batch of addresses.
+
+    One dict lookup per address on the published view; before the first
+    cycle, a targeted MongoDB read via load_nodes().
+
+    Returns:
+        address -> unified node, for the addresses that were found
+    """
+    view = _pinned_view.get() or _publisher.view
+    if view is not None:
+        return {a: view.by_address[a] for a in addresses if a in view.by_address}
+    return load_nodes(addresses)
+
+
+def get_node(address: str) -> Optional[Dict]:
+    """Unified node for one address, or None if unknown/within grace period."""
+    return lookup_nodes([address]).get(address)
+
+
+def alerts_for_node(node: Dict) -> List[Dict]:
+    """
+    Open alerts for one unified node.
+
+    Served from the published alert index; evaluated for just this node
+    before the first cycle.
+    """
+    view = _pinned_view.get() or _publisher.view
+    if view is not None:
+        return view.alerts.for_node(node["address"])
+    return check_node_alerts(node)
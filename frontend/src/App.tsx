@@ -12,6 +12,7 @@ import Compare from "./pages/Compare";
 import Topology from "./pages/Topology";
 import AIInsights from "./pages/AIInsights";
 import NotFound from "./pages/NotFound";
+import { useSnapshotChanges } from "./hooks/useSnapshotChanges";
 
 const queryClient = new QueryClient({
   defaultOptions: {
@@ -22,8 +23,15 @@ const queryClient = new QueryClient({
   },
 });
 
+// Refetches queries when the backend publishes a new snapshot
+const LiveUpdates = () => {
+  useSnapshotChanges();
+  return null;
+};
+
 const App = () => (
   <QueryClientProvider client={queryClient}>
+    <LiveUpdates />
     <TooltipProvider>
       <Toaster />
       <Sonner />
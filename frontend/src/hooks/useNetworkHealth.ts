@@ -6,13 +6,13 @@ import {
   fetchCriticalAlerts,
   fetchRecommendations,
   fetchNetworkAnalytics,
+  fetchDashboard,
 } from '@/lib/api';
 
 export function useHealth() {
   return useQuery({
     queryKey: ['health'],
     queryFn: fetchHealth,
-    refetchInterval: 60000,
     staleTime: 30000,
   });
 }
@@ -21,7 +21,6 @@ export function useNetworkHealth() {
   return useQuery({
     queryKey: ['network-health'],
     queryFn: fetchNetworkHealth,
-    refetchInterval: 60000,
     staleTime: 30000,
   });
 }
@@ -30,7 +29,6 @@ export function useNetworkHistory(hours: number = 24) {
   return useQuery({
     queryKey: ['network-history', hours],
     queryFn: () => fetchNetworkHistory(hours),
-    refetchInterval: 60000,
     staleTime: 30000,
   });
 }
@@ -39,7 +37,6 @@ export function useCriticalAlerts() {
   return useQuery({
     queryKey: ['critical-alerts'],
     queryFn: fetchCriticalAlerts,
-    refetchInterval: 60000,
     staleTime: 30000,
   });
 }
@@ -60,7 +57,6 @@ export function useRecommendations(params?: {
         throw error;
       }
     },
-    refetchInterval: 60000,
     staleTime: 30000,
     retry: 2,
   });
@@ -78,8 +74,21 @@ export function useNetworkAnalytics() {
         throw error;
       }
     },
-    refetchInterval: 60000,
     staleTime: 30000,
     retry: 2,
   });
 }
+
+export function useDashboard(params: { pnodesLimit?: number; historyHours?: number } = {}) {
+  const { pnodesLimit = 5, historyHours = 24 } = params;
+  return useQuery({
+    queryKey: ['dashboard', pnodesLimit, historyHours],
+    queryFn: () =>
+      fetchDashboard({
+        sections: ['health', 'network_health', 'pnodes', 'history', 'critical_alerts'],
+        pnodes_limit: pnodesLimit,
+        history_hours: historyHours,
+      }),
+    staleTime: 30000,
+  });
+}
@@ -33,7 +33,6 @@ export function useNodes({
         throw error;
       }
     },
-    refetchInterval: 60000,
     staleTime: 30000,
     retry: 2,
   });
@@ -44,7 +43,6 @@ export function useNodeDetails(address: string) {
     queryKey: ['node', address],
     queryFn: () => fetchRegistryEntry(address),
     enabled: !!address,
-    refetchInterval: 60000,
   });
 }
 
@@ -53,7 +51,6 @@ export function useNodeAlerts(address: string) {
     queryKey: ['node-alerts', address],
     queryFn: () => fetchNodeAlerts(address),
     enabled: !!address,
-    refetchInterval: 60000,
   });
 }
 
@@ -62,6 +59,5 @@ export function useNodeConsistency(address: string) {
     queryKey: ['node-consistency', address],
     queryFn: () => fetchNodeConsistency(address),
     enabled: !!address,
-    refetchInterval: 60000,
   });
 }
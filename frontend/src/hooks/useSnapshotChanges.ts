@@ -0,0 +1,37 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { fetchChanges } from '@/lib/api';
+
+const RETRY_DELAY_MS = 5000;
+
+// Long-polls /changes and invalidates every query when a new snapshot is
+// published, so data refetches once per real change instead of on a timer.
+export function useSnapshotChanges() {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    let active = true;
+    let version: number | undefined;
+
+    const poll = async () => {
+      while (active) {
+        try {
+          const result = await fetchChanges(version);
+          if (!active) break;
+          if (result.changed && version !== undefined) {
+            queryClient.invalidateQueries();
+          }
+          version = result.version ?? version;
+        } catch (error) {
+          console.error('Change polling failed:', error);
+          await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY_MS));
+        }
+      }
+    };
+
+    poll();
+    return () => {
+      active = false;
+    };
+  }, [queryClient]);
+}
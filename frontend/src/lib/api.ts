@@ -11,6 +11,8 @@ import type {
   RecommendationsResponse,
   NetworkAnalyticsResponse,
   ComparisonResponse,
+  ChangesResponse,
+  DashboardResponse,
 } from './types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'https://web-production-b4440.up.railway.app';
@@ -47,8 +49,32 @@ export const fetchPNodes = async (params: {
   return data;
 };
 
-export const fetchNetworkHistory = async (hours: number): Promise<NetworkHistoryResponse> => {
-  const { data } = await api.get('/network/history', { params: { hours } });
+export const fetchNetworkHistory = async (hours: number, maxPoints: number = 300): Promise<NetworkHistoryResponse> => {
+  const { data } = await api.get('/network/history', { params: { hours, max_points: maxPoints, method: 'lttb' } });
+  return data;
+};
+
+// Long-poll: resolves when a snapshot newer than `after` is published,
+// or with changed=false after `timeout` seconds
+export const fetchChanges = async (after?: number, timeout: number = 25): Promise<ChangesResponse> => {
+  const { data } = await api.get('/changes', {
+    params: { after, timeout },
+    timeout: (timeout + 10) * 1000,
+  });
+  return data;
+};
+
+// Several dashboard sections from one snapshot cycle in a single request
+export const fetchDashboard = async (params: {
+  sections?: string[];
+  pnodes_limit?: number;
+  history_hours?: number;
+  history_points?: number;
+} = {}): Promise<DashboardResponse> => {
+  const { sections, ...rest } = params;
+  const { data } = await api.get('/dashboard', {
+    params: { ...rest, sections: sections?.join(',') },
+  });
   return data;
 };
 
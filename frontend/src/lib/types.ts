@@ -253,3 +253,23 @@ export interface ComparisonResponse {
     considerations: string[];
   };
 }
+
+export interface ChangesResponse {
+  version: number | null;
+  changed: boolean;
+  timestamp: number;
+}
+
+export interface DashboardResponse {
+  cycle: number;
+  sections: {
+    health?: HealthResponse;
+    network_health?: NetworkHealthResponse;
+    pnodes?: PNodesResponse;
+    history?: NetworkHistoryResponse;
+    critical_alerts?: AlertsResponse;
+    analytics?: NetworkAnalyticsResponse;
+  };
+  errors: Record<string, unknown>;
+  timestamp: number;
+}
@@ -4,19 +4,18 @@ import { NetworkHealthCard } from '@/components/dashboard/NetworkHealthCard';
 import { TopPerformers } from '@/components/dashboard/TopPerformers';
 import { AlertBanner } from '@/components/dashboard/AlertBanner';
 import { NetworkGrowthChart } from '@/components/charts/NetworkGrowthChart';
-import { useHealth, useNetworkHealth, useNetworkHistory, useCriticalAlerts } from '@/hooks/useNetworkHealth';
-import { useNodes } from '@/hooks/useNodes';
+import { useDashboard } from '@/hooks/useNetworkHealth';
 import { Server, Wifi, HardDrive, Users, Clock } from 'lucide-react';
 import { formatBytes, formatUptime } from '@/lib/utils';
 
 export default function Index() {
-  const { data: health, isLoading: healthLoading } = useHealth();
-  const { data: networkHealth, isLoading: networkHealthLoading } = useNetworkHealth();
-  const { data: historyData, isLoading: historyLoading } = useNetworkHistory(24);
-  const { data: topNodes, isLoading: topNodesLoading } = useNodes({ limit: 5, sortBy: 'score' });
-  const { data: alerts } = useCriticalAlerts();
-
-  const isLoading = healthLoading || networkHealthLoading;
+  // All sections come from one request against the same snapshot cycle
+  const { data: dashboard, isLoading } = useDashboard({ pnodesLimit: 5, historyHours: 24 });
+  const health = dashboard?.sections.health;
+  const networkHealth = dashboard?.sections.network_health;
+  const historyData = dashboard?.sections.history;
+  const topNodes = dashboard?.sections.pnodes;
+  const alerts = dashboard?.sections.critical_alerts;
 
   return (
     <MainLayout>
@@ -46,7 +45,7 @@ export default function Index() {
           />
           <StatsCard
             label="Online"
-            value={networkHealthLoading ? '—' : networkHealth?.summary?.online_pnodes ?? 0}
+            value={isLoading ? '—' : networkHealth?.summary?.online_pnodes ?? 0}
             icon={Wifi}
             trend={`${networkHealth?.summary?.offline_pnodes ?? 0} offline`}
           />
@@ -58,7 +57,7 @@ export default function Index() {
           )}
           <StatsCard
             label="Total Storage"
-            value={networkHealthLoading ? '—' : formatBytes(networkHealth?.summary?.total_storage ?? 0)}
+            value={isLoading ? '—' : formatBytes(networkHealth?.summary?.total_storage ?? 0)}
             icon={HardDrive}
           />
         </div>
@@ -69,7 +68,7 @@ export default function Index() {
           <div className="lg:col-span-2">
             <NetworkGrowthChart
               data={historyData?.history ?? []}
-              isLoading={historyLoading}
+              isLoading={isLoading}
             />
           </div>
 
@@ -77,7 +76,7 @@ export default function Index() {
           <div>
             <TopPerformers
               nodes={topNodes?.pnodes ?? []}
-              isLoading={topNodesLoading}
+              isLoading={isLoading}
             />
           </div>
         </div>
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Incremental aggregate tests.
+
+Applies several cycles of node diffs to NetworkAggregates and checks the
+result against aggregates rebuilt from scratch for the same nodes.
+
+Usage:
+    python -m pytest tests/test_aggregates.py
+    python tests/test_aggregates.py
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.aggregates import NetworkAggregates, NodeDiff, peer_bucket, storage_bucket
+from app.scoring import calculate_all_scores
+
+
+def make_cycle(count: int, seed: int):
+    """Build an address -> unified node mapping for one cycle."""
+    rng = random.Random(seed)
+    nodes = {}
+    for i in range(count):
+        if rng.random() < 0.1:
+            continue  # Node missing this cycle
+        node = {
+            "address": f"10.0.0.{i}:9001",
+            "is_online": rng.random() > 0.2,
+            "version": rng.choice(["0.8.0", "0.7.0", "0.6.1", None]),
+            "uptime": rng.randint(0, 86400 * 40),
+            "is_public": rng.random() > 0.5,
+            "storage_committed": rng.randint(0, 1024**3 * 200),
+            "storage_used": rng.randint(0, 1024**3),
+            "storage_usage_percent": rng.choice([0, 10, 90, rng.uniform(0, 100)]),
+            "peer_sources": [f"ip{j}" for j in range(rng.randint(0, 6))],
+            "last_checked": seed,
+        }
+        node["scores"] = calculate_all_scores(node)
+        nodes[node["address"]] = node
+    return nodes
+
+
+def test_incremental_matches_rebuild():
+    aggregates = NetworkAggregates()
+    previous = {}
+    for seed in range(5):
+        current = make_cycle(80, seed)
+        aggregates.apply_diff(NodeDiff.between(previous, current))
+        previous = current
+
+        expected = NetworkAggregates.from_nodes(current.values()).to_dict()
+        assert json.dumps(aggregates.to_dict(), sort_keys=True) == json.dumps(expected, sort_keys=True)
+
+
+def test_diff_ignores_volatile_fields():
+    current = make_cycle(20, 1)
+    later = {address: dict(node, last_checked=node["last_checked"] + 60) for address, node in current.items()}
+    assert not NodeDiff.between(current, later)
+
+
+def test_uptime_only_changes_are_refreshed():
+    aggregates = NetworkAggregates()
+    current = make_cycle(40, 2)
+    aggregates.apply_diff(NodeDiff.between({}, current))
+
+    later = {
+        address: dict(node, uptime=node["uptime"] + 60, last_seen=1000)
+        for address, node in current.items()
+    }
+    diff = NodeDiff.between(current, later)
+    assert not diff.changed and not diff.added and not diff.removed
+    assert set(diff.refreshed) == set(current)
+
+    aggregates.apply_diff(diff)
+    expected = NetworkAggregates.from_nodes(later.values()).to_dict()
+    assert json.dumps(aggregates.to_dict(), sort_keys=True) == json.dumps(expected, sort_keys=True)
+
+
+def test_buckets():
+    assert [storage_bucket(u) for u in (0, 10, 29.9, 70, 90, 100)] == [
+        "empty", "low", "low", "high", "critical", "critical"
+    ]
+    assert [peer_bucket(p) for p in (0, 1, 2, 3, 4, 5)] == [
+        "isolated", "isolated", "weak", "good", "good", "excellent"
+    ]
+
+
+if __name__ == "__main__":
+    test_incremental_matches_rebuild()
+    test_diff_ignores_volatile_fields()
+    test_uptime_only_changes_are_refreshed()
+    test_buckets()
+    print("✅ Incremental aggregates match a full rebuild")
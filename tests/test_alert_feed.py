@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Alert stream feed tests.
+
+Checks SSE event ordering/format, Last-Event-ID replay from the ring
+buffer, and that a client too slow to drain its queue is disconnected
+instead of buffering without bound.
+
+Usage:
+    python -m pytest tests/test_alert_feed.py
+    python tests/test_alert_feed.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.alert_feed import AlertFeed, QUEUE_SIZE, format_event, matches, transition_events
+
+
+def make_cycle(first_seq, opened=2, resolved=1):
+    """Transitions of one cycle with consecutive sequence numbers."""
+    seq = first_seq
+    opened_alerts, resolved_alerts = [], []
+    for i in range(opened):
+        opened_alerts.append({"alert_id": f"a{seq}", "address": f"n{i}", "severity": "critical",
+                              "opened_seq": seq})
+        seq += 1
+    for i in range(resolved):
+        resolved_alerts.append({"alert_id": f"r{seq}", "address": f"n{i}", "severity": "warning",
+                                "opened_seq": 0, "resolved_seq": seq})
+        seq += 1
+    return opened_alerts, resolved_alerts, seq
+
+
+def test_events_in_sequence_order():
+    opened, resolved, _ = make_cycle(10)
+    events = transition_events(opened, resolved)
+    seqs = [e["seq"] for e in events]
+    assert seqs == sorted(seqs) == [10, 11, 12]
+
+    text = format_event(events[-1])
+    lines = text.split("\n")
+    assert lines[0] == "id: 12" and lines[1] == "event: resolved"
+    assert json.loads(lines[2][len("data: "):])["alert_id"] == "r12"
+    assert text.endswith("\n\n")
+
+    assert matches(events[-1], severity="warning")
+    assert not matches(events[-1], severity="critical")
+    assert not matches(events[-1], address="n9")
+
+
+def test_ring_replay():
+    feed = AlertFeed(ring_size=50)
+    seq = 1
+    for _ in range(10):
+        opened, resolved, seq = make_cycle(seq)
+        feed.publish(opened, resolved)
+    assert feed.last_seq == seq - 1 == 30
+
+    events, complete = feed.replay(25)
+    assert complete and [e["seq"] for e in events] == [26, 27, 28, 29, 30]
+    assert feed.replay(30) == ([], True)
+
+
+def test_slow_subscriber_is_disconnected():
+    feed = AlertFeed()
+    queue = feed.subscribe()
+    seq = 1
+    while queue.qsize() + 3 <= QUEUE_SIZE:
+        opened, resolved, seq = make_cycle(seq)
+        feed.publish(opened, resolved)
+    assert queue in feed.subscribers
+
+    opened, resolved, seq = make_cycle(seq)
+    feed.publish(opened, resolved)
+    assert queue not in feed.subscribers
+    assert queue.qsize() == 1 and queue.get_nowait() is None
+
+
+if __name__ == "__main__":
+    test_events_in_sequence_order()
+    test_ring_replay()
+    test_slow_subscriber_is_disconnected()
+    print("✅ Alert feed orders, replays and sheds slow clients correctly")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Alert engine tests.
+
+Checks that the per-cycle alert engine matches check_node_alerts(), only
+reports transitions, and resumes cleanly from persisted open alerts.
+
+Usage:
+    python -m pytest tests/test_alerts.py
+    python tests/test_alerts.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.aggregates import NodeDiff
+from app.alerts import AlertEngine, check_node_alerts
+
+
+def make_node(address: str, **overrides):
+    node = {
+        "address": address,
+        "is_online": True,
+        "uptime": 86400 * 10,
+        "version": "0.8.0",
+        "storage_usage_percent": 50.0,
+        "peer_sources": ["a", "b", "c"],
+    }
+    node.update(overrides)
+    return node
+
+
+def run_cycle(engine, previous, current, now):
+    return engine.evaluate(current, NodeDiff.between(previous, current), now)
+
+
+def test_lifecycle():
+    engine = AlertEngine()
+    cycle1 = {
+        "n1": make_node("n1"),
+        "n2": make_node("n2", storage_usage_percent=97.0),
+        "n3": make_node("n3", peer_sources=[]),
+    }
+    opened, resolved = run_cycle(engine, {}, cycle1, now=100)
+    assert {a["alert_id"] for a in opened} == {"n2|storage_critical|critical", "n3|isolated|critical"}
+    assert resolved == []
+
+    # Nothing changed: no transitions, alerts keep their opened_at
+    opened, resolved = run_cycle(engine, cycle1, cycle1, now=160)
+    assert opened == [] and resolved == []
+    assert engine.index().for_node("n2")[0]["opened_at"] == 100
+
+    # n2 recovers, n3 disappears, n1 escalates
+    cycle3 = {
+        "n1": make_node("n1", uptime=60),
+        "n2": make_node("n2"),
+    }
+    opened, resolved = run_cycle(engine, cycle1, cycle3, now=220)
+    assert {a["alert_id"] for a in opened} == {"n1|low_uptime|critical"}
+    assert {a["alert_id"] for a in resolved} == {"n2|storage_critical|critical", "n3|isolated|critical"}
+    assert all(a["resolved_at"] == 220 for a in resolved)
+
+    # Every transition gets its own sequence number
+    seqs = [a["opened_seq"] for a in opened] + [a["resolved_seq"] for a in resolved]
+    assert sorted(seqs) == [3, 4, 5]
+    assert engine.index().last_seq == 5
+
+
+def test_uptime_only_changes_resolve_low_uptime():
+    engine = AlertEngine()
+    cycle1 = {"n1": make_node("n1", uptime=600), "n2": make_node("n2")}
+    opened, _ = run_cycle(engine, {}, cycle1, now=100)
+    assert {a["alert_id"] for a in opened} == {"n1|low_uptime|critical"}
+
+    cycle2 = {address: dict(node, uptime=node["uptime"] + 86400) for address, node in cycle1.items()}
+    assert not NodeDiff.between(cycle1, cycle2).changed
+    opened, resolved = run_cycle(engine, cycle1, cycle2, now=160)
+    assert opened == []
+    assert {a["alert_id"] for a in resolved} == {"n1|low_uptime|critical"}
+
+
+def test_index_matches_check_node_alerts():
+    engine = AlertEngine()
+    nodes = {
+        f"n{i}": make_node(
+            f"n{i}",
+            uptime=i * 4000,
+            version=["0.8.0", "0.7.1", "0.5.0"][i % 3],
+            storage_usage_percent=float(i * 7 % 101),
+            peer_sources=["p"] * (i % 6),
+        )
+        for i in range(30)
+    }
+    engine.evaluate(nodes, None, now=100)
+    index = engine.index()
+
+    for address, node in nodes.items():
+        expected = [(a["type"], a["severity"]) for a in check_node_alerts(node)]
+        assert [(a["type"], a["severity"]) for a in index.for_node(address)] == expected
+
+    critical = index.select(severity="critical")
+    assert all(a["severity"] == "critical" for a in critical)
+    assert {n["address"] for n in index.critical_nodes()} == {a["address"] for a in critical}
+
+
+def test_restore():
+    engine = AlertEngine()
+    nodes = {"n1": make_node("n1", peer_sources=[])}
+    opened, _ = engine.evaluate(nodes, None, now=100)
+
+    # A new process restores the open alerts and does not re-open them
+    restored = AlertEngine()
+    restored.restore([dict(a) for a in opened], last_seq=engine.seq)
+    opened, resolved = restored.evaluate(nodes, NodeDiff.between({}, nodes), now=160)
+    assert opened == [] and resolved == []
+    assert restored.index().for_node("n1")[0]["opened_at"] == 100
+
+
+if __name__ == "__main__":
+    test_lifecycle()
+    test_uptime_only_changes_resolve_low_uptime()
+    test_index_matches_check_node_alerts()
+    test_restore()
+    print("✅ Alert engine lifecycle checks passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Downsampling tests.
+
+Checks that LTTB keeps the endpoints and spikes of a series and that
+bucket averaging preserves totals.
+
+Usage:
+    python -m pytest tests/test_downsample.py
+    python tests/test_downsample.py
+"""
+
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.downsample import average, downsample, lttb
+
+
+def series(count):
+    return [{"timestamp": i * 60, "score": 50 + 20 * math.sin(i / 50)} for i in range(count)]
+
+
+def test_lttb_bounds_and_order():
+    points = series(5000)
+    sampled = lttb(points, 300, "score")
+    assert len(sampled) == 300
+    assert sampled[0] is points[0] and sampled[-1] is points[-1]
+    timestamps = [p["timestamp"] for p in sampled]
+    assert timestamps == sorted(set(timestamps))
+
+    # Short series and tiny thresholds
+    assert lttb(points[:5], 10, "score") == points[:5]
+    assert len(lttb(points, 2, "score")) == 2
+
+
+def test_lttb_keeps_spike():
+    points = [{"timestamp": i, "score": 0} for i in range(10000)]
+    points[6123]["score"] = 100
+    assert any(p["score"] == 100 for p in lttb(points, 50, "score"))
+
+
+def test_average_preserves_totals():
+    points = [{"timestamp": i, "total_pnodes": i % 7, "version_distribution": {}} for i in range(1000)]
+    averaged = average(points, 100)
+    assert len(averaged) == 100
+    assert sum(p["samples"] for p in averaged) == 1000
+    # Equal-size groups: mean of group means equals the overall mean
+    overall = sum(p["total_pnodes"] for p in points) / 1000
+    assert abs(sum(p["total_pnodes"] for p in averaged) / 100 - overall) < 0.01
+
+
+def test_downsample_passthrough():
+    points = series(50)
+    assert downsample(points, 100, "lttb", "score") is points
+
+
+if __name__ == "__main__":
+    test_lttb_bounds_and_order()
+    test_lttb_keeps_spike()
+    test_average_preserves_totals()
+    test_downsample_passthrough()
+    print("✅ Downsampling keeps shape and totals")
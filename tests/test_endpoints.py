@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Endpoint tests against an in-memory MongoDB.
+
+Runs the FastAPI app with TestClient on top of mongomock (no network, no
+background worker) and publishes views by hand, so request handling can
+be checked end to end.
+
+Requires mongomock (pip install mongomock).
+
+Usage:
+    python -m pytest tests/test_endpoints.py
+    python tests/test_endpoints.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import mongomock
+import mongomock.collection
+import pymongo.mongo_client
+
+
+class InMemoryClient(mongomock.MongoClient):
+    def __init__(self, *args, server_api=None, **kwargs):
+        super().__init__()
+
+
+# app.db connects at import time
+pymongo.mongo_client.MongoClient = InMemoryClient
+
+# pymongo 4.9+ passes sort= to bulk updates, which mongomock 4.3 predates
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+mongomock.collection.BulkOperationBuilder.add_update = (
+    lambda self, *args, sort=None, **kwargs: _add_update(self, *args, **kwargs)
+)
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import db, main, view
+
+client = TestClient(main.app)
+
+
+def make_snapshot(count=5, timestamp=None, uptime=1000):
+    timestamp = timestamp or int(time.time())
+    pods = [
+        {
+            "address": f"10.0.0.{i}:9001",
+            "pubkey": f"pk{i}",
+            "is_public": i % 2 == 0,
+            "rpc_port": 6000,
+            "storage_committed": 50 * 1024 ** 3,
+            "storage_used": 1024 ** 3,
+            "storage_usage_percent": 30.0,
+            "uptime": uptime + i,
+            "version": "0.8.0",
+            "last_seen_timestamp": timestamp,
+            "peer_sources": ["1.1.1.1", "2.2.2.2"],
+        }
+        for i in range(count)
+    ]
+    return {
+        "summary": {"last_updated": timestamp, "total_pnodes": count},
+        "nodes": {"1.1.1.1": {}},
+        "merged_pnodes_unique": pods,
+    }
+
+
+def publish(snapshot):
+    db.nodes_current.replace_one({"_id": "snapshot"}, {"_id": "snapshot", "data": snapshot}, upsert=True)
+    for pod in snapshot["merged_pnodes_unique"]:
+        db.pnodes_registry.update_one(
+            {"address": pod["address"]},
+            {"$set": {"address": pod["address"], "pubkey": pod["pubkey"], "last_seen": pod["last_seen_timestamp"]},
+             "$setOnInsert": {"first_seen": pod["last_seen_timestamp"] - 86400}},
+            upsert=True
+        )
+    return view.publish_view(snapshot)
+
+
+def rpc(payload):
+    return client.post("/rpc", content=json.dumps(payload))
+
+
+def test_rpc_batch_isolates_call_errors():
+    publish(make_snapshot())
+    response = rpc([
+        {"jsonrpc": "2.0", "id": 1, "method": "pnodes", "params": {"limit": 2}},
+        {"jsonrpc": "2.0", "id": 2, "method": "pnodes", "params": {"address": "x"}},
+        {"jsonrpc": "2.0", "id": 3, "method": "node", "params": {"address": "10.0.0.1:9001"}},
+        {"jsonrpc": "2.0", "id": 4, "method": "nope"},
+        {"jsonrpc": "2.0", "method": "pnodes"},
+    ])
+    assert response.status_code == 200
+    by_id = {r["id"]: r for r in response.json()}
+
+    # Notification (no id) gets no entry
+    assert sorted(by_id) == [1, 2, 3, 4]
+    assert len(by_id[1]["result"]["pnodes"]) == 2
+    assert by_id[2]["error"]["code"] == -32602
+    assert by_id[3]["result"]["address"] == "10.0.0.1:9001"
+    assert by_id[4]["error"]["code"] == -32601
+
+
+def test_rpc_request_errors():
+    assert client.post("/rpc", content="{nope").json()["error"]["code"] == -32700
+    assert rpc([]).json()["error"]["code"] == -32600
+    assert rpc({"jsonrpc": "2.0", "id": 1, "method": "pnodes", "params": {"limit": 0}}).json()["error"]["code"] == -32602
+    assert rpc([{"jsonrpc": "2.0", "method": "pnodes"}]).status_code == 204
+
+
+def test_pnodes_since_ignores_per_cycle_fields():
+    first = make_snapshot(timestamp=int(time.time()) + 100)
+    publish(first)
+    cycle = first["summary"]["last_updated"]
+
+    # Only uptime/last_seen (and the scores derived from uptime) move
+    second = make_snapshot(timestamp=cycle + 60, uptime=1000 + 3600)
+    publish(second)
+    body = client.get("/pnodes", params={"since": cycle}).json()
+    assert body["delta"]["full"] is False
+    assert body["pnodes"] == [] and body["delta"]["removed"] == []
+
+    # A reported change still shows up, whatever limit asks for
+    third = make_snapshot(timestamp=cycle + 120, uptime=1000 + 7200)
+    third["merged_pnodes_unique"][2]["storage_used"] *= 2
+    third["merged_pnodes_unique"][3]["version"] = "0.8.1"
+    publish(third)
+    body = client.get("/pnodes", params={"since": cycle, "limit": 1}).json()
+    assert sorted(n["address"] for n in body["pnodes"]) == ["10.0.0.2:9001", "10.0.0.3:9001"]
+
+
+def test_alert_transitions_are_saved_before_the_feed():
+    timestamp, uptime = int(time.time()) + 1000, 86400 * 10
+    publish(make_snapshot(timestamp=timestamp, uptime=uptime))
+    pushed = []
+    original_save, original_push = view.save_alert_transitions, view.alert_feed.publish
+    view.alert_feed.publish = lambda opened, resolved: pushed.append((opened, resolved))
+    try:
+        # One node restarts while MongoDB is failing: nothing reaches the feed
+        snapshot = make_snapshot(timestamp=timestamp + 60, uptime=uptime)
+        snapshot["merged_pnodes_unique"][0]["uptime"] = 30
+        view.save_alert_transitions = lambda opened, resolved: not (opened or resolved)
+        publish(snapshot)
+        assert pushed == []
+
+        # Next cycle the kept transition is written and pushed
+        view.save_alert_transitions = original_save
+        snapshot = make_snapshot(timestamp=timestamp + 120, uptime=uptime)
+        snapshot["merged_pnodes_unique"][0]["uptime"] = 90
+        publish(snapshot)
+    finally:
+        view.save_alert_transitions, view.alert_feed.publish = original_save, original_push
+
+    assert [a["alert_id"] for a in pushed[0][0]] == ["10.0.0.0:9001|low_uptime|critical"]
+    saved = db.pnodes_alerts.find_one({"alert_id": "10.0.0.0:9001|low_uptime|critical", "status": "open"})
+    assert saved is not None and saved["opened_seq"] == pushed[0][0][0]["opened_seq"]
+
+
+def test_node_alert_history():
+    # uptime under an hour opens low_uptime for every node
+    publish(make_snapshot(timestamp=int(time.time()) + 2000))
+    address = "10.0.0.0:9001"
+    body = client.get(f"/pnodes/{address}/alerts").json()
+    assert "history" not in body
+
+    body = client.get(f"/pnodes/{address}/alerts", params={"history": "true", "limit": 2}).json()
+    assert 0 < len(body["history"]) <= 2
+    assert all(a["address"] == address for a in body["history"])
+    assert [a["opened_at"] for a in body["history"]] == sorted((a["opened_at"] for a in body["history"]), reverse=True)
+
+    result = rpc({"jsonrpc": "2.0", "id": 1, "method": "alerts", "params": {"address": address, "history": True}})
+    assert result.json()["result"]["history"]
+
+
+def test_pnodes_batch():
+    publish(make_snapshot(timestamp=int(time.time()) + 3000))
+    db.pnodes_registry.update_one(
+        {"address": "10.0.0.1:9001"},
+        {"$set": {"gossip_appearances": 10, "gossip_disappearances": 3, "consistency_score": 0.7}}
+    )
+
+    response = client.post("/pnodes/batch", json={
+        "addresses": ["10.0.0.1:9001", "10.9.9.9:9001", "10.0.0.1:9001", " 10.0.0.2:9001 "],
+        "include_alerts": True,
+        "include_consistency": True,
+    })
+    assert response.status_code == 200
+    body = response.json()
+
+    # Duplicates counted once, request order kept, unknown addresses listed
+    assert [n["address"] for n in body["nodes"]] == ["10.0.0.1:9001", "10.0.0.2:9001"]
+    assert body["missing"] == ["10.9.9.9:9001"]
+    assert body["summary"]["requested"] == 3 and body["summary"]["found"] == 2 and body["summary"]["missing"] == 1
+    assert body["summary"]["alerts"] == sum(len(n["alerts"]) for n in body["nodes"])
+
+    consistency = body["nodes"][0]["consistency"]
+    assert consistency["score"] == 0.7 and consistency["status"] == "flapping"
+    assert consistency["disappearances"] == 3 and consistency["window"] == "lifetime"
+    assert "consistency" not in client.post("/pnodes/batch", json={"addresses": ["10.0.0.1:9001"]}).json()["nodes"][0]
+
+
+def test_pnodes_batch_errors():
+    assert client.post("/pnodes/batch", json={}).status_code == 400
+    assert client.post("/pnodes/batch", json={"addresses": []}).status_code == 400
+    assert client.post("/pnodes/batch", json={"addresses": [1]}).status_code == 400
+    assert client.post("/pnodes/batch", json={"addresses": ["a"], "window": "2h"}).status_code == 400
+    assert client.post("/pnodes/batch", json={"addresses": ["a"] * 2 + [str(i) for i in range(500)]}).status_code == 400
+
+
+def test_dashboard_section_errors():
+    published = publish(make_snapshot(timestamp=int(time.time()) + 4000))
+
+    def broken():
+        raise RuntimeError("analytics exploded")
+
+    original_analytics, original_health = main.get_network_analytics, main.get_network_health
+    main.get_network_analytics = broken
+    main.get_network_health = lambda: main.JSONResponse({"error": "no health"}, status_code=503)
+    try:
+        response = client.get("/dashboard", params={"sections": "health,network_health,pnodes,analytics"})
+    finally:
+        main.get_network_analytics, main.get_network_health = original_analytics, original_health
+
+    # Failing sections are reported, the rest still come back from one cycle
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cycle"] == published.cycle_id
+    assert sorted(body["sections"]) == ["health", "pnodes"]
+    assert body["sections"]["pnodes"]["summary"]["last_updated"] == published.cycle_id
+    assert body["errors"]["analytics"]["error"]["message"] == "analytics exploded"
+    assert body["errors"]["network_health"] == {"error": "no health"}
+
+    assert client.get("/dashboard", params={"sections": "health,nope"}).status_code == 400
+
+
+def test_changes_long_poll():
+    published = publish(make_snapshot(timestamp=int(time.time()) + 5000))
+    cycle = published.cycle_id
+
+    # Already behind: answered right away
+    body = client.get("/changes", params={"after": cycle - 60, "timeout": 1}).json()
+    assert body == {"version": cycle, "changed": True, "timestamp": body["timestamp"]}
+
+    # Nothing new: held for the timeout, then changed=false
+    started = time.time()
+    body = client.get("/changes", params={"after": cycle, "timeout": 1}).json()
+    assert time.time() - started >= 1
+    assert body["version"] == cycle and body["changed"] is False
+
+    # A publish while the request is parked wakes it with the new cycle
+    async def poll_then_publish():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            request = asyncio.create_task(http.get("/changes", params={"after": cycle, "timeout": 30}))
+            await asyncio.sleep(0.2)
+            assert not request.done()
+            started = time.time()
+            publish(make_snapshot(timestamp=cycle + 60))
+            response = await request
+            return response.json(), time.time() - started
+
+    body, waited = asyncio.run(poll_then_publish())
+    assert body["version"] == cycle + 60 and body["changed"] is True
+    assert waited < 5
+
+
+def test_history_catalog_after_prune():
+    db.pnodes_node_buckets.delete_many({})
+    db.pnodes_history_catalog.delete_many({})
+    db.pnodes_stats.delete_many({"_id": db.HISTORY_CATALOG_ID})
+
+    now = int(time.time())
+    nodes = [{"address": "10.0.0.1:9001", "is_online": True}, {"address": "10.0.0.2:9001", "is_online": True}]
+    for days_ago in (40, 35, 2, 1):
+        timestamp = now - days_ago * 86400
+        # 10.0.0.2 only has history that ages out
+        db.save_node_snapshots(nodes if days_ago > 30 else nodes[:1], timestamp)
+
+    db.prune_old_node_history(days=30)
+    body = client.get("/nodes/history-status").json()
+
+    # Same answer as recomputing the catalog from the remaining buckets
+    expected = db.rebuild_history_catalog()
+    assert body["total_nodes_with_history"] == 1
+    assert body["nodes"][0]["snapshots"] == 2 and body["nodes"][0]["first_seen"] == now - 2 * 86400
+    assert body["global_stats"] == {
+        "oldest_snapshot": expected["first_ts"],
+        "newest_snapshot": expected["last_ts"],
+        "total_snapshots": expected["points"],
+    }
+
+
+def test_growth_errors_are_not_cached():
+    now = int(time.time())
+    past = now - 5 * 3600 - 100
+    db.pnodes_rollups.insert_one({
+        "resolution": "5m", "timestamp": past - past % 300, "last_timestamp": past,
+        "last": {"total_pnodes": 100, "total_storage_committed": 10},
+    })
+    db.refresh_growth_cache({"timestamp": now, "total_pnodes": 110, "total_storage_committed": 20})
+
+    def unreachable(*args, **kwargs):
+        raise RuntimeError("rollups unreachable")
+
+    db.pnodes_rollups.find_one = unreachable
+    try:
+        assert client.get("/network/growth", params={"hours": 5}).json()["growth_metrics"]["available"] is False
+    finally:
+        del db.pnodes_rollups.find_one
+
+    growth = client.get("/network/growth", params={"hours": 5}).json()["growth_metrics"]
+    assert growth["available"] is True and growth["nodes"]["growth"] == 10
+    assert growth["comparison"]["start_time"] == past
+    assert growth["comparison"]["requested_start_time"] == now - 5 * 3600
+
+
+def test_node_consistency_window_fallback():
+    address = "10.0.0.4:9001"
+    publish(make_snapshot(timestamp=int(time.time()) + 6000))
+    db.pnodes_registry.update_one(
+        {"address": address},
+        {"$set": {"gossip_appearances": 20, "gossip_disappearances": 5, "consistency_score": 0.75}}
+    )
+
+    # No presence data: the lifetime score must not be labelled 24h
+    consistency = client.get(f"/node/{address}/consistency", params={"window": "24h"}).json()["consistency"]
+    assert consistency["window"] == "lifetime" and consistency["requested_window"] == "24h"
+    assert consistency["score"] == 0.75 and consistency["disappearances"] == 5
+
+    # The batch endpoint builds the same block
+    body = client.post("/pnodes/batch", json={"addresses": [address], "include_consistency": True, "window": "24h"}).json()
+    batch = body["nodes"][0]["consistency"]
+    assert {k: batch[k] for k in ("score", "status", "window", "requested_window")} == {
+        k: consistency[k] for k in ("score", "status", "window", "requested_window")
+    }
+
+
+def test_node_history_edges_match_raw_series():
+    from app import history_buckets
+
+    address = "10.0.9.9:9001"
+    now = int(time.time())
+    # Two hour buckets, plus one sample older than the requested day
+    for i, offset in enumerate((2 * 86400, 7200, 3700, 3500, 60)):
+        sample = history_buckets.node_sample(
+            {"uptime": 1000 + i, "score": 50 + i, "storage_used": 10 * i}, now - offset
+        )
+        db.pnodes_node_buckets.bulk_write([history_buckets.bucket_update(address, sample)])
+
+    raw = client.get(f"/node/{address}/history", params={"days": 1, "resolution": "raw"}).json()
+    assert raw["resolution"] == "raw" and raw["data_points"] == 4
+    assert raw["trends"]["score_change"] == 3
+    assert raw["downsampling"]["source_points"] == 4
+
+    # The averaged path takes trends from these two find_ones
+    start_time = now - 86400
+    first = db._node_sample_edge(address, start_time, 1)
+    last = db._node_sample_edge(address, start_time, -1)
+    assert (first["timestamp"], last["timestamp"]) == (raw["time_range"]["start"], raw["time_range"]["end"])
+    assert db._node_sample_edge("10.0.9.8:9001", start_time, 1) is None
+
+
+def test_snapshot_writes_follow_collection_type():
+    published = publish(make_snapshot(timestamp=int(time.time()) + 7000))
+
+    # Migrated earlier, HISTORY_TIMESERIES turned off since
+    collection_type = db._collection_type
+    db._collection_type = lambda name: "timeseries" if name == "pnodes_snapshots" else None
+    try:
+        assert db.HISTORY_TIMESERIES is False
+        db.setup_snapshot_collection()
+        assert db._snapshot_store["timeseries"] is True
+        db.save_snapshot_history(published.aggregates)
+        entry = db.pnodes_snapshots.find_one({}, sort=[("timestamp", -1)])
+        assert db.SNAPSHOT_TIME_FIELD in entry
+    finally:
+        db._collection_type = collection_type
+        db._snapshot_store["timeseries"] = False
+
+
+def test_standard_growth_windows_are_exact():
+    now = int(time.time()) + 8000
+    past = now - 24 * 3600 - 30
+    db.pnodes_snapshots.insert_one({"timestamp": past, "total_pnodes": 100, "total_storage_committed": 10})
+    db.pnodes_rollups.insert_one({
+        "resolution": "5m", "timestamp": now - 800 * 3600, "last_timestamp": now - 800 * 3600,
+        "last": {"total_pnodes": 90, "total_storage_committed": 5},
+    })
+    growth = db.refresh_growth_cache({"timestamp": now, "total_pnodes": 120, "total_storage_committed": 20})
+
+    # The closest raw entry at or before "24 hours ago", not a rollup bucket
+    comparison = growth["24h"]["comparison"]
+    assert comparison["start_time"] == past and comparison["resolution"] == "raw"
+    assert db.get_growth_metrics(24)["nodes"]["growth"] == 20
+
+    # Other windows come from rollups, and only the most recent ones are kept
+    for hours in range(2, 2 + db.GROWTH_CACHE_SIZE + 8):
+        if hours not in db.GROWTH_WINDOWS.values():
+            assert db.get_growth_metrics(hours)["comparison"]["resolution"] == "5m"
+    assert len(db._growth_cache["windows"]) == db.GROWTH_CACHE_SIZE
+    assert 2 not in db._growth_cache["windows"]
+
+
+if __name__ == "__main__":
+    test_rpc_batch_isolates_call_errors()
+    test_rpc_request_errors()
+    test_pnodes_since_ignores_per_cycle_fields()
+    test_alert_transitions_are_saved_before_the_feed()
+    test_node_alert_history()
+    test_pnodes_batch()
+    test_pnodes_batch_errors()
+    test_dashboard_section_errors()
+    test_changes_long_poll()
+    test_history_catalog_after_prune()
+    test_growth_errors_are_not_cached()
+    test_node_consistency_window_fallback()
+    test_node_history_edges_match_raw_series()
+    test_snapshot_writes_follow_collection_type()
+    test_standard_growth_windows_are_exact()
+    print("✅ Endpoints behave end to end")
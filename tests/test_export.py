@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Export partitioning tests.
+
+Checks that exported rows get one consistent type per column and that
+batches never span two day partitions. Needs no pyarrow or MongoDB.
+
+Usage:
+    python -m pytest tests/test_export.py
+    python tests/test_export.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.export import COLUMNS, day_batches, normalize_row, partition_day
+
+DAY = 86400
+START = 20000 * DAY  # Midnight UTC
+
+
+def test_normalize_row_types():
+    columns = COLUMNS["node_history"]
+    row = normalize_row({
+        "address": "10.0.0.1:9001",
+        "timestamp": 1703001234.0,
+        "is_online": 1,
+        "uptime": "3600",
+        "score": 71,
+        "peer_sources": ["b", "a"],
+        "_id": "ignored",
+        "storage_used": "n/a",
+    }, columns)
+
+    assert list(row) == [name for name, _ in columns]
+    assert row["timestamp"] == 1703001234 and isinstance(row["timestamp"], int)
+    assert row["is_online"] is True
+    assert row["uptime"] == 3600
+    assert row["score"] == 71.0 and isinstance(row["score"], float)
+    assert row["peer_sources"] == '["b", "a"]'
+    # Missing and unconvertible values become nulls
+    assert row["version"] is None and row["storage_used"] is None
+
+
+def test_day_batches():
+    # Two and a half days of hourly rows
+    rows = [{"timestamp": START + h * 3600} for h in range(60)]
+    batches = list(day_batches(rows, batch_rows=10))
+
+    assert sum(len(b) for _, b in batches) == len(rows)
+    assert all(len(b) <= 10 for _, b in batches)
+    for day, batch in batches:
+        assert {partition_day(r["timestamp"]) for r in batch} == {day}
+    assert [d for d, _ in batches].count(partition_day(START)) == 3  # 24 rows = 10 + 10 + 4
+
+    # A fixed day puts every row in one partition
+    assert {d for d, _ in day_batches(rows, day="2024-01-01")} == {"2024-01-01"}
+    assert list(day_batches([])) == []
+
+
+if __name__ == "__main__":
+    test_normalize_row_types()
+    test_day_batches()
+    print("✅ Export rows are typed and partitioned by day")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Hourly history bucket tests.
+
+Checks that bucket documents reassemble into the per-snapshot shape and
+that merged bucket stats equal stats over the individual samples.
+
+Usage:
+    python -m pytest tests/test_history_buckets.py
+    python tests/test_history_buckets.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import history_buckets
+
+
+def make_samples(count, start, seed=3):
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        node = {
+            "is_online": rng.random() > 0.1,
+            "version": "0.8.0",
+            "uptime": i * 60,
+            "storage_committed": 1000,
+            "storage_used": rng.randint(0, 1000),
+            "storage_usage_percent": rng.uniform(0, 100),
+            "peer_sources": ["p"] * rng.randint(0, 4),
+            "score": rng.choice([0, rng.uniform(1, 100)]),
+            "is_public": True,
+        }
+        samples.append(history_buckets.node_sample(node, start + i * 60))
+    return samples
+
+
+def build_bucket(address, samples):
+    """Apply what bucket_update() does, without MongoDB."""
+    doc = {"address": address, "t": [], "m": {m: [] for m in history_buckets.METRICS}}
+    for sample in samples:
+        doc["t"].append(sample["timestamp"])
+        for metric in history_buckets.METRICS:
+            doc["m"][metric].append(sample[metric])
+        for field in history_buckets.BUCKET_FIELDS:
+            doc[field] = sample[field]
+    doc["stats"] = history_buckets.sample_stats(samples)
+    return doc
+
+
+def test_expand_bucket_round_trip():
+    start = 3600 * 480000
+    samples = make_samples(60, start)
+    doc = build_bucket("n1", samples)
+
+    expanded = history_buckets.expand_bucket(doc)
+    assert [s["timestamp"] for s in expanded] == [s["timestamp"] for s in samples]
+    for got, want in zip(expanded, samples):
+        for metric in history_buckets.METRICS:
+            assert got[metric] == want[metric]
+        # Slow-changing fields keep the latest value of the hour
+        for field in history_buckets.BUCKET_FIELDS:
+            assert got[field] == samples[-1][field]
+
+    # Range filter is [start_time, end_time)
+    window = history_buckets.expand_bucket(doc, start + 600, start + 1200)
+    assert [s["timestamp"] for s in window] == list(range(start + 600, start + 1200, 60))
+
+
+def test_merged_stats_match_samples():
+    samples = make_samples(500, 0, seed=9)
+    chunks = [samples[i:i + 60] for i in range(0, len(samples), 60)]
+    merged = history_buckets.merge_stats(history_buckets.sample_stats(c) for c in chunks)
+    direct = history_buckets.sample_stats(samples)
+
+    assert merged.keys() == direct.keys()
+    for metric, values in direct.items():
+        assert merged[metric]["n"] == values["n"]
+        assert abs(merged[metric]["sum"] - values["sum"]) < 1e-6
+        assert merged[metric]["min"] == values["min"]
+        assert merged[metric]["max"] == values["max"]
+
+    # Unscored samples (score 0) are left out of the score stats
+    assert direct["score"]["n"] == sum(1 for s in samples if s["score"] > 0)
+
+
+def test_stats_from_summary():
+    samples = make_samples(120, 0, seed=5)
+    direct = history_buckets.sample_stats(samples)
+
+    # What the summary $group returns for these samples
+    grouped = {"count": len(samples)}
+    for metric, values in direct.items():
+        for key in ("n", "sum", "min", "max"):
+            grouped[f"{metric}_{key}"] = values[key]
+
+    assert history_buckets.stats_from_summary(grouped) == direct
+    assert history_buckets.stats_from_summary({}) == {}
+
+
+def test_aggregate_pipeline_metric_list():
+    single = history_buckets.aggregate_pipeline("a:1", "score", "avg", 3600, 7200, 300)
+    group = next(stage["$group"] for stage in single if "$group" in stage)
+    assert group["value"] == {"$avg": "$v.score"}
+
+    # A list of metrics groups each one under its own name
+    metrics = ["score", "uptime"]
+    pipeline = history_buckets.aggregate_pipeline("a:1", metrics, "p95", 3600, 7200, 3600)
+    group = next(stage["$group"] for stage in pipeline if "$group" in stage)
+    assert "value" not in group
+    assert set(group) == {"_id", "samples", "score", "uptime"}
+    assert pipeline[-1] == {"$set": {
+        "score": {"$arrayElemAt": ["$score", 0]},
+        "uptime": {"$arrayElemAt": ["$uptime", 0]},
+    }}
+
+
+if __name__ == "__main__":
+    test_expand_bucket_round_trip()
+    test_merged_stats_match_samples()
+    test_stats_from_summary()
+    test_aggregate_pipeline_metric_list()
+    print("✅ History buckets reassemble and aggregate correctly")
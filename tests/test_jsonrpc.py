@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC params validation tests.
+
+Checks that validate_params() fills defaults and rejects the inputs the
+REST endpoints' Query constraints reject.
+
+Usage:
+    python -m pytest tests/test_jsonrpc.py
+    python tests/test_jsonrpc.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.jsonrpc import validate_params, one_of, between, REQUIRED
+
+SPEC = {
+    "address": (str, REQUIRED, None),
+    "limit": (int, 100, between(1, 500)),
+    "min_score": (float, 0.0, between(0.0, 1.0)),
+    "sort_order": (str, "desc", one_of("asc", "desc")),
+    "include_alerts": (bool, False, None),
+}
+
+
+def test_defaults_and_coercion():
+    values = validate_params({"address": "1.2.3.4:9001", "min_score": 1}, SPEC)
+    assert values == {
+        "address": "1.2.3.4:9001",
+        "limit": 100,
+        "min_score": 1.0,
+        "sort_order": "desc",
+        "include_alerts": False,
+    }
+    # null means "use the default"
+    assert validate_params({"address": "a", "limit": None}, SPEC)["limit"] == 100
+
+
+def test_rejected_params():
+    bad = [
+        None,                                   # Missing address
+        ["1.2.3.4:9001"],                       # By-position params
+        {"address": "a", "colour": "red"},      # Unknown param
+        {"address": "a", "limit": 0},           # Out of range
+        {"address": "a", "limit": "10"},        # Wrong type
+        {"address": "a", "limit": True},        # bool is not an int
+        {"address": "a", "sort_order": "up"},   # Not an allowed value
+    ]
+    for params in bad:
+        try:
+            validate_params(params, SPEC)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {params}")
+
+
+if __name__ == "__main__":
+    test_defaults_and_coercion()
+    test_rejected_params()
+    print("✅ JSON-RPC params validated")
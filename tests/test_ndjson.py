@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+NDJSON encoding tests.
+
+Checks that streamed chunks decode to exactly the input rows, that rows
+are consumed lazily, and that a failing source ends with an error line.
+
+Usage:
+    python -m pytest tests/test_ndjson.py
+    python tests/test_ndjson.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.ndjson import encode_lines, wants_ndjson
+
+
+def test_chunks_round_trip():
+    rows = [{"address": f"10.0.0.{i}:9001", "score": i / 3, "tags": ["a", i]} for i in range(1001)]
+    chunks = list(encode_lines(iter(rows), chunk_rows=200))
+
+    assert len(chunks) == 6
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    decoded = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert decoded == rows
+    assert list(encode_lines([])) == []
+
+
+def test_rows_consumed_lazily():
+    pulled = []
+
+    def source():
+        for i in range(1000):
+            pulled.append(i)
+            yield {"i": i}
+
+    first = next(encode_lines(source(), chunk_rows=10))
+    assert len(first.splitlines()) == 10
+    assert len(pulled) == 10
+
+
+def test_failure_ends_with_error_line():
+    def source():
+        yield {"i": 1}
+        raise RuntimeError("cursor lost")
+
+    lines = b"".join(encode_lines(source())).decode().splitlines()
+    assert json.loads(lines[0]) == {"i": 1}
+    assert "cursor lost" in json.loads(lines[-1])["error"]["message"]
+
+
+def test_accept_header():
+    assert wants_ndjson("application/x-ndjson")
+    assert wants_ndjson("text/html, application/ndjson; q=0.5")
+    assert not wants_ndjson(None)
+    assert not wants_ndjson("application/json")
+    assert not wants_ndjson("application/x-ndjson;q=0")
+
+
+if __name__ == "__main__":
+    test_chunks_round_trip()
+    test_rows_consumed_lazily()
+    test_failure_ends_with_error_line()
+    test_accept_header()
+    print("✅ NDJSON chunks decode to the source rows")
@@ -131,7 +131,15 @@ def test_phase5_features():
     else:
         print("⚠️ WARNING: Not enough nodes for comparison testing")
         PASSED += 1  # Don't fail on small network
-    
+
+    many_addresses = get_sample_addresses(20)
+    if len(many_addresses) > 5:
+        test_endpoint(
+            f"Compare {len(many_addresses)} Nodes (batched lookup)",
+            f"{BASE_URL}/pnodes/compare?addresses={','.join(many_addresses)}",
+            ["comparison", "winners", "summary.nodes_compared"]
+        )
+
     # Test 4: Gossip Consistency
     print_header("Test 4: Gossip Consistency Tracking")
     test_endpoint(
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Presence bitmap tests.
+
+Checks the bitmap window and outage statistics against a slot-by-slot
+count, and the round trip through the stored Int64 day-bucket words.
+
+Usage:
+    python -m pytest tests/test_presence.py
+    python tests/test_presence.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import presence
+
+
+def brute_force(present, observed, length):
+    """Count the same statistics slot by slot."""
+    obs = [k for k in range(length) if k in observed]
+    pres = [k for k in obs if k in present]
+    pairs = [k for k in range(length - 1) if k in observed and k + 1 in observed]
+    drops = sum(1 for k in pairs if k in present and k + 1 not in present)
+    ups = sum(1 for k in pairs if k not in present and k + 1 in present)
+    if obs and obs[0] in present:
+        ups += 1
+    return len(obs), len(pres), ups, drops
+
+
+def to_bits(slots):
+    bits = 0
+    for k in slots:
+        bits |= 1 << k
+    return bits
+
+
+def test_window_stats_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        length = rng.randint(1, 3000)
+        observed = {k for k in range(length) if rng.random() > 0.05}
+        present = {k for k in observed if rng.random() > rng.choice([0.02, 0.3, 0.7])}
+
+        stats = presence.window_stats(to_bits(present), to_bits(observed), length)
+        got = (stats["observed_cycles"], stats["present_cycles"], stats["appearances"], stats["disappearances"])
+        assert got == brute_force(present, observed, length)
+
+
+def test_unobserved_cycles_are_not_absences():
+    # Node present whenever the collector ran; collector missed every 3rd cycle
+    observed = {k for k in range(90) if k % 3}
+    stats = presence.window_stats(to_bits(observed), to_bits(observed), 90)
+    assert stats["availability_percent"] == 100.0
+    assert stats["disappearances"] == 0
+    assert stats["consistency_score"] == 1.0
+
+
+def brute_force_outages(present, observed, length):
+    """Outage runs slot by slot; unobserved slots keep the previous state."""
+    runs, starts, run, down = [], [], 0, False
+    for k in range(length):
+        if k in observed:
+            down = k not in present
+        if down:
+            if run == 0:
+                starts.append(k)
+            run += 1
+        elif run:
+            runs.append(run)
+            run = 0
+    current = run
+    if run:
+        runs.append(run)
+    return runs, starts, current
+
+
+def test_outage_stats_matches_brute_force():
+    rng = random.Random(11)
+    slot = presence.SLOT_SECONDS
+    for _ in range(200):
+        length = rng.randint(1, 600)
+        observed = {k for k in range(length) if rng.random() > 0.2}
+        present = {k for k in observed if rng.random() > rng.choice([0.0, 0.05, 0.5, 0.95])}
+
+        stats = presence.outage_stats(to_bits(present), to_bits(observed), length, 5000)
+        runs, starts, current = brute_force_outages(present, observed, length)
+        longest = max(runs) if runs else 0
+
+        assert stats["outage_count"] == len(runs)
+        assert stats["longest_outage_seconds"] == longest * slot
+        assert stats["total_outage_seconds"] == sum(runs) * slot
+        assert stats["current_outage_seconds"] == current * slot
+        if runs:
+            assert stats["longest_outage_started_at"] == (5000 + starts[runs.index(longest)]) * slot
+        else:
+            assert stats["longest_outage_started_at"] is None
+
+
+def test_collection_gap_does_not_split_outage():
+    # Absent 10..29, collector missed 15..19 in the middle of it
+    observed = set(range(60)) - set(range(15, 20))
+    present = observed - set(range(10, 30))
+    stats = presence.outage_stats(to_bits(present), to_bits(observed), 60, 0)
+    assert stats["outage_count"] == 1
+    assert stats["longest_outage_seconds"] == 20 * presence.SLOT_SECONDS
+    assert stats["current_outage_seconds"] == 0
+
+
+def test_day_bucket_round_trip():
+    slots_per_day = presence.SLOTS_PER_DAY
+    start_slot = 20000 * slots_per_day - 100
+    end_slot = start_slot + slots_per_day + 200
+    # Includes slots on the top (sign) bit of a 64-bit word
+    present = {start_slot + k for k in (0, 3, 63, 64, 99, 100, 163, 1000, slots_per_day + 199)}
+
+    docs = {}
+    for slot in present:
+        day, slot_in_day = divmod(slot, slots_per_day)
+        word, bit = divmod(slot_in_day, presence.WORD_BITS)
+        doc = docs.setdefault(day, {"address": "n1", "day": day, "w": {}})
+        current = presence.from_int64(doc["w"].get(str(word), 0))
+        doc["w"][str(word)] = presence.to_int64(current | (1 << bit))
+
+    bitmaps = presence.assemble_bitmaps(docs.values(), ["n1", "other"], start_slot, end_slot)
+    assert bitmaps["n1"] == to_bits(slot - start_slot for slot in present)
+    assert bitmaps["other"] == 0
+
+
+if __name__ == "__main__":
+    test_window_stats_matches_brute_force()
+    test_unobserved_cycles_are_not_absences()
+    test_outage_stats_matches_brute_force()
+    test_collection_gap_does_not_split_outage()
+    test_day_bucket_round_trip()
+    print("✅ Presence bitmap statistics match slot-by-slot counts")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Network history rollup tests.
+
+Checks resolution selection against the point budget and that rollup
+points average the folded snapshot entries.
+
+Usage:
+    python -m pytest tests/test_rollups.py
+    python tests/test_rollups.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import rollups
+
+
+def test_choose_resolution():
+    day = 86400
+    assert rollups.choose_resolution(6 * 3600, 1000, 60) == "raw"
+    assert rollups.choose_resolution(day, 1000, 60) == "5m"
+    assert rollups.choose_resolution(30 * day, 1000, 60) == "1h"
+    assert rollups.choose_resolution(30 * day, 50, 60) == "1d"
+    # Nothing fits: coarsest available
+    assert rollups.choose_resolution(30 * day, 10, 60) == "1d"
+    # Node history only has hourly and daily series
+    node = {"1h": 3600, "1d": 86400}
+    assert rollups.choose_resolution(6 * 3600, 1000, 60, node) == "raw"
+    assert rollups.choose_resolution(day, 1000, 60, node) == "1h"
+    assert rollups.choose_resolution(90 * day, 1000, 60, node) == "1d"
+
+
+def test_rollup_point_averages_entries():
+    entries = [
+        {"timestamp": 3600 + i * 60, "total_pnodes": 10 + i, "avg_peer_count": 2.0,
+         "version_distribution": {"0.8.0": 4 + i, "0.7.1": 1}}
+        for i in range(4)
+    ]
+
+    # Fold entries the way the $inc/$min/$max/$set updates do
+    doc = {"resolution": "1h", "timestamp": 3600, "count": 0, "sum": {}, "min": {}, "max": {}, "last": {}, "versions": {}}
+    for entry in entries:
+        doc["count"] += 1
+        for metric in rollups.METRICS:
+            value = entry.get(metric) or 0
+            doc["sum"][metric] = doc["sum"].get(metric, 0) + value
+            doc["min"][metric] = min(doc["min"].get(metric, value), value)
+            doc["max"][metric] = max(doc["max"].get(metric, value), value)
+            doc["last"][metric] = value
+        for version, count in entry["version_distribution"].items():
+            key = rollups.escape_key(version)
+            assert "." not in key
+            doc["versions"][key] = doc["versions"].get(key, 0) + count
+
+    point = rollups.rollup_point(doc)
+    assert point["timestamp"] == 3600 and point["samples"] == 4
+    assert point["total_pnodes"] == 11.5
+    assert point["range"]["total_pnodes"] == [10, 13]
+    assert point["last"]["total_pnodes"] == 13
+    assert point["version_distribution"] == {"0.8.0": 5.5, "0.7.1": 1.0}
+
+
+def test_rollup_updates_cover_every_resolution():
+    operations = rollups.rollup_updates({"timestamp": 90000, "total_pnodes": 3})
+    ids = sorted(op._filter["_id"] for op in operations)
+    assert ids == ["1d|86400", "1h|90000", "5m|90000"]
+
+
+def test_growth_lookup_helpers():
+    day = 86400
+    assert rollups.resolution_for_age(3600) == "5m"
+    assert rollups.resolution_for_age(30 * day) == "5m"
+    assert rollups.resolution_for_age(90 * day) == "1h"
+    assert rollups.resolution_for_age(3000 * day) == "1d"
+
+    doc = {"timestamp": 3600, "last_timestamp": 3840, "last": {"total_pnodes": 12}}
+    entry = rollups.last_entry(doc)
+    assert entry["timestamp"] == 3840
+    assert entry["total_pnodes"] == 12
+
+
+if __name__ == "__main__":
+    test_choose_resolution()
+    test_rollup_point_averages_entries()
+    test_rollup_updates_cover_every_resolution()
+    test_growth_lookup_helpers()
+    print("✅ History rollups select and aggregate correctly")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Scoring parity tests.
+
+Checks that the vectorized batch scorer returns exactly what the scalar
+scoring functions return, node for node, and that the network health
+score kept by NetworkHealthAggregator matches the original one-pass
+computation.
+
+Usage:
+    python -m pytest tests/test_scoring.py
+    python tests/test_scoring.py
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.scoring import (
+    calculate_all_scores, calculate_all_scores_batch, calculate_network_health_score
+)
+
+VERSIONS = ["0.8.0", "0.7.3", "0.6.5", "0.6", "0.5.1", "unknown", "", None]
+
+
+def make_nodes(count: int, seed: int = 42):
+    """Build random node dicts covering the score boundaries."""
+    rng = random.Random(seed)
+    nodes = []
+    for i in range(count):
+        nodes.append({
+            "address": f"10.0.{i // 256}.{i % 256}:9001",
+            "uptime": rng.choice([0, 59, 3600, 86400 * 30, 86400 * 45, rng.randint(0, 86400 * 60)]),
+            "peer_sources": [f"ip{j}" for j in range(rng.randint(0, 6))],
+            "version": rng.choice(VERSIONS),
+            "storage_committed": rng.choice([0, 1024**3 * 100, rng.randint(0, 1024**3 * 300)]),
+            "storage_usage_percent": rng.choice([0, 20, 80, 100, 19.999, 80.001, 2.675, rng.uniform(0, 100)]),
+        })
+    # Optional fields are only present on some nodes
+    for node in nodes[::3]:
+        node["consistency_score"] = rng.choice([0.0, 0.8, 1.0, rng.random()])
+    for node in nodes[::5]:
+        node["growth_trend"] = rng.random()
+    return nodes
+
+
+def test_batch_matches_scalar():
+    nodes = make_nodes(2000)
+    batch = calculate_all_scores_batch(nodes)
+
+    assert len(batch) == len(nodes)
+    for node, scores in zip(nodes, batch):
+        expected = calculate_all_scores(node)
+        # Compare serialized output so int/float differences are caught too
+        assert json.dumps(scores, sort_keys=True) == json.dumps(expected, sort_keys=True), node["address"]
+
+
+def test_batch_empty():
+    assert calculate_all_scores_batch([]) == []
+
+
+def reference_network_health(all_nodes):
+    """Network health as computed before NetworkHealthAggregator (one pass, rescoring every node)."""
+    if not all_nodes:
+        return {"health_score": 0, "status": "unknown", "factors": {}}
+
+    online_nodes = [n for n in all_nodes if n.get("is_online", False)]
+    online_count = len(online_nodes)
+    factors = {}
+
+    availability_score = online_count / len(all_nodes) * 30
+    factors["availability"] = round(availability_score, 2)
+
+    version_counts = {}
+    for node in online_nodes:
+        version = node.get("version", "unknown")
+        version_counts[version] = version_counts.get(version, 0) + 1
+    version_score = max(version_counts.values()) / online_count * 25 if version_counts else 0
+    factors["version_consistency"] = round(version_score, 2)
+
+    quality_score = 0
+    if online_nodes:
+        total_quality = sum(calculate_all_scores(n)["stake_confidence"]["composite_score"] for n in online_nodes)
+        quality_score = (total_quality / online_count / 100) * 25
+    factors["node_quality"] = round(quality_score, 2)
+
+    connectivity_score = 0
+    if online_nodes:
+        avg_peer_count = sum(len(n.get("peer_sources", [])) for n in online_nodes) / online_count
+        connectivity_score = min(avg_peer_count / 3, 1.0) * 20
+    factors["connectivity"] = round(connectivity_score, 2)
+
+    health_score = availability_score + version_score + quality_score + connectivity_score
+    if health_score >= 80:
+        status = "healthy"
+    elif health_score >= 60:
+        status = "fair"
+    elif health_score >= 40:
+        status = "degraded"
+    else:
+        status = "critical"
+    return {"health_score": round(health_score, 2), "status": status, "factors": factors}
+
+
+def test_network_health_matches_reference():
+    for seed in range(20):
+        rng = random.Random(seed)
+        nodes = make_nodes(rng.randint(1, 300), seed)
+        for node in nodes:
+            node["is_online"] = rng.random() > 0.3
+        # With and without precomputed scores (as the unified view carries them)
+        for scored in (False, True):
+            if scored:
+                nodes = [dict(n, scores=calculate_all_scores(n)) for n in nodes]
+            result = calculate_network_health_score(nodes)
+            expected = reference_network_health(nodes)
+            assert json.dumps(result, sort_keys=True) == json.dumps(expected, sort_keys=True), seed
+
+    offline = [dict(n, is_online=False) for n in make_nodes(5)]
+    assert calculate_network_health_score(offline) == reference_network_health(offline)
+    assert calculate_network_health_score([]) == reference_network_health([])
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar()
+    test_batch_empty()
+    test_network_health_matches_reference()
+    print("✅ Batch scoring and network health match the scalar versions")
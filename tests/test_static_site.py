@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Static page publishing tests.
+
+Writes several versions to a temporary directory and checks the atomic
+`current` swap, version pruning, the compressed variants and encoding
+negotiation.
+
+Usage:
+    python -m pytest tests/test_static_site.py
+    python tests/test_static_site.py
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import static_site
+
+
+def test_versions_swap_and_prune():
+    with tempfile.TemporaryDirectory() as root:
+        for version in range(100, 106):
+            body = {"version": version, "nodes": list(range(50))}
+            manifest = static_site.write_version(
+                root, version, {"pnodes": static_site.encode_page(body)}, keep=2
+            )
+
+        assert os.readlink(os.path.join(root, "current")) == os.path.join("versions", "105")
+        assert sorted(os.listdir(os.path.join(root, "versions"))) == ["103", "104", "105"]
+        assert static_site.load_manifest(root) == manifest
+
+        current = os.path.join(root, "current")
+        with open(os.path.join(current, "pnodes.json"), "rb") as f:
+            raw = f.read()
+        with open(os.path.join(current, "pnodes.json.gz"), "rb") as f:
+            assert gzip.decompress(f.read()) == raw
+        assert json.loads(raw)["version"] == 105
+        assert manifest["files"]["pnodes"]["bytes"] == len(raw)
+        assert manifest["files"]["pnodes"]["encodings"]["gzip"] < len(raw)
+
+
+def test_stale_swap_link_is_replaced():
+    with tempfile.TemporaryDirectory() as root:
+        pages = {"pnodes": static_site.encode_page({"nodes": []})}
+        static_site.write_version(root, 1, pages)
+
+        # Left behind by a swap interrupted between symlink and rename
+        os.symlink(os.path.join("versions", "1"), os.path.join(root, "current.tmp"))
+        static_site.write_version(root, 2, pages)
+
+        assert os.readlink(os.path.join(root, "current")) == os.path.join("versions", "2")
+        assert not os.path.lexists(os.path.join(root, "current.tmp"))
+
+
+def test_choose_encoding():
+    assert static_site.choose_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert static_site.choose_encoding("gzip, deflate, br", ["gzip"]) == "gzip"
+    assert static_site.choose_encoding("br;q=0, gzip", ["br", "gzip"]) == "gzip"
+    assert static_site.choose_encoding("*", ["gzip"]) == "gzip"
+    assert static_site.choose_encoding(None, ["br", "gzip"]) is None
+    assert static_site.choose_encoding("identity", ["br", "gzip"]) is None
+
+
+if __name__ == "__main__":
+    test_versions_swap_and_prune()
+    test_stale_swap_link_is_replaced()
+    test_choose_encoding()
+    print("✅ Static pages publish, swap and negotiate encodings")